@@ -0,0 +1,102 @@
+# benchmarks/benchmark_filtro_noticias.py
+
+"""
+Micro-benchmark do filtro de palavras-chave das notícias.
+
+Compara o teste original (`any(palavra in titulo.lower() ...)`, O(âncoras ×
+palavras)) com o FiltroPalavrasChave compilado, em títulos sintéticos e com
+uma lista de centenas de palavras-chave. Também mede `filtrar_noticias`
+sobre uma página com milhares de âncoras.
+
+Uso:
+    python benchmarks/benchmark_filtro_noticias.py [--ancoras 5000] [--palavras 300]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+from filtro_palavras import FiltroPalavrasChave  # noqa: E402
+from noticias import PALAVRAS_CHAVE, filtrar_noticias  # noqa: E402
+
+VOCABULARIO = (
+    "governo anuncia medidas para conter inflação empresas brasileiras registram lucro "
+    "recorde no trimestre banco central mantém juros estáveis dólar recua frente ao real "
+    "petrobras vale itaú bradesco ambev wege magazine luiza setor varejo agronegócio "
+    "exportações safra minério petróleo política fiscal arcabouço déficit superávit "
+    "emprego renda consumo crédito famílias endividamento tecnologia startups"
+).split()
+
+
+def gerar_palavras_chave(n: int, rng: random.Random) -> list[str]:
+    palavras = list(PALAVRAS_CHAVE)
+    while len(palavras) < n:
+        tamanho = rng.choice([1, 1, 2, 3])
+        termo = " ".join(rng.choice(VOCABULARIO) for _ in range(tamanho)) + f" {len(palavras)}"
+        palavras.append(termo)
+    return palavras[:n]
+
+
+def gerar_titulos(n: int, rng: random.Random) -> list[str]:
+    return [" ".join(rng.choice(VOCABULARIO) for _ in range(rng.randint(6, 14))) for _ in range(n)]
+
+
+def gerar_html(titulos: list[str]) -> str:
+    ancoras = "\n".join(f'<li><a href="/noticia/{i}">{t}</a></li>' for i, t in enumerate(titulos))
+    return f"<html><head><meta charset='utf-8'></head><body><ul>{ancoras}</ul></body></html>"
+
+
+def medir(func, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ancoras", type=int, default=5000)
+    parser.add_argument("--palavras", type=int, default=300)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    palavras = gerar_palavras_chave(args.palavras, rng)
+    titulos = gerar_titulos(args.ancoras, rng)
+
+    t0 = time.perf_counter()
+    filtro = FiltroPalavrasChave(palavras)
+    tempo_compilacao = time.perf_counter() - t0
+
+    def ingenuo():
+        return [t for t in titulos if any(p in t.lower() for p in palavras)]
+
+    def compilado():
+        return [t for t in titulos if filtro.encontrar(t)]
+
+    t_ingenuo = medir(ingenuo, args.repeticoes)
+    t_compilado = medir(compilado, args.repeticoes)
+
+    html = gerar_html(titulos)
+    t_pagina = medir(
+        lambda: filtrar_noticias(html, "https://exemplo.com.br", "Benchmark", filtro=filtro),
+        args.repeticoes,
+    )
+
+    print(f"Âncoras: {args.ancoras} | palavras-chave: {len(palavras)}")
+    print(f"Compilação do filtro:         {tempo_compilacao * 1000:8.1f} ms")
+    print(f"any(palavra in titulo):       {t_ingenuo * 1000:8.1f} ms ({args.ancoras / t_ingenuo:,.0f} títulos/s)")
+    print(f"FiltroPalavrasChave:          {t_compilado * 1000:8.1f} ms ({args.ancoras / t_compilado:,.0f} títulos/s)")
+    print(f"filtrar_noticias (página):    {t_pagina * 1000:8.1f} ms ({args.ancoras / t_pagina:,.0f} âncoras/s)")
+    print(f"Ganho do filtro: {t_ingenuo / t_compilado:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
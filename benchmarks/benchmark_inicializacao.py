@@ -0,0 +1,118 @@
+# benchmarks/benchmark_inicializacao.py
+
+"""
+Compara o custo de inicialização (interpretador + imports) do pipeline:
+
+- modo antigo ("subprocesso"): um interpretador novo por etapa, cada um
+  reimportando pandas, requests, dotenv, crewai, langchain...;
+- modo novo ("processo"): um único interpretador importando todos os
+  módulos das etapas em sequência.
+
+Nenhuma etapa é executada (só os imports), então o benchmark não usa rede
+nem chaves de API.
+
+Uso:
+    python benchmarks/benchmark_inicializacao.py [--repeticoes 5]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = ROOT_DIR / "scripts"
+
+MODULOS_ETAPAS = [
+    "indicadores_economicos",
+    "acoes",
+    "noticias",
+    "agentes_economicos",
+]
+
+# Código executado no processo filho: importa os módulos e devolve os tempos
+CODIGO_FILHO = """
+import json, sys, time
+sys.path.insert(0, {scripts!r})
+tempos = {{}}
+for modulo in {modulos!r}:
+    t0 = time.perf_counter()
+    try:
+        __import__(modulo)
+        tempos[modulo] = time.perf_counter() - t0
+    except Exception as e:
+        tempos[modulo] = None
+        print(f"{{modulo}}: {{type(e).__name__}}: {{e}}", file=sys.stderr)
+print(json.dumps(tempos))
+"""
+
+
+def _rodar_filho(modulos: list[str]) -> tuple[float, dict]:
+    codigo = CODIGO_FILHO.format(scripts=str(SCRIPTS_DIR), modulos=modulos)
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", codigo],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+    )
+    total = time.perf_counter() - t0
+    if proc.stderr.strip():
+        print(proc.stderr.strip())
+    linhas = proc.stdout.strip().splitlines()
+    tempos = json.loads(linhas[-1]) if linhas else {}
+    return total, tempos
+
+
+def medir_modo_subprocesso() -> tuple[float, dict[str, float]]:
+    """Um interpretador por etapa (como o main.py antigo)."""
+    por_etapa = {}
+    for modulo in MODULOS_ETAPAS:
+        total, _ = _rodar_filho([modulo])
+        por_etapa[modulo] = total
+    return sum(por_etapa.values()), por_etapa
+
+
+def medir_modo_processo() -> tuple[float, dict[str, float]]:
+    """Um único interpretador importando tudo (orquestração em processo)."""
+    total, tempos = _rodar_filho(MODULOS_ETAPAS)
+    return total, tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    totais_sub, totais_proc = [], []
+    ultimo_sub, ultimo_proc = {}, {}
+
+    for i in range(args.repeticoes):
+        total_sub, ultimo_sub = medir_modo_subprocesso()
+        total_proc, ultimo_proc = medir_modo_processo()
+        totais_sub.append(total_sub)
+        totais_proc.append(total_proc)
+        print(f"Rodada {i + 1}: subprocesso {total_sub:.2f}s | processo {total_proc:.2f}s")
+
+    mediana_sub = statistics.median(totais_sub)
+    mediana_proc = statistics.median(totais_proc)
+
+    print("\n=== Custo de inicialização (mediana) ===")
+    print(f"Modo subprocesso (1 interpretador por etapa): {mediana_sub:.2f}s")
+    for modulo, tempo in ultimo_sub.items():
+        print(f"   - {modulo:<24} {tempo:.2f}s")
+
+    print(f"Modo processo (interpretador único):          {mediana_proc:.2f}s")
+    for modulo, tempo in ultimo_proc.items():
+        texto = f"{tempo:.2f}s (import incremental)" if tempo is not None else "falhou"
+        print(f"   - {modulo:<24} {texto}")
+
+    if mediana_proc > 0:
+        print(f"\nEconomia: {mediana_sub - mediana_proc:.2f}s ({mediana_sub / mediana_proc:.1f}x mais rápido)")
+
+
+if __name__ == "__main__":
+    main()
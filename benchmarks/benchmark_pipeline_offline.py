@@ -0,0 +1,152 @@
+# benchmarks/benchmark_pipeline_offline.py
+
+"""
+Roda o pipeline completo (main/main.py) de ponta a ponta SEM rede e sem
+chaves reais: todas as APIs externas (OpenAI, Serper, Alpha Vantage, BACEN
+e os sites de notícias) são atendidas por benchmarks/servidor_simulado.py,
+com latências configuráveis.
+
+Cada repetição usa um diretório de dados novo (PROJETO_DATA_DIR temporário),
+então as medições partem do zero, a menos que --manter-dados seja usado
+(útil para medir execuções "quentes", com caches e coleta incremental).
+
+Uso:
+    python benchmarks/benchmark_pipeline_offline.py [--repeticoes 3]
+        [--latencia-llm 0.5] [--latencia-serper 0.2]
+        [--modo-indicacao sequencial|por_ticker] [--manter-dados]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from servidor_simulado import ServidorSimulado  # noqa: E402
+
+
+def ambiente_offline(url: str, dir_dados: Path, args) -> dict:
+    env = dict(os.environ)
+    env.update(
+        {
+            "PROJETO_DATA_DIR": str(dir_dados),
+            "OPENAI_API_KEY": "sk-offline",
+            "OPENAI_BASE_URL": f"{url}/v1",
+            "OPENAI_API_BASE": f"{url}/v1",
+            "SERPER_API_KEY": "offline",
+            "SERPER_BASE_URL": f"{url}/serper",
+            "ALPHA_VANTAGE_API_KEY": "offline",
+            "ALPHA_VANTAGE_URL": f"{url}/alphavantage/query",
+            "ALPHA_VANTAGE_CHAMADAS_POR_MINUTO": "100000",
+            "ALPHA_VANTAGE_CHAMADAS_POR_DIA": "100000",
+            "BACEN_SGS_URL": f"{url}/bacen/dados/serie/bcdata.sgs.{{codigo}}/dados",
+            "NOTICIAS_URL_BASE": f"{url}/noticias",
+            "AGENTES_MODO_INDICACAO": args.modo_indicacao,
+            "CACHE_HTTP_MODO": args.modo_cache,
+            "CACHE_LLM_MODO": args.modo_cache,
+            "CACHE_BUSCAS_MODO": args.modo_cache,
+            # Telemetria fica junto dos dados temporários
+            "TELEMETRIA_ARQUIVO": str(dir_dados / "telemetria.sqlite"),
+        }
+    )
+    return env
+
+
+def rodar_pipeline(env: dict, dir_dados: Path) -> tuple[float, dict, str]:
+    arquivo_resumo = dir_dados / "resumo_pipeline.json"
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, str(ROOT_DIR / "main" / "main.py"), "--sem-painel", "--resumo-json", str(arquivo_resumo)],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    duracao = time.perf_counter() - t0
+    resumo = json.loads(arquivo_resumo.read_text(encoding="utf-8")) if arquivo_resumo.exists() else {}
+    saida = proc.stdout + proc.stderr if proc.returncode != 0 else ""
+    return duracao, resumo, saida
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--latencia-llm", type=float, default=0.5, help="segundos por resposta do LLM simulado")
+    parser.add_argument("--latencia-serper", type=float, default=0.2, help="segundos por busca simulada")
+    parser.add_argument("--latencia-dados", type=float, default=0.05, help="segundos por requisição de dados/notícias")
+    parser.add_argument("--modo-indicacao", choices=["sequencial", "por_ticker"], default="sequencial")
+    parser.add_argument(
+        "--modo-cache",
+        choices=["ativo", "desligado"],
+        default="desligado",
+        help="modo dos caches HTTP/LLM/buscas durante o benchmark",
+    )
+    parser.add_argument(
+        "--manter-dados",
+        action="store_true",
+        help="reaproveita o mesmo diretório de dados entre as repetições (execuções quentes)",
+    )
+    args = parser.parse_args()
+
+    servidor = ServidorSimulado(
+        latencia_llm=args.latencia_llm,
+        latencia_serper=args.latencia_serper,
+        latencia_dados=args.latencia_dados,
+    ).iniciar()
+    print(f"🧪 Servidor simulado em {servidor.url}")
+    print(
+        f"   latências: LLM {args.latencia_llm}s | Serper {args.latencia_serper}s | dados {args.latencia_dados}s"
+        f" | indicação: {args.modo_indicacao} | caches: {args.modo_cache}\n"
+    )
+
+    totais: list[float] = []
+    por_etapa: dict[str, list[float]] = {}
+    status_por_etapa: dict[str, set] = {}
+
+    dir_fixo = tempfile.TemporaryDirectory(prefix="pipeline_offline_") if args.manter_dados else None
+    try:
+        for i in range(1, args.repeticoes + 1):
+            dir_temp = dir_fixo or tempfile.TemporaryDirectory(prefix="pipeline_offline_")
+            dir_dados = Path(dir_temp.name)
+            try:
+                duracao, resumo, saida = rodar_pipeline(ambiente_offline(servidor.url, dir_dados, args), dir_dados)
+            finally:
+                if dir_fixo is None:
+                    dir_temp.cleanup()
+
+            totais.append(duracao)
+            for nome, etapa in resumo.get("etapas", {}).items():
+                status_por_etapa.setdefault(nome, set()).add(etapa["status"])
+                if etapa.get("duracao") is not None:
+                    por_etapa.setdefault(nome, []).append(etapa["duracao"])
+
+            print(f"  repetição {i}: {duracao:.2f}s")
+            if saida:
+                print(f"  ⚠️ pipeline terminou com erro; últimas linhas:\n{saida[-1500:]}")
+    finally:
+        servidor.parar()
+        if dir_fixo is not None:
+            dir_fixo.cleanup()
+
+    print(f"\n{'Etapa':<26} {'Status':<16} {'Média (s)':>10} {'Mín (s)':>10}")
+    print("-" * 66)
+    for nome, duracoes in por_etapa.items():
+        status = "/".join(sorted(status_por_etapa[nome]))
+        print(f"{nome:<26} {status:<16} {statistics.mean(duracoes):>10.2f} {min(duracoes):>10.2f}")
+    print("-" * 66)
+    print(f"{'Total (com interpretador)':<43} {statistics.mean(totais):>10.2f} {min(totais):>10.2f}")
+
+    print("\nRequisições ao servidor simulado:")
+    for rota, quantidade in sorted(servidor.requisicoes.items()):
+        print(f"  {rota:<16} {quantidade:>6}")
+
+
+if __name__ == "__main__":
+    main()
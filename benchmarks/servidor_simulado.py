@@ -0,0 +1,330 @@
+# benchmarks/servidor_simulado.py
+
+"""
+Servidor HTTP local que imita as APIs externas do pipeline, para rodar e
+medir tudo offline:
+
+- OpenAI   POST /v1/chat/completions   (respostas fixas por agente, com ou sem stream)
+- Serper   POST /serper/search
+- Alpha Vantage  GET /alphavantage/query?function=TIME_SERIES_DAILY&symbol=...
+- BACEN SGS      GET /bacen/dados/serie/bcdata.sgs.<codigo>/dados[/ultimos/<n>]
+- Notícias       GET /noticias/<host>/<caminho>
+
+As latências são configuráveis e os dados de mercado são sintéticos, mas
+determinísticos (mesmo ticker/série -> mesmos números). Os textos vêm de
+benchmarks/fixtures/.
+
+Uso isolado:
+    python benchmarks/servidor_simulado.py --porta 8765 --latencia-llm 0.5
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+DIR_FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+FORMATO_DATA_SGS = "%d/%m/%Y"
+
+# Séries do SGS com observação diária; as demais são mensais
+SERIES_DIARIAS = {1, 432}
+
+
+def _semente(texto: str) -> int:
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def _dias_uteis(fim: date, quantidade: int) -> list[date]:
+    dias = []
+    dia = fim
+    while len(dias) < quantidade:
+        if dia.weekday() < 5:
+            dias.append(dia)
+        dia -= timedelta(days=1)
+    return sorted(dias)
+
+
+def serie_alpha_vantage(simbolo: str, quantidade: int = 100) -> dict:
+    """Passeio aleatório determinístico no formato TIME_SERIES_DAILY."""
+    rng = random.Random(_semente(simbolo))
+    preco = rng.uniform(8, 80)
+    serie = {}
+    for dia in _dias_uteis(date.today() - timedelta(days=1), quantidade):
+        abertura = preco
+        preco = max(1.0, preco * (1 + rng.gauss(0, 0.015)))
+        alta = max(abertura, preco) * (1 + abs(rng.gauss(0, 0.005)))
+        baixa = min(abertura, preco) * (1 - abs(rng.gauss(0, 0.005)))
+        serie[dia.isoformat()] = {
+            "1. open": f"{abertura:.4f}",
+            "2. high": f"{alta:.4f}",
+            "3. low": f"{baixa:.4f}",
+            "4. close": f"{preco:.4f}",
+            "5. volume": str(rng.randint(1_000_000, 90_000_000)),
+        }
+    return {
+        "Meta Data": {"2. Symbol": simbolo, "3. Last Refreshed": max(serie)},
+        "Time Series (Daily)": dict(sorted(serie.items(), reverse=True)),
+    }
+
+
+def serie_sgs(codigo: int, inicio: date, fim: date) -> list[dict]:
+    rng = random.Random(_semente(f"sgs-{codigo}"))
+    base = rng.uniform(0.1, 20)
+    observacoes = []
+    dia = inicio
+    while dia <= fim:
+        if codigo in SERIES_DIARIAS:
+            valido = dia.weekday() < 5
+            proximo = dia + timedelta(days=1)
+        else:
+            valido = dia.day == 1
+            proximo = (dia.replace(day=1) + timedelta(days=32)).replace(day=1)
+        if valido:
+            ruido = random.Random(_semente(f"{codigo}-{dia.isoformat()}")).gauss(0, 0.02)
+            observacoes.append({"data": dia.strftime(FORMATO_DATA_SGS), "valor": f"{base * (1 + ruido):.4f}"})
+        dia = proximo
+    return observacoes
+
+
+class ServidorSimulado:
+    def __init__(
+        self,
+        porta: int = 0,
+        latencia_llm: float = 0.5,
+        latencia_serper: float = 0.2,
+        latencia_dados: float = 0.05,
+    ):
+        self.latencia_llm = latencia_llm
+        self.latencia_serper = latencia_serper
+        self.latencia_dados = latencia_dados
+        self.requisicoes: Counter = Counter()
+        self._lock = threading.Lock()
+
+        self.respostas_llm = json.loads((DIR_FIXTURES / "respostas_llm.json").read_text(encoding="utf-8"))
+        self.modelo_serper = (DIR_FIXTURES / "serper.json").read_text(encoding="utf-8")
+        self.modelo_noticias = (DIR_FIXTURES / "noticias.html").read_text(encoding="utf-8")
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", porta), self._criar_handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, porta = self._http.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self) -> "ServidorSimulado":
+        self._thread = threading.Thread(target=self._http.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._http.shutdown()
+        self._http.server_close()
+
+    def contar(self, rota: str) -> None:
+        with self._lock:
+            self.requisicoes[rota] += 1
+
+    # ---------------- respostas ---------------- #
+
+    def texto_llm(self, mensagens: list[dict]) -> str:
+        conteudo = "\n".join(str(m.get("content", "")) for m in mensagens)
+        texto = self.respostas_llm["padrao"]
+        for papel, resposta in self.respostas_llm.items():
+            if papel != "padrao" and papel in conteudo:
+                texto = resposta
+                break
+        # Prompts da CrewAI pedem o formato ReAct; o chat do painel, texto puro
+        if "Final Answer" in conteudo:
+            return f"Thought: I now can give a great answer\nFinal Answer: {texto}"
+        return texto
+
+    def _criar_handler(self):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):  # silencioso
+                pass
+
+            def _json(self, corpo, status: int = 200) -> None:
+                dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(dados)))
+                self.end_headers()
+                self.wfile.write(dados)
+
+            def _ler_corpo(self) -> dict:
+                tamanho = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(tamanho) or b"{}")
+
+            # ---------- GET: dados de mercado e notícias ---------- #
+
+            def do_GET(self):
+                partes = urlsplit(self.path)
+                query = {k: v[0] for k, v in parse_qs(partes.query).items()}
+                time.sleep(servidor.latencia_dados)
+
+                if partes.path.startswith("/alphavantage/query"):
+                    servidor.contar("alphavantage")
+                    return self._json(serie_alpha_vantage(query.get("symbol", "?")))
+
+                if partes.path.startswith("/bacen/dados/serie/bcdata.sgs."):
+                    servidor.contar("bacen")
+                    return self._bacen(partes.path, query)
+
+                if partes.path.startswith("/noticias/"):
+                    servidor.contar("noticias")
+                    host = partes.path.split("/")[2]
+                    html = servidor.modelo_noticias.replace("{fonte}", host).encode("utf-8")
+                    etag = f'"{hashlib.md5(html).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        servidor.contar("noticias (304)")
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.send_header("Content-Length", str(len(html)))
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    self.wfile.write(html)
+                    return
+
+                self._json({"erro": f"rota desconhecida: {partes.path}"}, 404)
+
+            def _bacen(self, caminho: str, query: dict):
+                segmentos = caminho.split("/")
+                codigo = int(segmentos[4].removeprefix("bcdata.sgs."))
+                hoje = date.today()
+
+                if "ultimos" in segmentos:
+                    quantidade = int(segmentos[segmentos.index("ultimos") + 1])
+                    dias = 40 if codigo in SERIES_DIARIAS else 31 * 30
+                    observacoes = serie_sgs(codigo, hoje - timedelta(days=dias), hoje)[-quantidade:]
+                else:
+                    inicio = datetime.strptime(query["dataInicial"], FORMATO_DATA_SGS).date()
+                    fim = datetime.strptime(query["dataFinal"], FORMATO_DATA_SGS).date()
+                    observacoes = serie_sgs(codigo, inicio, fim)
+
+                if not observacoes:
+                    return self._json({"erro": "Nenhum registro encontrado"}, 404)
+                return self._json(observacoes)
+
+            # ---------- POST: OpenAI e Serper ---------- #
+
+            def do_POST(self):
+                partes = urlsplit(self.path)
+                corpo = self._ler_corpo()
+
+                if partes.path.endswith("/chat/completions"):
+                    servidor.contar("openai")
+                    return self._chat(corpo)
+
+                if partes.path.startswith("/serper/"):
+                    servidor.contar("serper")
+                    time.sleep(servidor.latencia_serper)
+                    consulta = json.dumps(str(corpo.get("q", "")), ensure_ascii=False)[1:-1]
+                    return self._json(json.loads(servidor.modelo_serper.replace("{consulta}", consulta)))
+
+                self._json({"erro": f"rota desconhecida: {partes.path}"}, 404)
+
+            def _chat(self, corpo: dict):
+                mensagens = corpo.get("messages", [])
+                texto = servidor.texto_llm(mensagens)
+                modelo = corpo.get("model", "gpt-4.1-mini")
+                tokens_prompt = sum(len(str(m.get("content", ""))) for m in mensagens) // 4
+                tokens_resposta = len(texto) // 4
+                uso = {
+                    "prompt_tokens": tokens_prompt,
+                    "completion_tokens": tokens_resposta,
+                    "total_tokens": tokens_prompt + tokens_resposta,
+                }
+                identificador = f"chatcmpl-sim{int(time.time() * 1000)}"
+
+                if not corpo.get("stream"):
+                    time.sleep(servidor.latencia_llm)
+                    return self._json(
+                        {
+                            "id": identificador,
+                            "object": "chat.completion",
+                            "created": int(time.time()),
+                            "model": modelo,
+                            "choices": [
+                                {
+                                    "index": 0,
+                                    "message": {"role": "assistant", "content": texto},
+                                    "finish_reason": "stop",
+                                }
+                            ],
+                            "usage": uso,
+                        }
+                    )
+
+                # Stream (SSE): a latência é distribuída entre os pedaços
+                pedacos = [texto[i:i + 24] for i in range(0, len(texto), 24)] or [""]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                def enviar(delta: dict, finish_reason=None, usage=None):
+                    evento = {
+                        "id": identificador,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": modelo,
+                        "choices": [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    }
+                    if usage:
+                        evento["usage"] = usage
+                    self.wfile.write(f"data: {json.dumps(evento, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+
+                enviar({"role": "assistant", "content": ""})
+                for pedaco in pedacos:
+                    time.sleep(servidor.latencia_llm / len(pedacos))
+                    enviar({"content": pedaco})
+                enviar({}, finish_reason="stop")
+                if (corpo.get("stream_options") or {}).get("include_usage"):
+                    enviar({}, usage=uso)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia-llm", type=float, default=0.5, help="segundos por resposta do LLM")
+    parser.add_argument("--latencia-serper", type=float, default=0.2, help="segundos por busca")
+    parser.add_argument("--latencia-dados", type=float, default=0.05, help="segundos por requisição de dados/notícias")
+    args = parser.parse_args()
+
+    servidor = ServidorSimulado(args.porta, args.latencia_llm, args.latencia_serper, args.latencia_dados)
+    print(f"🧪 Servidor simulado em {servidor.url} (Ctrl+C para encerrar)")
+    try:
+        servidor._http.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 Requisições atendidas: {dict(servidor.requisicoes)}")
+
+
+if __name__ == "__main__":
+    main()
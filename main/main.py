@@ -9,7 +9,14 @@ IMPORTANTE:
 """
 
 import sys
+import argparse
+import importlib
+import json
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
 
 
@@ -23,63 +30,265 @@ ROOT_DIR = MAIN_DIR.parent
 SCRIPTS_DIR = ROOT_DIR / "scripts"
 STREAMLIT_APP = ROOT_DIR / "streamlit" / "dashboard.py"
 
+# Os módulos de scripts/ são importados diretamente no modo em processo
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+# ============================================
+# Definição das etapas do pipeline (DAG)
+# ============================================
+@dataclass
+class Etapa:
+    nome: str
+    descricao: str
+    modulo: str  # módulo em scripts/ que expõe main()
+    dependencias: list[str] = field(default_factory=list)
+    # Falha de etapa opcional não impede as dependentes de rodarem
+    opcional: bool = False
+
+
+@dataclass
+class ResultadoEtapa:
+    nome: str
+    status: str  # "ok" | "falhou" | "ignorada"
+    inicio: datetime | None = None
+    fim: datetime | None = None
+    duracao: float = 0.0
+    erro: str | None = None
+
 
 # ============================================
 # Função utilitária para executar etapas
 # ============================================
 def run_step(description: str, command: list[str]) -> None:
+    """Executa um comando; levanta CalledProcessError em caso de falha."""
     print(f"\n🔁 {description}")
     print(f"   Comando: {' '.join(command)}")
 
+    subprocess.run(command, check=True)
+    print(f"✅ {description} concluída com sucesso.")
+
+
+def run_step_in_process(description: str, modulo: str) -> None:
+    """
+    Importa `modulo` (só agora, quando a etapa precisa dele) e chama main()
+    no processo atual. Módulos já importados (pandas, requests, sessão HTTP
+    compartilhada) são reaproveitados entre as etapas.
+    """
+    print(f"\n🔁 {description}")
+    print(f"   Função: {modulo}.main()")
+
+    t0 = time.perf_counter()
+    mod = importlib.import_module(modulo)
+    print(f"   Import de '{modulo}': {time.perf_counter() - t0:.2f}s")
+
+    try:
+        mod.main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise RuntimeError(f"{modulo}.main() encerrou com código {e.code}") from e
+    print(f"✅ {description} concluída com sucesso.")
+
+
+def _executar_etapa(etapa: Etapa, modo: str) -> ResultadoEtapa:
+    inicio = datetime.now()
+    t0 = time.perf_counter()
     try:
-        subprocess.run(command, check=True)
-        print(f"✅ {description} concluída com sucesso.")
+        if modo == "subprocesso":
+            comando = [sys.executable, str(SCRIPTS_DIR / f"{etapa.modulo}.py")]
+            run_step(etapa.descricao, comando)
+        else:
+            run_step_in_process(etapa.descricao, etapa.modulo)
+        status, erro = "ok", None
     except subprocess.CalledProcessError as e:
-        print(f"❌ ERRO ao executar: {description}")
+        print(f"❌ ERRO ao executar: {etapa.descricao}")
         print(f"   Detalhes: {e}")
-        sys.exit(1)
+        status, erro = "falhou", str(e)
+    except Exception as e:
+        print(f"❌ ERRO inesperado em: {etapa.descricao}: {e}")
+        status, erro = "falhou", str(e)
+
+    return ResultadoEtapa(
+        nome=etapa.nome,
+        status=status,
+        inicio=inicio,
+        fim=datetime.now(),
+        duracao=time.perf_counter() - t0,
+        erro=erro,
+    )
+
+
+def _validar_dag(etapas: list[Etapa]) -> None:
+    nomes = {e.nome for e in etapas}
+    for etapa in etapas:
+        faltantes = [d for d in etapa.dependencias if d not in nomes]
+        if faltantes:
+            raise ValueError(f"Etapa '{etapa.nome}' depende de etapas inexistentes: {faltantes}")
+
+    # Ordenação topológica apenas para detectar ciclos
+    pendentes = {e.nome: set(e.dependencias) for e in etapas}
+    while pendentes:
+        prontas = [n for n, deps in pendentes.items() if not deps]
+        if not prontas:
+            raise ValueError(f"Ciclo de dependências entre as etapas: {sorted(pendentes)}")
+        for nome in prontas:
+            del pendentes[nome]
+        for deps in pendentes.values():
+            deps.difference_update(prontas)
+
+
+def executar_pipeline(
+    etapas: list[Etapa],
+    modo: str = "processo",
+    max_paralelo: int | None = None,
+) -> dict[str, ResultadoEtapa]:
+    """
+    Executa as etapas respeitando as dependências: etapas independentes
+    rodam em paralelo. Uma etapa só é ignorada quando alguma dependência
+    OBRIGATÓRIA falhou (ou foi ignorada).
+
+    `modo`: "processo" (padrão, tudo no mesmo interpretador) ou
+    "subprocesso" (um interpretador por etapa, como antes).
+    """
+    _validar_dag(etapas)
+    por_nome = {e.nome: e for e in etapas}
+    resultados: dict[str, ResultadoEtapa] = {}
+    em_execucao = {}
+
+    def dependencia_satisfeita(nome: str) -> bool | None:
+        """True = ok, False = bloqueia, None = ainda não terminou."""
+        if nome not in resultados:
+            return None
+        resultado = resultados[nome]
+        return resultado.status == "ok" or (resultado.status == "falhou" and por_nome[nome].opcional)
+
+    with ThreadPoolExecutor(max_workers=max_paralelo or len(etapas)) as executor:
+        while len(resultados) < len(etapas):
+            for etapa in etapas:
+                if etapa.nome in resultados or etapa.nome in em_execucao.values():
+                    continue
+
+                estados = [dependencia_satisfeita(d) for d in etapa.dependencias]
+                if any(estado is False for estado in estados):
+                    bloqueio = [d for d, est in zip(etapa.dependencias, estados) if est is False]
+                    print(f"⏭️ Etapa '{etapa.descricao}' ignorada (dependências com falha: {', '.join(bloqueio)}).")
+                    resultados[etapa.nome] = ResultadoEtapa(nome=etapa.nome, status="ignorada")
+                elif all(estado is True for estado in estados):
+                    em_execucao[executor.submit(_executar_etapa, etapa, modo)] = etapa.nome
+
+            if not em_execucao:
+                continue
+
+            concluidas, _ = wait(list(em_execucao), return_when=FIRST_COMPLETED)
+            for futuro in concluidas:
+                em_execucao.pop(futuro)
+                resultado = futuro.result()
+                resultados[resultado.nome] = resultado
+
+    return resultados
+
+
+def imprimir_resumo(etapas: list[Etapa], resultados: dict[str, ResultadoEtapa], duracao_total: float) -> None:
+    icones = {"ok": "✅", "falhou": "❌", "ignorada": "⏭️"}
+    print("\n⏱️ Resumo do pipeline:")
+    for etapa in etapas:
+        r = resultados[etapa.nome]
+        inicio = r.inicio.strftime("%H:%M:%S") if r.inicio else "--:--:--"
+        fim = r.fim.strftime("%H:%M:%S") if r.fim else "--:--:--"
+        print(f"   {icones[r.status]} {etapa.nome:<12} {inicio} → {fim}  {r.duracao:7.1f}s  ({r.status})")
+
+    soma = sum(r.duracao for r in resultados.values())
+    print(f"   Tempo total: {duracao_total:.1f}s (soma das etapas: {soma:.1f}s)")
 
 
 # ============================================
 # Função principal
 # ============================================
-def main():
-    python_exec = sys.executable  # Garante usar o mesmo Python que chamou o script
-
-    # ----------------------------- #
-    # 1. Indicadores Econômicos
-    # ----------------------------- #
-    run_step(
-        "Coleta de indicadores econômicos (BACEN)",
-        [python_exec, str(SCRIPTS_DIR / "indicadores_economicos.py")],
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Pipeline local: coleta + agentes + painel.")
+    parser.add_argument(
+        "--modo",
+        choices=["processo", "subprocesso"],
+        default="processo",
+        help="'processo' roda as etapas no mesmo interpretador; 'subprocesso' lança um Python por etapa.",
     )
-
-    # ----------------------------- #
-    # 2. Dados das Ações (Alpha Vantage)
-    # ----------------------------- #
-    run_step(
-        "Coleta das ações da B3 (Alpha Vantage)",
-        [python_exec, str(SCRIPTS_DIR / "acoes.py")],
+    parser.add_argument(
+        "--sem-painel",
+        action="store_true",
+        help="Não abre o Streamlit ao final (CI, benchmarks).",
     )
-
-    # ----------------------------- #
-    # 3. Notícias Econômicas
-    # ----------------------------- #
-    run_step(
-        "Coleta de notícias econômicas",
-        [python_exec, str(SCRIPTS_DIR / "noticias.py")],
+    parser.add_argument(
+        "--resumo-json",
+        type=Path,
+        help="Grava status e duração de cada etapa neste arquivo JSON.",
     )
+    args = parser.parse_args(argv)
 
-    # ----------------------------- #
-    # 4. Análise Multiagente (CrewAI)
-    # ----------------------------- #
-    run_step(
-        "Execução da análise multiagente (CrewAI)",
-        [python_exec, str(SCRIPTS_DIR / "agentes_economicos.py")],
-    )
+    # Os três coletores são independentes entre si e rodam em paralelo;
+    # a análise dos agentes espera todos terminarem. Coletores são opcionais:
+    # se um falhar, os agentes usam os dados já armazenados.
+    etapas = [
+        Etapa(
+            "indicadores",
+            "Coleta de indicadores econômicos (BACEN)",
+            "indicadores_economicos",
+            opcional=True,
+        ),
+        Etapa(
+            "acoes",
+            "Coleta das ações da B3 (Alpha Vantage)",
+            "acoes",
+            opcional=True,
+        ),
+        Etapa(
+            "noticias",
+            "Coleta de notícias econômicas",
+            "noticias",
+            opcional=True,
+        ),
+        Etapa(
+            "agentes",
+            "Execução da análise multiagente (CrewAI)",
+            "agentes_economicos",
+            dependencias=["indicadores", "acoes", "noticias"],
+        ),
+    ]
+
+    t0 = time.perf_counter()
+    resultados = executar_pipeline(etapas, modo=args.modo)
+    duracao_total = time.perf_counter() - t0
+    imprimir_resumo(etapas, resultados, duracao_total)
+
+    if args.resumo_json:
+        args.resumo_json.write_text(
+            json.dumps(
+                {
+                    "duracao_total": duracao_total,
+                    "etapas": {
+                        nome: {"status": r.status, "duracao": r.duracao, "erro": r.erro}
+                        for nome, r in resultados.items()
+                    },
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+    falhas_obrigatorias = [
+        e.nome for e in etapas
+        if resultados[e.nome].status != "ok" and not e.opcional
+    ]
+    if falhas_obrigatorias:
+        print(f"❌ Etapas obrigatórias sem sucesso: {', '.join(falhas_obrigatorias)}")
+        sys.exit(1)
+
+    if args.sem_painel:
+        return
 
     # ----------------------------- #
-    # 5. Iniciar Streamlit
+    # Iniciar Streamlit
     # ----------------------------- #
     print("\n🚀 Iniciando painel Streamlit...")
     streamlit_cmd = [
@@ -5,9 +5,21 @@ import sys
 import time
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+from armazenamento_precos import (
+    DIR_PRECOS,
+    anexar_novos_registros,
+    importar_csv_legado,
+    tickers_armazenados,
+    ultima_data,
+)
+from cache_http import RequisicaoCancelada, cache_padrao, sessao_compartilhada
+from limitador_taxa import LimitadorDeTaxa
+
 # ============================================================
 # Carregar variáveis de ambiente (.env para uso local)
 # ============================================================
@@ -15,11 +27,6 @@ load_dotenv()
 
 API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
 
-if not API_KEY:
-    print("❌ ERRO: Variável de ambiente ALPHA_VANTAGE_API_KEY não encontrada.")
-    print("   Defina a chave no .env (para uso local) ou nos Secrets (GitHub Actions).")
-    sys.exit(1)
-
 # ============================================================
 # Configuração dos ativos e caminhos
 # ============================================================
@@ -32,10 +39,17 @@ TOP_10_ACOES = [
 
 # Diretório raiz do projeto (assumindo que o script está em scripts/)
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
 DATA_DIR.mkdir(exist_ok=True)
 
-ARQUIVO_SAIDA = DATA_DIR / "top_10_acoes.csv"
+# ============================================================
+# Limites da API (plano gratuito: 5 chamadas/min e 25/dia)
+# ============================================================
+CHAMADAS_POR_MINUTO = float(os.getenv("ALPHA_VANTAGE_CHAMADAS_POR_MINUTO", "5"))
+CHAMADAS_POR_DIA = int(os.getenv("ALPHA_VANTAGE_CHAMADAS_POR_DIA", "25"))
+NUM_WORKERS = int(os.getenv("ALPHA_VANTAGE_WORKERS", "2"))
+
+URL_ALPHA_VANTAGE = os.getenv("ALPHA_VANTAGE_URL", "https://www.alphavantage.co/query")
 
 # ============================================================
 # Função de coleta de uma ação na Alpha Vantage
@@ -44,27 +58,56 @@ ARQUIVO_SAIDA = DATA_DIR / "top_10_acoes.csv"
 def buscar_dados_acao_alpha_vantage(
     ticker_b3: str,
     api_key: str,
-    num_registros: int = 20,
+    num_registros: int | None = 20,
+    sessao: requests.Session | None = None,
+    limitador: LimitadorDeTaxa | None = None,
 ) -> pd.DataFrame | None:
     """
     Busca dados diários de um ticker da B3 na Alpha Vantage,
-    retornando apenas os últimos `num_registros` registros mais recentes.
+    retornando apenas os últimos `num_registros` registros mais recentes
+    (ou toda a série compacta, se `num_registros` for None).
+
+    Se `limitador` for informado, cada requisição que vai de fato à rede
+    (inclusive a nova tentativa após 503) consome um token; respostas servidas
+    pelo cache HTTP não consomem cota.
     """
-    ticker = f"{ticker_b3}.SA"
-    url = (
-        "https://www.alphavantage.co/query"
-        f"?function=TIME_SERIES_DAILY&symbol={ticker}&apikey={api_key}&outputsize=compact"
-    )
+    cache = cache_padrao()
+    params = {
+        "function": "TIME_SERIES_DAILY",
+        "symbol": f"{ticker_b3}.SA",
+        "apikey": api_key,
+        "outputsize": "compact",
+    }
+
+    def buscar():
+        return cache.get(
+            URL_ALPHA_VANTAGE,
+            params=params,
+            fonte="alpha_vantage",
+            timeout=30,
+            sessao=sessao,
+            antes_da_rede=limitador.adquirir if limitador is not None else None,
+            # Avisos de limite ("Note"/"Information") também vêm com status 200
+            armazenar_se=lambda r: r.status_code == 200 and "Time Series (Daily)" in r.text,
+        )
 
     print(f"🔄 Coletando dados de {ticker_b3} na Alpha Vantage...")
-    response = requests.get(url, timeout=30)
+    try:
+        response = buscar()
+    except RequisicaoCancelada:
+        print(f"[{ticker_b3}] Cota diária da Alpha Vantage esgotada nesta execução. Ticker ignorado.")
+        return None
 
     # Tratamento de erros HTTP
     if response.status_code != 200:
         if response.status_code == 503:
             print(f"[{ticker_b3}] Servidor Alpha Vantage indisponível (503). Aguardando 30s e tentando de novo...")
             time.sleep(30)
-            response = requests.get(url, timeout=30)
+            try:
+                response = buscar()
+            except RequisicaoCancelada:
+                print(f"[{ticker_b3}] Cota diária esgotada antes da nova tentativa.")
+                return None
             if response.status_code != 200:
                 print(f"[{ticker_b3}] Erro {response.status_code} após nova tentativa.")
                 return None
@@ -94,7 +137,8 @@ def buscar_dados_acao_alpha_vantage(
     df["ticker"] = ticker_b3
 
     # Selecionar apenas os últimos N registros (mais recentes)
-    df = df.tail(num_registros)
+    if num_registros is not None:
+        df = df.tail(num_registros)
 
     return df
 
@@ -103,33 +147,83 @@ def buscar_dados_acao_alpha_vantage(
 # Execução principal
 # ============================================================
 
-def main():
-    df_total = pd.DataFrame()
-
-    for ativo in TOP_10_ACOES:
+def coletar_ativo(
+    ativo: str,
+    sessao: requests.Session,
+    limitador: LimitadorDeTaxa,
+) -> int:
+    """
+    Coleta um ticker e anexa ao armazenamento apenas os pregões posteriores
+    à última data já gravada. Retorna o número de linhas novas.
+    """
+    ultima = ultima_data(ativo)
+    if ultima is not None and ultima.date() >= datetime.now().date():
+        print(f"⏭️ {ativo} já está atualizado até {ultima.date()}. Nenhuma chamada necessária.")
+        return 0
+
+    try:
+        df = buscar_dados_acao_alpha_vantage(
+            ativo, API_KEY, num_registros=None, sessao=sessao, limitador=limitador
+        )
+    except Exception as e:
+        print(f"❌ Erro ao processar {ativo}: {e}")
+        return 0
+
+    if df is not None and not df.empty:
         try:
-            df = buscar_dados_acao_alpha_vantage(ativo, API_KEY, num_registros=20)
-
-            if df is not None and not df.empty:
-                df_total = pd.concat([df_total, df])
-                print(f"✅ {ativo} coletado com {len(df)} linhas.")
-            elif df is not None and df.empty:
-                print(f"⚠️ {ativo} retornou DataFrame vazio (após filtros).")
-            else:
-                print(f"⚠️ Nenhum dado retornado para {ativo}.")
+            novas = anexar_novos_registros(ativo, df)
+        except Exception as e:
+            print(f"❌ Erro ao gravar {ativo} no armazenamento: {e}")
+            return 0
+        desde = f" desde {ultima.date()}" if ultima is not None else ""
+        print(f"✅ {ativo}: {novas} novos pregões gravados{desde}.")
+        return novas
+    elif df is not None and df.empty:
+        print(f"⚠️ {ativo} retornou DataFrame vazio (após filtros).")
+    else:
+        print(f"⚠️ Nenhum dado retornado para {ativo}.")
+    return 0
 
-            # Respeitar limite da API gratuita (5 chamadas/minuto → ~12s por chamada).
-            # Usando 15s para ficar folgado.
-            time.sleep(15)
 
-        except Exception as e:
-            print(f"❌ Erro ao processar {ativo}: {e}")
+def main():
+    if not API_KEY:
+        print("❌ ERRO: Variável de ambiente ALPHA_VANTAGE_API_KEY não encontrada.")
+        print("   Defina a chave no .env (para uso local) ou nos Secrets (GitHub Actions).")
+        sys.exit(1)
+
+    # Primeira execução com o armazenamento vazio: aproveita o CSV antigo
+    if not tickers_armazenados():
+        importadas = importar_csv_legado()
+        if importadas:
+            print(f"📦 Armazenamento semeado com {importadas} linhas do CSV legado.")
+
+    # O ritmo das chamadas é ditado pelo token bucket (limite real da API),
+    # e não por um sleep fixo após cada ticker.
+    limitador = LimitadorDeTaxa(
+        chamadas_por_minuto=CHAMADAS_POR_MINUTO,
+        chamadas_por_dia=CHAMADAS_POR_DIA,
+    )
+    sessao = sessao_compartilhada()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        resultados = list(
+            executor.map(lambda ativo: coletar_ativo(ativo, sessao, limitador), TOP_10_ACOES)
+        )
+    duracao = time.perf_counter() - inicio
+
+    print(
+        f"⏱️ {limitador.chamadas_realizadas} chamadas em {duracao:.1f}s "
+        f"(limite: {CHAMADAS_POR_MINUTO:g}/min, atingido: "
+        f"{limitador.chamadas_por_minuto_atingidas():.2f}/min, workers: {NUM_WORKERS})."
+    )
+    print(f"🗃️ {cache_padrao().resumo()}")
 
-    if not df_total.empty:
-        df_total.to_csv(ARQUIVO_SAIDA, index=True, encoding="utf-8-sig")
-        print(f"📁 Arquivo final salvo em: {ARQUIVO_SAIDA} ({len(df_total)} linhas).")
+    total_novas = sum(resultados)
+    if total_novas:
+        print(f"📁 {total_novas} linhas novas anexadas em: {DIR_PRECOS}")
     else:
-        print("ℹ️ Nenhum dado foi coletado. Arquivo CSV não foi gerado.")
+        print("ℹ️ Nenhum pregão novo foi coletado. Armazenamento inalterado.")
 
 
 if __name__ == "__main__":
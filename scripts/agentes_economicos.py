@@ -1,261 +1,673 @@
 # scripts/agentes_economicos.py
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, Callable
 
-import pandas as pd
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew
+from crewai import Agent, Crew, Task
 from crewai_tools.tools import SerperDevTool
-from langchain_openai import ChatOpenAI
+from openai import OpenAI
+from pydantic import Field
+
+from armazenamento_precos import DIR_PRECOS
+from cache_buscas import cache_buscas_padrao
+from cache_http import sessao_compartilhada
+from cache_llm import MODO_CACHE_LLM, cache_llm_padrao
+from llm_instrumentado import LLMInstrumentado
+from arquivo_noticias import DIR_NOTICIAS
+from carregador_dados import (
+    carregar_acoes,
+    carregar_indicadores,
+    carregar_noticias,
+    resumo_memoria,
+)
+from resumo_contexto import (
+    CONTEXTO_MAX_TOKENS,
+    estimar_tokens,
+    linhas_no_orcamento,
+    resumir_series,
+    tabela_resumo,
+)
+from telemetria import Telemetria
 
 # ============================================================
 # Carregar variáveis de ambiente
 # ============================================================
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise RuntimeError(
-        "ERRO: Variável de ambiente OPENAI_API_KEY não encontrada. "
-        "Defina no .env (local) ou nos Secrets (GitHub Actions / Render)."
-    )
-
-# SERPER_API_KEY é usada internamente pelo SerperDevTool
-if not os.getenv("SERPER_API_KEY"):
-    print(
-        "⚠️ Aviso: SERPER_API_KEY não encontrada. "
-        "O SerperDevTool pode não funcionar corretamente sem essa chave."
-    )
-
 # ============================================================
 # Diretórios e arquivos
 # ============================================================
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
 DATA_DIR.mkdir(exist_ok=True)
 
-ARQ_TOPO_ACOES = DATA_DIR / "top_10_acoes.csv"
-ARQ_NOTICIAS = DATA_DIR / "noticias_investimentos.csv"
+ARQ_TOPO_ACOES = DATA_DIR / "top_10_acoes.csv"  # legado (fallback do armazenamento)
+ARQ_NOTICIAS = DATA_DIR / "noticias_investimentos.csv"  # legado (fallback do arquivo)
 ARQ_INDICADORES = DATA_DIR / "indicadores_economicos.csv"
 ARQ_RELATORIO_SAIDA = DATA_DIR / "relatorio_indicacao_acoes.md"
 
+# Pregões por ação (e observações por indicador) resumidos no contexto dos agentes
+NUM_PREGOES_CONTEXTO = 20
+# Notícias mais recentes por fonte enviadas como contexto
+NUM_NOTICIAS_POR_FONTE = 10
+
+# Etapa de indicação de ações:
+#   - "sequencial" (padrão): um único especialista pesquisa todos os tickers;
+#   - "por_ticker": uma sub-tarefa independente por ticker, em paralelo
+#     (no máximo AGENTES_MAX_TICKERS_PARALELOS por vez), consolidadas pelo redator.
+MODO_INDICACAO = os.getenv("AGENTES_MODO_INDICACAO", "sequencial").strip().lower()
+MAX_TICKERS_PARALELOS = int(os.getenv("AGENTES_MAX_TICKERS_PARALELOS", "4"))
+
+# Endpoint alternativo compatível com a API do Serper (ex.: servidor do benchmark offline)
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL")
+
+
+def verificar_chaves() -> str:
+    """Valida as chaves de API e retorna a OPENAI_API_KEY."""
+    openai_api_key = os.getenv("OPENAI_API_KEY")
+    if not openai_api_key and MODO_CACHE_LLM == "replay":
+        # Replay só lê respostas gravadas: a chave nunca chega à API
+        print("ℹ️ OPENAI_API_KEY ausente; usando chave fictícia (cache do LLM em modo replay).")
+        return "sk-replay"
+    if not openai_api_key:
+        raise RuntimeError(
+            "ERRO: Variável de ambiente OPENAI_API_KEY não encontrada. "
+            "Defina no .env (local) ou nos Secrets (GitHub Actions / Render)."
+        )
+
+    # SERPER_API_KEY é usada internamente pelo SerperDevTool
+    if not os.getenv("SERPER_API_KEY"):
+        print(
+            "⚠️ Aviso: SERPER_API_KEY não encontrada. "
+            "O SerperDevTool pode não funcionar corretamente sem essa chave."
+        )
+
+    return openai_api_key
+
+
 # ============================================================
-# Leitura dos CSVs
+# Leitura dos dados
 # ============================================================
-try:
-    df_top_10_acoes = pd.read_csv(ARQ_TOPO_ACOES)
-    df_noticias_investimento = pd.read_csv(ARQ_NOTICIAS)
-    df_indices = pd.read_csv(ARQ_INDICADORES)
-except FileNotFoundError as e:
-    print("❌ Erro: Arquivo CSV não encontrado.")
-    print(f"   Detalhe: {e}")
-    print("   Verifique se os arquivos abaixo existem em 'data/':")
-    print(f"   - {ARQ_TOPO_ACOES.name}")
-    print(f"   - {ARQ_NOTICIAS.name}")
-    print(f"   - {ARQ_INDICADORES.name}")
-    raise SystemExit(1)
+def carregar_dados():
+    try:
+        df_top_10_acoes = carregar_acoes(ultimos_n=NUM_PREGOES_CONTEXTO)
+        df_noticias_investimento = carregar_noticias(por_fonte=NUM_NOTICIAS_POR_FONTE)
+        df_indices = carregar_indicadores(ARQ_INDICADORES)
+    except FileNotFoundError as e:
+        print("❌ Erro: Arquivo CSV não encontrado.")
+        print(f"   Detalhe: {e}")
+        print("   Verifique se os arquivos abaixo existem em 'data/':")
+        print(f"   - {DIR_PRECOS.name}/ (ou {ARQ_TOPO_ACOES.name})")
+        print(f"   - {DIR_NOTICIAS.name}/ (ou {ARQ_NOTICIAS.name})")
+        print(f"   - {ARQ_INDICADORES.name}")
+        raise SystemExit(1)
+
+    print(
+        resumo_memoria(
+            {
+                "ações": df_top_10_acoes,
+                "notícias": df_noticias_investimento,
+                "indicadores": df_indices,
+            }
+        )
+    )
+    return df_top_10_acoes, df_noticias_investimento, df_indices
+
 
 # ============================================================
 # Transformar DataFrames em texto de contexto
 # ============================================================
-contexto_top_10_acoes = df_top_10_acoes.to_markdown(index=False)
-contexto_indices = df_indices.to_markdown(index=False)
-
-# Notícias: título + link
-if not df_noticias_investimento.empty and {"titulo", "link"}.issubset(df_noticias_investimento.columns):
-    contexto_noticias_investimentos = "\n".join(
-        [
-            f"Título: {row['titulo']}\nLink: {row['link']}"
-            for _, row in df_noticias_investimento.iterrows()
-        ]
+def montar_contexto(
+    df_top_10_acoes,
+    df_noticias_investimento,
+    df_indices,
+    max_tokens: int = CONTEXTO_MAX_TOKENS,
+) -> tuple[str, str]:
+    """
+    Retorna (contexto_top_10_acoes, contexto_geral_csv).
+
+    Ações e indicadores entram como resumo estatístico (uma linha por série);
+    as notícias preenchem o que sobrar do orçamento de tokens. O bloco das
+    ações vai só para a tarefa de indicação, sem repetir no contexto geral.
+    """
+    df_indices_recentes = df_indices.groupby("indicador", sort=False, observed=True).tail(NUM_PREGOES_CONTEXTO)
+
+    contexto_top_10_acoes = tabela_resumo(resumir_series(df_top_10_acoes, "ticker", "fechamento"))
+    contexto_indices = tabela_resumo(
+        resumir_series(df_indices_recentes, "indicador", "valor", volatilidade="diferencas"), casas=3
     )
-else:
-    contexto_noticias_investimentos = "Nenhuma notícia de investimento carregada do CSV."
 
-contexto_geral_csv = f"""
-=== 📈 Dados Históricos de Indicadores Econômicos ===
+    # Notícias: título + link, até onde o orçamento permitir
+    if not df_noticias_investimento.empty and {"titulo", "link"}.issubset(df_noticias_investimento.columns):
+        linhas_noticias = [
+            f"Título: {titulo}\nLink: {link}"
+            for titulo, link in zip(df_noticias_investimento["titulo"], df_noticias_investimento["link"])
+        ]
+        restante = max_tokens - estimar_tokens(contexto_top_10_acoes) - estimar_tokens(contexto_indices)
+        selecionadas = linhas_no_orcamento(linhas_noticias, max(0, restante))
+        contexto_noticias_investimentos = "\n".join(selecionadas)
+        if len(selecionadas) < len(linhas_noticias):
+            print(f"✂️ Notícias no contexto: {len(selecionadas)}/{len(linhas_noticias)} (orçamento de {max_tokens} tokens).")
+    else:
+        linhas_noticias = []
+        contexto_noticias_investimentos = "Nenhuma notícia de investimento carregada do CSV."
+
+    contexto_geral_csv = f"""
+=== 📈 Indicadores Econômicos (resumo das últimas {NUM_PREGOES_CONTEXTO} observações) ===
+Colunas: último valor, variação % no período, mínimo, máximo, volatilidade
+(desvio-padrão das variações) e tendência (inclinação por observação).
 {contexto_indices}
 
 === 📰 Notícias de Investimento Recentes (do CSV) ===
 {contexto_noticias_investimentos}
-
-=== 📊 Top 10 Ações (do CSV) ===
-{contexto_top_10_acoes}
 """
 
+    # Comparação com o formato anterior (tabelas completas, sem corte, ações em dobro)
+    tokens_antes = estimar_tokens(
+        df_indices.to_markdown(index=False)
+        + "\n".join(linhas_noticias)
+        + 2 * df_top_10_acoes.to_markdown(index=False)
+    )
+    tokens_depois = estimar_tokens(contexto_geral_csv) + estimar_tokens(contexto_top_10_acoes)
+    print(
+        f"🧾 Contexto dos agentes: ~{tokens_antes} tokens (tabelas completas) → "
+        f"~{tokens_depois} tokens (resumo) | orçamento: {max_tokens}"
+    )
+
+    return contexto_top_10_acoes, contexto_geral_csv
+
+
+def contextos_por_ticker(df_top_10_acoes) -> dict[str, str]:
+    """Resumo estatístico de cada ticker isolado (fatia de dados de cada sub-tarefa)."""
+    resumo = resumir_series(df_top_10_acoes, "ticker", "fechamento")
+    return {
+        str(ticker): tabela_resumo(resumo[resumo["ticker"] == ticker])
+        for ticker in resumo["ticker"]
+    }
+
+
 # ============================================================
 # Configuração do LLM (OpenAI nativo)
 # ============================================================
-llm = ChatOpenAI(
-    model="gpt-4.1-mini",
-    temperature=0.3,
-    api_key=OPENAI_API_KEY,
-)
+def criar_llm(
+    openai_api_key: str,
+    telemetria: Telemetria | None = None,
+    agente: str | None = None,
+    tarefa: str | None = None,
+) -> LLMInstrumentado:
+    return LLMInstrumentado(
+        model="gpt-4.1-mini",
+        temperature=0.3,
+        cliente=OpenAI(api_key=openai_api_key),  # OPENAI_BASE_URL, se definida, vale aqui também
+        cache=cache_llm_padrao(),  # respostas gravadas em data/.cache/llm.sqlite (CACHE_LLM_MODO)
+        telemetria=telemetria,  # uma linha por chamada, atribuída ao agente
+        agente=agente,
+        tarefa=tarefa,  # None: a tarefa atual da telemetria (processo sequencial)
+    )
+
+
+# ============================================================
+# Busca na web com cache e telemetria
+# ============================================================
+class SerperDevToolInstrumentado(SerperDevTool):
+    """
+    SerperDevTool com cache das buscas (compartilhado entre agentes e
+    execuções) e registro de duração e custo de cada chamada na telemetria.
+    """
+
+    telemetria: Any = Field(default=None, exclude=True)
+    cache: Any = Field(default=None, exclude=True)
+    # Atribuição fixa (cópias por ticker); None: agente/tarefa atuais da telemetria
+    agente: str | None = Field(default=None, exclude=True)
+    tarefa: str | None = Field(default=None, exclude=True)
+
+    def _buscar_em(self, url_base: str, consulta: str) -> Any:
+        tipo = getattr(self, "search_type", None) or "search"
+        resp = sessao_compartilhada().post(
+            f"{url_base.rstrip('/')}/{tipo}",
+            json={"q": consulta, "num": getattr(self, "n_results", None) or 10},
+            headers={"X-API-KEY": os.getenv("SERPER_API_KEY", ""), "Content-Type": "application/json"},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def _run(self, **kwargs: Any) -> Any:
+        if SERPER_BASE_URL:
+            def executar(**kw):
+                return self._buscar_em(SERPER_BASE_URL, str(kw.get("search_query", "")))
+        else:
+            executar = super()._run
+
+        def buscar():
+            if self.telemetria is None:
+                return executar(**kwargs)
+            with self.telemetria.medir_ferramenta("serper", agente=self.agente, tarefa=self.tarefa):
+                return executar(**kwargs)
+
+        if self.cache is None:
+            return buscar()
+
+        consulta = str(kwargs.get("search_query", ""))
+        parametros = {k: v for k, v in kwargs.items() if k != "search_query"}
+        parametros.update(
+            {campo: getattr(self, campo, None) for campo in ("n_results", "country", "locale", "search_type")}
+        )
+
+        inicio = time.time()
+        t0 = time.perf_counter()
+        resultado, do_cache = self.cache.obter(consulta, parametros, buscar)
+        if do_cache and self.telemetria is not None:
+            self.telemetria.registrar_chamada(
+                "ferramenta",
+                "serper (cache)",
+                inicio,
+                time.perf_counter() - t0,
+                agente=self.agente,
+                tarefa=self.tarefa,
+            )
+        return resultado
 
-# Ferramenta de busca na web (internet)
-web_tool = SerperDevTool()
 
 # ============================================================
 # Definição dos agentes
 # ============================================================
+PAPEL_ANALISTA = "Analista Macroeconômico Sênior"
+PAPEL_ESPECIALISTA = "Especialista em Análise de Ações da B3"
+PAPEL_REDATOR = "Redator de Relatórios de Investimento"
 
-analista_macroeconomico = Agent(
-    role="Analista Macroeconômico Sênior",
-    goal=(
-        "Analisar o cenário macroeconômico brasileiro, com foco nos indicadores econômicos "
-        "e nas notícias de investimento, para identificar tendências e impactos potenciais "
-        "no mercado de ações, especialmente nas ações listadas no arquivo 'top_10_acoes.csv'."
-    ),
-    backstory=(
-        "Economista com vasta experiência na análise da conjuntura econômica brasileira, "
-        "indicadores e seus efeitos sobre os ativos financeiros. Utiliza dados históricos "
-        "e informações de mercado atualizadas para embasar suas projeções."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[web_tool],  # acesso à internet via Serper
-    llm=llm,
-)
 
-especialista_em_acoes = Agent(
-    role="Especialista em Análise de Ações da B3",
-    goal=(
-        "Avaliar ações da B3, com ênfase nas 'top_10_acoes.csv' mas não se limitando a elas, "
-        "com base na análise macroeconômica, dados fundamentalistas (se disponíveis) e notícias de mercado. "
-        "Gerar recomendações de COMPRA, VENDA ou MANTER para ações específicas, com justificativas claras."
-    ),
-    backstory=(
-        "Analista de investimentos (CNPI) focado no mercado de ações brasileiro, com expertise em valuation "
-        "de empresas e estratégias de investimento. Busca identificar assimetrias e oportunidades, "
-        "fornecendo recomendações acionáveis."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[web_tool],  # também pode consultar internet, se você quiser restringir, remova aqui
-    llm=llm,
-)
+def criar_especialista(llm, web_tool) -> Agent:
+    """Especialista em ações (também instanciado uma vez por ticker no modo por_ticker)."""
+    return Agent(
+        role=PAPEL_ESPECIALISTA,
+        goal=(
+            "Avaliar ações da B3, com ênfase nas 'top_10_acoes.csv' mas não se limitando a elas, "
+            "com base na análise macroeconômica, dados fundamentalistas (se disponíveis) e notícias de mercado. "
+            "Gerar recomendações de COMPRA, VENDA ou MANTER para ações específicas, com justificativas claras."
+        ),
+        backstory=(
+            "Analista de investimentos (CNPI) focado no mercado de ações brasileiro, com expertise em valuation "
+            "de empresas e estratégias de investimento. Busca identificar assimetrias e oportunidades, "
+            "fornecendo recomendações acionáveis."
+        ),
+        verbose=True,
+        allow_delegation=False,
+        tools=[web_tool],  # também pode consultar internet, se você quiser restringir, remova aqui
+        llm=llm,
+    )
+
+
+def criar_agentes(llm_do_agente: Callable[[str], LLMInstrumentado], web_tool) -> tuple[Agent, Agent, Agent]:
+    """`llm_do_agente(papel)` devolve o LLM de cada agente (um por agente, para a telemetria)."""
+    analista_macroeconomico = Agent(
+        role=PAPEL_ANALISTA,
+        goal=(
+            "Analisar o cenário macroeconômico brasileiro, com foco nos indicadores econômicos "
+            "e nas notícias de investimento, para identificar tendências e impactos potenciais "
+            "no mercado de ações, especialmente nas ações listadas no arquivo 'top_10_acoes.csv'."
+        ),
+        backstory=(
+            "Economista com vasta experiência na análise da conjuntura econômica brasileira, "
+            "indicadores e seus efeitos sobre os ativos financeiros. Utiliza dados históricos "
+            "e informações de mercado atualizadas para embasar suas projeções."
+        ),
+        verbose=True,
+        allow_delegation=False,
+        tools=[web_tool],  # acesso à internet via Serper
+        llm=llm_do_agente(PAPEL_ANALISTA),
+    )
+
+    especialista_em_acoes = criar_especialista(llm_do_agente(PAPEL_ESPECIALISTA), web_tool)
+
+    redator_de_relatorios_de_investimento = Agent(
+        role=PAPEL_REDATOR,
+        goal=(
+            "Consolidar a análise macroeconômica e as recomendações de ações em um relatório final claro, "
+            "conciso e bem estruturado para investidores, destacando as principais indicações e justificativas."
+        ),
+        backstory=(
+            "Profissional de comunicação com foco no mercado financeiro, especializado em transformar análises "
+            "técnicas complexas em relatórios de fácil compreensão para o público investidor."
+        ),
+        verbose=True,
+        allow_delegation=False,
+        tools=[],  # não precisa de internet, só organiza o que os outros produziram
+        llm=llm_do_agente(PAPEL_REDATOR),
+    )
+
+    return analista_macroeconomico, especialista_em_acoes, redator_de_relatorios_de_investimento
 
-redator_de_relatorios_de_investimento = Agent(
-    role="Redator de Relatórios de Investimento",
-    goal=(
-        "Consolidar a análise macroeconômica e as recomendações de ações em um relatório final claro, "
-        "conciso e bem estruturado para investidores, destacando as principais indicações e justificativas."
-    ),
-    backstory=(
-        "Profissional de comunicação com foco no mercado financeiro, especializado em transformar análises "
-        "técnicas complexas em relatórios de fácil compreensão para o público investidor."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    tools=[],  # não precisa de internet, só organiza o que os outros produziram
-    llm=llm,
-)
 
 # ============================================================
 # Tarefas (Tasks)
 # ============================================================
-
-tarefa_analise_cenario = Task(
-    description=(
-        "1. Analise os dados dos indicadores econômicos fornecidos no 'contexto_geral_csv' para entender "
-        "as tendências recentes do mercado.\n"
-        "2. Revise as 'Notícias de Investimento Recentes (do CSV)' para capturar o sentimento e os eventos atuais.\n"
-        "3. Use a ferramenta de busca na web (SerperDevTool) para buscar informações atualizadas (últimos 1–3 meses) sobre:\n"
-        "   a) Perspectivas para IPCA, PIB, dólar, IGP-M e taxa Selic no Brasil.\n"
-        "   b) Principais fatores macroeconômicos que estão afetando o mercado de ações brasileiro.\n"
-        "   c) Notícias relevantes sobre a economia brasileira que possam impactar investimentos.\n"
-        "4. Sintetize tudo em um panorama do cenário macroeconômico atual e suas implicações para investidores em ações.\n\n"
-        f"Contexto dos CSVs:\n{contexto_geral_csv}"
-    ),
-    expected_output=(
-        "Um relatório conciso sobre o cenário macroeconômico brasileiro, destacando:\n"
-        "- Análise da trajetória recente dos indicadores coletados e suas perspectivas.\n"
-        "- Principais notícias e eventos de investimento relevantes (CSV + pesquisa online).\n"
-        "- Impactos esperados desse cenário no mercado de ações brasileiro."
-    ),
-    agent=analista_macroeconomico,
+DESCRICAO_RELATORIO_FINAL = (
+    "**Sua responsabilidade é GERAR e ESCREVER o conteúdo completo do relatório de investimento final "
+    "em formato markdown. Não descreva o que você faria; produza o relatório AGORA.**\n\n"
+    "Você deve:\n"
+    "1. Unificar a análise do cenário macroeconômico e as indicações de ações em um relatório coeso.\n"
+    "2. Escrever em linguagem clara, profissional e acessível, usando markdown (títulos, subtítulos, listas, negrito).\n"
+    "3. Destacar como o cenário macroeconômico fundamenta as recomendações de ações.\n"
+    "4. Apresentar cada indicação com: Ticker, Recomendação (COMPRA/VENDA/MANTER) e justificativa completa.\n"
+    "5. Incluir um apêndice mencionando as fontes de dados (CSV + pesquisa online).\n\n"
 )
 
-tarefa_indicacao_acoes = Task(
-    description=(
-        "1. Com base na análise do cenário macroeconômico (tarefa anterior), avalie as ações listadas "
-        "no arquivo 'top_10_acoes.csv'.\n"
-        "2. Para cada ação do 'top_10_acoes.csv', utilize a ferramenta de busca na web para encontrar:\n"
-        "   a) Notícias recentes e específicas sobre a empresa e seu setor.\n"
-        "   b) Análises e perspectivas de mercado (preço-alvo, recomendações, etc.).\n"
-        "   c) Informações fundamentais relevantes, quando possível.\n"
-        "3. Se julgar pertinente, pesquise também outras ações da B3 que possam representar boas "
-        "oportunidades ou riscos no cenário atual.\n"
-        "4. Formule recomendações de INVESTIMENTO (COMPRA, VENDA ou MANTER) para pelo menos 5 ações "
-        "(priorizando as do 'top_10_acoes.csv', mas podendo incluir outras), cada uma com justificativa clara.\n\n"
-        f"Contexto principal — Top 10 Ações (CSV):\n{contexto_top_10_acoes}"
-    ),
-    expected_output=(
-        "Um relatório de indicações de ações contendo:\n"
-        "- Recomendações claras de COMPRA, VENDA ou MANTER para 3 a 5 ações da Bovespa (com seus tickers).\n"
-        "- Justificativa detalhada para cada recomendação, explicando fatores macro, setoriais, "
-        "específicos da empresa e notícias recentes.\n"
-        "Priorizar as ações do 'top_10_acoes.csv', mas incluir outras se relevantes."
-    ),
-    agent=especialista_em_acoes,
-    context=[tarefa_analise_cenario],
+SAIDA_RELATORIO_FINAL = (
+    "Um relatório de investimento completo em markdown (PT-BR), contendo:\n"
+    "### Sumário Executivo\n"
+    "### Análise do Cenário Macroeconômico\n"
+    "### Indicações de Ações Detalhadas\n"
+    "### Breves Considerações sobre Riscos e Oportunidades\n"
+    "### Apêndice: Fontes de Dados\n"
 )
 
-tarefa_compilacao_relatorio_final = Task(
-    description=(
-        "**Sua responsabilidade é GERAR e ESCREVER o conteúdo completo do relatório de investimento final "
-        "em formato markdown. Não descreva o que você faria; produza o relatório AGORA.**\n\n"
-        "Você deve:\n"
-        "1. Unificar a análise do cenário macroeconômico e as indicações de ações em um relatório coeso.\n"
-        "2. Escrever em linguagem clara, profissional e acessível, usando markdown (títulos, subtítulos, listas, negrito).\n"
-        "3. Destacar como o cenário macroeconômico fundamenta as recomendações de ações.\n"
-        "4. Apresentar cada indicação com: Ticker, Recomendação (COMPRA/VENDA/MANTER) e justificativa completa.\n"
-        "5. Incluir um apêndice mencionando as fontes de dados (CSV + pesquisa online).\n\n"
-        "Use as análises das tarefas anteriores, disponíveis no contexto, como base principal."
-    ),
-    expected_output=(
-        "Um relatório de investimento completo em markdown (PT-BR), contendo:\n"
-        "### Sumário Executivo\n"
-        "### Análise do Cenário Macroeconômico\n"
-        "### Indicações de Ações Detalhadas\n"
-        "### Breves Considerações sobre Riscos e Oportunidades\n"
-        "### Apêndice: Fontes de Dados\n"
-    ),
-    agent=redator_de_relatorios_de_investimento,
-    context=[tarefa_analise_cenario, tarefa_indicacao_acoes],
-)
+def criar_tarefa_analise_cenario(analista_macroeconomico: Agent, contexto_geral_csv: str) -> Task:
+    """Análise de cenário (primeira tarefa nos dois modos de indicação)."""
+    return Task(
+        description=(
+            "1. Analise os dados dos indicadores econômicos fornecidos no 'contexto_geral_csv' para entender "
+            "as tendências recentes do mercado.\n"
+            "2. Revise as 'Notícias de Investimento Recentes (do CSV)' para capturar o sentimento e os eventos atuais.\n"
+            "3. Use a ferramenta de busca na web (SerperDevTool) para buscar informações atualizadas (últimos 1–3 meses) sobre:\n"
+            "   a) Perspectivas para IPCA, PIB, dólar, IGP-M e taxa Selic no Brasil.\n"
+            "   b) Principais fatores macroeconômicos que estão afetando o mercado de ações brasileiro.\n"
+            "   c) Notícias relevantes sobre a economia brasileira que possam impactar investimentos.\n"
+            "4. Sintetize tudo em um panorama do cenário macroeconômico atual e suas implicações para investidores em ações.\n\n"
+            f"Contexto dos CSVs:\n{contexto_geral_csv}"
+        ),
+        expected_output=(
+            "Um relatório conciso sobre o cenário macroeconômico brasileiro, destacando:\n"
+            "- Análise da trajetória recente dos indicadores coletados e suas perspectivas.\n"
+            "- Principais notícias e eventos de investimento relevantes (CSV + pesquisa online).\n"
+            "- Impactos esperados desse cenário no mercado de ações brasileiro."
+        ),
+        agent=analista_macroeconomico,
+    )
+
+
+def criar_tarefas(
+    analista_macroeconomico: Agent,
+    especialista_em_acoes: Agent,
+    redator_de_relatorios_de_investimento: Agent,
+    contexto_geral_csv: str,
+    contexto_top_10_acoes: str,
+) -> tuple[Task, Task, Task]:
+    tarefa_analise_cenario = criar_tarefa_analise_cenario(analista_macroeconomico, contexto_geral_csv)
+
+    tarefa_indicacao_acoes = Task(
+        description=(
+            "1. Com base na análise do cenário macroeconômico (tarefa anterior), avalie as ações listadas "
+            "no arquivo 'top_10_acoes.csv'.\n"
+            "2. Para cada ação do 'top_10_acoes.csv', utilize a ferramenta de busca na web para encontrar:\n"
+            "   a) Notícias recentes e específicas sobre a empresa e seu setor.\n"
+            "   b) Análises e perspectivas de mercado (preço-alvo, recomendações, etc.).\n"
+            "   c) Informações fundamentais relevantes, quando possível.\n"
+            "3. Se julgar pertinente, pesquise também outras ações da B3 que possam representar boas "
+            "oportunidades ou riscos no cenário atual.\n"
+            "4. Formule recomendações de INVESTIMENTO (COMPRA, VENDA ou MANTER) para pelo menos 5 ações "
+            "(priorizando as do 'top_10_acoes.csv', mas podendo incluir outras), cada uma com justificativa clara.\n\n"
+            "Contexto principal — Top 10 Ações (resumo dos últimos pregões: último fechamento, variação %, "
+            "mínimo, máximo, volatilidade diária % e tendência):\n"
+            f"{contexto_top_10_acoes}"
+        ),
+        expected_output=(
+            "Um relatório de indicações de ações contendo:\n"
+            "- Recomendações claras de COMPRA, VENDA ou MANTER para 3 a 5 ações da Bovespa (com seus tickers).\n"
+            "- Justificativa detalhada para cada recomendação, explicando fatores macro, setoriais, "
+            "específicos da empresa e notícias recentes.\n"
+            "Priorizar as ações do 'top_10_acoes.csv', mas incluir outras se relevantes."
+        ),
+        agent=especialista_em_acoes,
+        context=[tarefa_analise_cenario],
+    )
+
+    tarefa_compilacao_relatorio_final = Task(
+        description=(
+            DESCRICAO_RELATORIO_FINAL
+            + "Use as análises das tarefas anteriores, disponíveis no contexto, como base principal."
+        ),
+        expected_output=SAIDA_RELATORIO_FINAL,
+        agent=redator_de_relatorios_de_investimento,
+        context=[tarefa_analise_cenario, tarefa_indicacao_acoes],
+    )
+
+    return tarefa_analise_cenario, tarefa_indicacao_acoes, tarefa_compilacao_relatorio_final
+
+
+def criar_tarefa_ticker(especialista: Agent, ticker: str, contexto_ticker: str, analise_macro: str) -> Task:
+    """Sub-tarefa do modo por_ticker: só a fatia de dados do ticker + a análise macro."""
+    return Task(
+        description=(
+            f"Avalie a ação {ticker} da B3 à luz do cenário macroeconômico abaixo.\n"
+            "1. Use a ferramenta de busca na web para encontrar notícias recentes sobre a empresa e seu setor, "
+            "análises de mercado (preço-alvo, recomendações) e informações fundamentais relevantes.\n"
+            f"2. Formule uma recomendação de INVESTIMENTO (COMPRA, VENDA ou MANTER) para {ticker}, "
+            "com justificativa clara.\n\n"
+            f"Resumo dos últimos pregões de {ticker} (último fechamento, variação %, mínimo, máximo, "
+            f"volatilidade diária % e tendência):\n{contexto_ticker}\n\n"
+            f"Análise do cenário macroeconômico:\n{analise_macro}"
+        ),
+        expected_output=(
+            f"Recomendação clara (COMPRA, VENDA ou MANTER) para {ticker}, com justificativa explicando "
+            "fatores macro, setoriais, específicos da empresa e notícias recentes."
+        ),
+        agent=especialista,
+    )
+
+
+def criar_tarefa_consolidacao(
+    redator: Agent,
+    analise_macro: str,
+    analises_por_ticker: dict[str, str],
+) -> Task:
+    """Relatório final do modo por_ticker (as análises chegam no próprio enunciado)."""
+    analises = "\n\n".join(f"#### {ticker}\n{texto}" for ticker, texto in analises_por_ticker.items())
+    return Task(
+        description=(
+            DESCRICAO_RELATORIO_FINAL
+            + "Selecione de 3 a 5 indicações entre as análises por ação abaixo e use-as, junto com a "
+            "análise macroeconômica, como base principal.\n\n"
+            f"=== Análise do Cenário Macroeconômico ===\n{analise_macro}\n\n"
+            f"=== Análises por Ação ===\n{analises}"
+        ),
+        expected_output=SAIDA_RELATORIO_FINAL,
+        agent=redator,
+    )
+
+
+# Nomes curtos das tarefas (na ordem de execução) para a telemetria
+NOMES_TAREFAS = ["analise_cenario", "indicacao_acoes", "compilacao_relatorio"]
+
+
+def acompanhar_tarefas(telemetria: Telemetria, tarefas: list[tuple[str, Task]]):
+    """
+    Retorna o `task_callback` da Crew: a cada tarefa concluída registra sua
+    duração e aponta a telemetria para a próxima (processo sequencial), de
+    modo que chamadas de LLM e ferramentas sejam atribuídas à tarefa certa.
+    """
+    pendentes = list(tarefas)
+    marcador = {"t0": time.perf_counter()}
+
+    def apontar_proxima():
+        if pendentes:
+            nome, tarefa = pendentes[0]
+            telemetria.tarefa_atual = nome
+            telemetria.agente_atual = tarefa.agent.role
+
+    def ao_concluir(_saida):
+        if not pendentes:
+            return
+        nome, tarefa = pendentes.pop(0)
+        agora = time.perf_counter()
+        telemetria.registrar_tarefa(nome, tarefa.agent.role, agora - marcador["t0"])
+        marcador["t0"] = agora
+        apontar_proxima()
+
+    apontar_proxima()
+    return ao_concluir
+
+
+def _tokens_informados(crew) -> tuple[int | None, int | None]:
+    """Totais de tokens reportados pela própria Crew (dict ou objeto, conforme a versão)."""
+    uso = getattr(crew, "usage_metrics", None)
+    if uso is None:
+        return None, None
+    if isinstance(uso, dict):
+        return uso.get("prompt_tokens"), uso.get("completion_tokens")
+    return getattr(uso, "prompt_tokens", None), getattr(uso, "completion_tokens", None)
+
+
+def _texto_resultado(resultado_crew) -> str:
+    if hasattr(resultado_crew, "raw") and isinstance(resultado_crew.raw, str):
+        return resultado_crew.raw
+    if hasattr(resultado_crew, "result") and isinstance(resultado_crew.result, str):
+        return resultado_crew.result
+    return str(resultado_crew)
+
 
 # ============================================================
 # Montar a Crew e executar
 # ============================================================
 
-def main():
+def executar_sequencial(agentes, tarefas, llm, telemetria: Telemetria) -> tuple[str, list]:
+    """Crew original: as três tarefas em sequência. Retorna (relatório, crews executadas)."""
     crew_recomendacao_de_acoes = Crew(
-        agents=[
-            analista_macroeconomico,
-            especialista_em_acoes,
-            redator_de_relatorios_de_investimento,
-        ],
-        tasks=[
-            tarefa_analise_cenario,
-            tarefa_indicacao_acoes,
-            tarefa_compilacao_relatorio_final,
-        ],
+        agents=list(agentes),
+        tasks=list(tarefas),
         verbose=True,
         manager_llm=llm,  # o próprio modelo OpenAI coordena
+        task_callback=acompanhar_tarefas(telemetria, list(zip(NOMES_TAREFAS, tarefas))),
     )
+    return _texto_resultado(crew_recomendacao_de_acoes.kickoff()), [crew_recomendacao_de_acoes]
 
-    print("🚀 Iniciando a análise da Crew para recomendação de ações...")
-    resultado_crew = crew_recomendacao_de_acoes.kickoff()
 
-    # Extrair texto final
-    if hasattr(resultado_crew, "raw") and isinstance(resultado_crew.raw, str):
-        texto_para_salvar = resultado_crew.raw
-    elif hasattr(resultado_crew, "result") and isinstance(resultado_crew.result, str):
-        texto_para_salvar = resultado_crew.result
-    else:
-        texto_para_salvar = str(resultado_crew)
+def executar_por_ticker(
+    agentes,
+    tarefa_analise_cenario: Task,
+    df_top_10_acoes,
+    llm_do_agente: Callable[..., LLMInstrumentado],
+    web_tool,
+    telemetria: Telemetria,
+) -> tuple[str, list]:
+    """
+    1. Crew macro (só a análise de cenário);
+    2. uma Crew por ticker, em paralelo, cada uma com seu próprio especialista
+       e apenas a fatia de dados do ticker + a análise macro;
+    3. o redator consolida tudo no relatório final.
+    O tempo da etapa 2 acompanha o ticker mais lento, não a soma de todos.
+
+    Na etapa 2, cada ticker tem o próprio LLM e a própria cópia da busca na
+    web, já com agente e tarefa do ticker: a telemetria das threads não passa
+    por telemetria.agente_atual/tarefa_atual, que são únicos por execução.
+    """
+    analista, _, redator = agentes
+    crews = []
+
+    crew_macro = Crew(
+        agents=[analista],
+        tasks=[tarefa_analise_cenario],
+        verbose=True,
+        task_callback=acompanhar_tarefas(telemetria, [(NOMES_TAREFAS[0], tarefa_analise_cenario)]),
+    )
+    crews.append(crew_macro)
+    analise_macro = _texto_resultado(crew_macro.kickoff())
+
+    contextos = contextos_por_ticker(df_top_10_acoes)
+    print(f"🔀 Indicação por ticker: {len(contextos)} tickers, até {MAX_TICKERS_PARALELOS} em paralelo.")
+
+    def analisar(item):
+        ticker, contexto_ticker = item
+        agente, nome_tarefa = f"{PAPEL_ESPECIALISTA} [{ticker}]", f"{NOMES_TAREFAS[1]}[{ticker}]"
+        especialista = criar_especialista(
+            llm_do_agente(agente, nome_tarefa),
+            web_tool.model_copy(update={"agente": agente, "tarefa": nome_tarefa}),
+        )
+        tarefa = criar_tarefa_ticker(especialista, ticker, contexto_ticker, analise_macro)
+        crew_ticker = Crew(agents=[especialista], tasks=[tarefa], verbose=False)
+        crews.append(crew_ticker)
+
+        t0 = time.perf_counter()
+        try:
+            texto = _texto_resultado(crew_ticker.kickoff())
+        except Exception as e:
+            print(f"❌ Falha na análise de {ticker}: {e}")
+            texto = f"Análise indisponível nesta execução ({e})."
+        duracao = time.perf_counter() - t0
+        telemetria.registrar_tarefa(nome_tarefa, PAPEL_ESPECIALISTA, duracao)
+        print(f"   ✅ {ticker} analisado em {duracao:.1f}s")
+        return ticker, texto
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, MAX_TICKERS_PARALELOS)) as executor:
+        analises_por_ticker = dict(executor.map(analisar, contextos.items()))
+    print(f"⏱️ Indicação por ticker concluída em {time.perf_counter() - t0:.1f}s.")
+
+    tarefa_consolidacao = criar_tarefa_consolidacao(redator, analise_macro, analises_por_ticker)
+    crew_redator = Crew(
+        agents=[redator],
+        tasks=[tarefa_consolidacao],
+        verbose=True,
+        task_callback=acompanhar_tarefas(telemetria, [(NOMES_TAREFAS[2], tarefa_consolidacao)]),
+    )
+    crews.append(crew_redator)
+    return _texto_resultado(crew_redator.kickoff()), crews
+
+
+def main():
+    openai_api_key = verificar_chaves()
+
+    df_top_10_acoes, df_noticias_investimento, df_indices = carregar_dados()
+    contexto_top_10_acoes, contexto_geral_csv = montar_contexto(
+        df_top_10_acoes, df_noticias_investimento, df_indices
+    )
+
+    telemetria = Telemetria("crew")
+    telemetria.iniciar_execucao()
+
+    llm = criar_llm(openai_api_key, telemetria, "gerente")
+
+    # Ferramenta de busca na web (internet), uma instância para todos os agentes
+    web_tool = SerperDevToolInstrumentado(telemetria=telemetria, cache=cache_buscas_padrao())
+
+    def llm_do_agente(papel: str, tarefa: str | None = None) -> LLMInstrumentado:
+        return criar_llm(openai_api_key, telemetria, papel, tarefa)
+
+    agentes = criar_agentes(llm_do_agente, web_tool)
+
+    print(f"🚀 Iniciando a análise da Crew para recomendação de ações (modo {MODO_INDICACAO})...")
+    crews = []
+    try:
+        if MODO_INDICACAO == "por_ticker":
+            # Só a tarefa macro: indicação e relatório são montados por ticker
+            tarefa_analise_cenario = criar_tarefa_analise_cenario(agentes[0], contexto_geral_csv)
+            texto_para_salvar, crews = executar_por_ticker(
+                agentes, tarefa_analise_cenario, df_top_10_acoes, llm_do_agente, web_tool, telemetria
+            )
+        else:
+            tarefas = criar_tarefas(*agentes, contexto_geral_csv, contexto_top_10_acoes)
+            texto_para_salvar, crews = executar_sequencial(agentes, tarefas, llm, telemetria)
+    except Exception:
+        telemetria.finalizar_execucao("erro")
+        telemetria.imprimir_resumo()
+        raise
+
+    tokens = [_tokens_informados(crew) for crew in crews]
+    tokens_prompt = [t[0] for t in tokens if t[0] is not None]
+    tokens_resposta = [t[1] for t in tokens if t[1] is not None]
+    telemetria.finalizar_execucao(
+        "ok",
+        sum(tokens_prompt) if tokens_prompt else None,
+        sum(tokens_resposta) if tokens_resposta else None,
+    )
+    telemetria.imprimir_resumo()
+    if cache_llm_padrao() is not None:
+        print(f"🗃️ {cache_llm_padrao().resumo()}")
+    print(f"🗃️ {cache_buscas_padrao().resumo()}")
 
     print("\n\n=== RELATÓRIO FINAL DE INVESTIMENTO (TEXTO) ===\n")
     print(texto_para_salvar)
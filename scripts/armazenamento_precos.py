@@ -0,0 +1,245 @@
+# scripts/armazenamento_precos.py
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+# ============================================================
+# Armazenamento persistente de preços (Parquet, particionado por ticker)
+# ============================================================
+#
+# Layout em disco (particionamento estilo Hive):
+#
+#   data/precos/ticker=PETR4/part-20250101T090000.parquet
+#   data/precos/ticker=VALE3/part-...
+#
+# Cada execução do coletor apenas ANEXA um novo arquivo com os pregões
+# posteriores à última data já armazenada. Leitores filtram por ticker e
+# por janela de datas sem precisar ler o histórico inteiro.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+DIR_PRECOS = DATA_DIR / "precos"
+
+# CSV antigo (uma única tabela reescrita a cada execução).
+# Usado apenas como fallback de leitura e para semear o armazenamento.
+ARQUIVO_LEGADO = DATA_DIR / "top_10_acoes.csv"
+
+COLUNAS_PRECO = ["abertura", "alta", "baixa", "fechamento", "volume"]
+
+# Acima deste número de arquivos por ticker, os fragmentos são compactados
+MAX_PARTES_POR_TICKER = 30
+
+
+def _dir_ticker(ticker: str, base: Path = DIR_PRECOS) -> Path:
+    return base / f"ticker={ticker}"
+
+
+def _partes(ticker: str, base: Path = DIR_PRECOS) -> list[Path]:
+    pasta = _dir_ticker(ticker, base)
+    if not pasta.exists():
+        return []
+    return sorted(pasta.glob("*.parquet"))
+
+
+def tickers_armazenados(base: Path = DIR_PRECOS) -> list[str]:
+    if not base.exists():
+        return []
+    return sorted(
+        p.name.split("=", 1)[1]
+        for p in base.iterdir()
+        if p.is_dir() and p.name.startswith("ticker=") and any(p.glob("*.parquet"))
+    )
+
+
+# ============================================================
+# Consulta da última data armazenada (via estatísticas do Parquet)
+# ============================================================
+
+def ultima_data(ticker: str, base: Path = DIR_PRECOS) -> pd.Timestamp | None:
+    """
+    Retorna a data do pregão mais recente armazenado para `ticker`.
+    Usa as estatísticas (max) dos row groups, sem ler os dados.
+    """
+    maior: pd.Timestamp | None = None
+
+    for parte in _partes(ticker, base):
+        arquivo = pq.ParquetFile(parte)
+        idx_data = arquivo.schema_arrow.get_field_index("data")
+        valor = None
+
+        for i in range(arquivo.metadata.num_row_groups):
+            stats = arquivo.metadata.row_group(i).column(idx_data).statistics
+            if stats is None or not stats.has_min_max:
+                valor = None
+                break
+            valor = stats.max if valor is None else max(valor, stats.max)
+
+        if valor is None:
+            # Sem estatísticas: lê apenas a coluna de data
+            coluna = pq.read_table(parte, columns=["data"]).column("data").to_pandas()
+            if coluna.empty:
+                continue
+            valor = coluna.max()
+
+        valor = pd.Timestamp(valor)
+        if maior is None or valor > maior:
+            maior = valor
+
+    return maior
+
+
+# ============================================================
+# Escrita incremental
+# ============================================================
+
+def _normalizar(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte o DataFrame da coleta (índice = data) para o esquema do armazenamento."""
+    df = df.copy()
+    if "data" not in df.columns:
+        df.index.name = "data"
+        df = df.reset_index()
+
+    df["data"] = pd.to_datetime(df["data"]).astype("datetime64[ms]")
+    for coluna in COLUNAS_PRECO:
+        df[coluna] = df[coluna].astype("float64")
+
+    df = df.drop_duplicates(subset=["data"], keep="last").sort_values("data")
+    return df[["data"] + COLUNAS_PRECO]
+
+
+def anexar_novos_registros(ticker: str, df: pd.DataFrame, base: Path = DIR_PRECOS) -> int:
+    """
+    Anexa ao armazenamento apenas os pregões de `df` posteriores à última
+    data já gravada para `ticker`. Retorna o número de linhas novas.
+    """
+    if df is None or df.empty:
+        return 0
+
+    novos = _normalizar(df)
+    ultima = ultima_data(ticker, base)
+    if ultima is not None:
+        novos = novos[novos["data"] > ultima]
+
+    if novos.empty:
+        return 0
+
+    pasta = _dir_ticker(ticker, base)
+    pasta.mkdir(parents=True, exist_ok=True)
+
+    nome = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.parquet"
+    temporario = pasta / f".{nome}.tmp"
+    novos.to_parquet(temporario, index=False)
+    temporario.replace(pasta / nome)
+
+    if len(_partes(ticker, base)) > MAX_PARTES_POR_TICKER:
+        compactar(ticker, base)
+
+    return len(novos)
+
+
+def compactar(ticker: str, base: Path = DIR_PRECOS) -> None:
+    """Une todos os fragmentos de um ticker em um único arquivo ordenado."""
+    partes = _partes(ticker, base)
+    if len(partes) <= 1:
+        return
+
+    df = pd.concat([pd.read_parquet(p) for p in partes], ignore_index=True)
+    df = df.drop_duplicates(subset=["data"], keep="last").sort_values("data")
+
+    pasta = _dir_ticker(ticker, base)
+    nome = f"part-{datetime.now().strftime('%Y%m%dT%H%M%S%f')}.parquet"
+    temporario = pasta / f".{nome}.tmp"
+    df.to_parquet(temporario, index=False)
+    temporario.replace(pasta / nome)
+
+    for parte in partes:
+        parte.unlink()
+
+
+def importar_csv_legado(caminho: Path = ARQUIVO_LEGADO, base: Path = DIR_PRECOS) -> int:
+    """Semeia o armazenamento com o CSV antigo, se existir. Retorna linhas importadas."""
+    if not caminho.exists():
+        return 0
+
+    df = _ler_csv_legado(caminho)
+    total = 0
+    for ticker, df_ticker in df.groupby("ticker", observed=True):
+        total += anexar_novos_registros(str(ticker), df_ticker.drop(columns=["ticker"]), base)
+    return total
+
+
+# ============================================================
+# Leitura por ticker e janela de datas
+# ============================================================
+
+def _ler_csv_legado(caminho: Path) -> pd.DataFrame:
+    df = pd.read_csv(caminho, encoding="utf-8-sig")
+    primeira = df.columns[0]
+    if primeira != "data":
+        df = df.rename(columns={primeira: "data"})
+    df["data"] = pd.to_datetime(df["data"], errors="coerce")
+    return df.dropna(subset=["data"])
+
+
+def _filtrar_janela(
+    df: pd.DataFrame,
+    tickers: list[str] | None,
+    inicio,
+    fim,
+) -> pd.DataFrame:
+    if tickers is not None:
+        df = df[df["ticker"].isin(tickers)]
+    if inicio is not None:
+        df = df[df["data"] >= pd.Timestamp(inicio)]
+    if fim is not None:
+        df = df[df["data"] <= pd.Timestamp(fim)]
+    return df
+
+
+def carregar_precos(
+    tickers: list[str] | None = None,
+    inicio=None,
+    fim=None,
+    ultimos_n: int | None = None,
+    base: Path = DIR_PRECOS,
+) -> pd.DataFrame:
+    """
+    Carrega preços do armazenamento com colunas
+    [data, abertura, alta, baixa, fechamento, volume, ticker].
+
+    Os filtros de ticker e de datas são empurrados para o leitor Parquet
+    (partições e row groups fora da janela não são lidos). `ultimos_n`
+    mantém apenas os N pregões mais recentes de cada ticker.
+
+    Sem armazenamento em disco, cai para o CSV legado.
+    """
+    disponiveis = tickers_armazenados(base)
+
+    if not disponiveis:
+        if not ARQUIVO_LEGADO.exists():
+            return pd.DataFrame(columns=["data"] + COLUNAS_PRECO + ["ticker"])
+        df = _filtrar_janela(_ler_csv_legado(ARQUIVO_LEGADO), tickers, inicio, fim)
+    else:
+        alvo = disponiveis if tickers is None else [t for t in tickers if t in disponiveis]
+        if not alvo:
+            return pd.DataFrame(columns=["data"] + COLUNAS_PRECO + ["ticker"])
+
+        filtros = [("ticker", "in", alvo)]
+        if inicio is not None:
+            filtros.append(("data", ">=", pd.Timestamp(inicio)))
+        if fim is not None:
+            filtros.append(("data", "<=", pd.Timestamp(fim)))
+
+        df = pd.read_parquet(base, filters=filtros)
+        df["ticker"] = df["ticker"].astype(str)
+
+    df = df.sort_values(["ticker", "data"]).drop_duplicates(subset=["ticker", "data"], keep="last")
+
+    if ultimos_n is not None:
+        df = df.groupby("ticker", sort=False).tail(ultimos_n)
+
+    return df[["data"] + COLUNAS_PRECO + ["ticker"]].reset_index(drop=True)
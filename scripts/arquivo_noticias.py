@@ -0,0 +1,178 @@
+# scripts/arquivo_noticias.py
+
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+# ============================================================
+# Arquivo histórico de notícias (append-only, particionado por dia)
+# ============================================================
+#
+# Layout em disco:
+#
+#   data/noticias/data_coleta=2025-12-08/part-184341000000.parquet
+#   data/noticias/data_coleta=2025-12-09/part-...
+#
+# Cada coleta anexa um arquivo na partição do dia. Partições mais antigas
+# que a janela de retenção são apagadas e as dos dias anteriores são
+# compactadas em um único arquivo. As consultas ("últimas N horas",
+# "últimas N por fonte") abrem apenas as partições necessárias.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+DIR_NOTICIAS = DATA_DIR / "noticias"
+
+# CSV antigo (sobrescrito a cada coleta): fallback de leitura
+ARQUIVO_LEGADO = DATA_DIR / "noticias_investimentos.csv"
+
+DIAS_RETENCAO = int(os.getenv("NOTICIAS_DIAS_RETENCAO", "30"))
+
+COLUNAS = ["titulo", "link", "fonte", "data_coleta", "palavras_chave"]
+PREFIXO_PARTICAO = "data_coleta="
+
+
+def _particoes(base: Path = DIR_NOTICIAS) -> list[tuple[str, Path]]:
+    """Partições existentes como (AAAA-MM-DD, pasta), da mais recente para a mais antiga."""
+    if not base.exists():
+        return []
+    particoes = [
+        (p.name[len(PREFIXO_PARTICAO):], p)
+        for p in base.iterdir()
+        if p.is_dir() and p.name.startswith(PREFIXO_PARTICAO)
+    ]
+    return sorted(particoes, reverse=True)
+
+
+def _ler_particao(pasta: Path) -> pd.DataFrame:
+    partes = sorted(pasta.glob("*.parquet"))
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS)
+    return pd.concat([pd.read_parquet(p) for p in partes], ignore_index=True)
+
+
+def _gravar(df: pd.DataFrame, pasta: Path, nome: str) -> None:
+    pasta.mkdir(parents=True, exist_ok=True)
+    temporario = pasta / f".{nome}.tmp"
+    df.to_parquet(temporario, index=False)
+    temporario.replace(pasta / nome)
+
+
+# ============================================================
+# Escrita
+# ============================================================
+
+def anexar(df: pd.DataFrame, base: Path = DIR_NOTICIAS) -> int:
+    """Anexa notícias ao arquivo, na partição do dia de coleta. Retorna linhas gravadas."""
+    if df is None or df.empty:
+        return 0
+
+    df = df.copy()
+    for coluna in COLUNAS:
+        if coluna not in df.columns:
+            df[coluna] = None
+    df["data_coleta"] = pd.to_datetime(df["data_coleta"])
+    df = df[COLUNAS]
+
+    carimbo = datetime.now().strftime("%H%M%S%f")
+    for dia, df_dia in df.groupby(df["data_coleta"].dt.strftime("%Y-%m-%d")):
+        _gravar(df_dia, base / f"{PREFIXO_PARTICAO}{dia}", f"part-{carimbo}.parquet")
+
+    return len(df)
+
+
+def aplicar_retencao(dias: int = DIAS_RETENCAO, base: Path = DIR_NOTICIAS) -> int:
+    """Remove partições mais antigas que `dias`. Retorna quantas foram apagadas."""
+    limite = (datetime.now() - timedelta(days=dias)).strftime("%Y-%m-%d")
+    removidas = 0
+    for dia, pasta in _particoes(base):
+        if dia < limite:
+            shutil.rmtree(pasta)
+            removidas += 1
+    return removidas
+
+
+def compactar(base: Path = DIR_NOTICIAS) -> int:
+    """
+    Une os fragmentos de cada partição de dias anteriores a hoje em um único
+    arquivo (a partição do dia corrente continua recebendo anexos).
+    Retorna o número de partições compactadas.
+    """
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    compactadas = 0
+    for dia, pasta in _particoes(base):
+        partes = sorted(pasta.glob("*.parquet"))
+        if dia >= hoje or len(partes) <= 1:
+            continue
+        df = _ler_particao(pasta).drop_duplicates(subset=["link"], keep="first")
+        _gravar(df, pasta, "compactado.parquet")
+        for parte in partes:
+            if parte.name != "compactado.parquet":
+                parte.unlink()
+        compactadas += 1
+    return compactadas
+
+
+# ============================================================
+# Consultas
+# ============================================================
+
+def _ler_legado() -> pd.DataFrame:
+    if not ARQUIVO_LEGADO.exists():
+        return pd.DataFrame(columns=COLUNAS)
+    df = pd.read_csv(ARQUIVO_LEGADO, encoding="utf-8-sig")
+    df["data_coleta"] = pd.to_datetime(df["data_coleta"], errors="coerce")
+    return df
+
+
+def carregar(
+    ultimas_horas: float | None = None,
+    por_fonte: int | None = None,
+    base: Path = DIR_NOTICIAS,
+) -> pd.DataFrame:
+    """
+    Notícias do arquivo, da mais recente para a mais antiga.
+
+    - `ultimas_horas`: só coletadas nas últimas N horas (lê apenas as
+      partições dos dias envolvidos);
+    - `por_fonte`: no máximo N notícias por fonte (lê partições, da mais
+      recente para trás, até cada fonte já encontrada ter N itens).
+
+    Sem arquivo em disco, cai para o CSV legado.
+    """
+    particoes = _particoes(base)
+
+    if not particoes:
+        df = _ler_legado()
+    else:
+        limite = datetime.now() - timedelta(hours=ultimas_horas) if ultimas_horas is not None else None
+        frames = []
+        contagem: dict[str, int] = {}
+
+        for dia, pasta in particoes:
+            if limite is not None and dia < limite.strftime("%Y-%m-%d"):
+                break
+
+            df_dia = _ler_particao(pasta)
+            frames.append(df_dia)
+
+            if por_fonte is not None:
+                for fonte, qtd in df_dia["fonte"].value_counts().items():
+                    contagem[fonte] = contagem.get(fonte, 0) + int(qtd)
+                if contagem and min(contagem.values()) >= por_fonte:
+                    break
+
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUNAS)
+
+    if df.empty:
+        return df
+
+    df = df.sort_values("data_coleta", ascending=False, kind="stable")
+    if ultimas_horas is not None:
+        df = df[df["data_coleta"] >= datetime.now() - timedelta(hours=ultimas_horas)]
+    if por_fonte is not None:
+        df = df.groupby("fonte", sort=False).head(por_fonte)
+
+    return df.reset_index(drop=True)
@@ -0,0 +1,175 @@
+# scripts/cache_buscas.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from filtro_palavras import normalizar_texto
+
+# ============================================================
+# Cache das buscas na web dos agentes (Serper)
+# ============================================================
+#
+# Os agentes repetem buscas iguais ou quase iguais ("notícias da Petrobras" /
+# "Notícias  PETROBRAS") na mesma execução e entre dias seguidos. A chave
+# é a consulta normalizada — sem acentos, caixa, pontuação e stopwords — mais
+# os demais parâmetros da ferramenta. A ordem das palavras é mantida:
+# "PETR4 supera VALE3" e "VALE3 supera PETR4" são buscas diferentes.
+#
+# Modos (CACHE_BUSCAS_MODO), no mesmo esquema dos demais caches:
+#   "ativo" (padrão), "replay" (só respostas gravadas) e "desligado".
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+ARQUIVO_CACHE_BUSCAS = Path(os.getenv("CACHE_BUSCAS_ARQUIVO", DATA_DIR / ".cache" / "buscas.sqlite"))
+
+MODO_CACHE_BUSCAS = os.getenv("CACHE_BUSCAS_MODO", "ativo").strip().lower()
+MODOS_VALIDOS = {"ativo", "replay", "desligado"}
+
+# Resultados de busca envelhecem rápido, mas não dentro de um mesmo pregão
+TTL_BUSCAS_SEGUNDOS = int(float(os.getenv("CACHE_BUSCAS_TTL_HORAS", "12")) * 60 * 60)
+
+STOPWORDS_BUSCA = {
+    "a", "o", "as", "os", "de", "do", "da", "dos", "das", "e", "em", "no", "na",
+    "nos", "nas", "para", "por", "sobre", "com", "the", "of", "and", "in", "on", "for",
+}
+
+_RE_PALAVRA = re.compile(r"\w+")
+
+
+class BuscaNaoGravada(Exception):
+    """Busca sem resultado gravado no modo replay."""
+
+
+def normalizar_consulta(consulta: str) -> str:
+    palavras = [
+        p for p in _RE_PALAVRA.findall(normalizar_texto(consulta))
+        if p not in STOPWORDS_BUSCA
+    ]
+    return " ".join(palavras)
+
+
+def chave_busca(consulta: str, parametros: dict | None = None) -> str:
+    extras = json.dumps(parametros or {}, sort_keys=True, default=str)
+    return hashlib.sha256(f"{normalizar_consulta(consulta)}\n{extras}".encode("utf-8")).hexdigest()
+
+
+class CacheBuscas:
+    def __init__(
+        self,
+        caminho: Path = ARQUIVO_CACHE_BUSCAS,
+        modo: str = MODO_CACHE_BUSCAS,
+        ttl_segundos: int = TTL_BUSCAS_SEGUNDOS,
+    ):
+        if modo not in MODOS_VALIDOS:
+            raise ValueError(f"Modo de cache de buscas inválido: {modo!r} (use {sorted(MODOS_VALIDOS)}).")
+
+        self.modo = modo
+        self.ttl_segundos = ttl_segundos
+        self.acertos = 0
+        self.falhas = 0
+        self.aguardadas = 0  # buscas idênticas simultâneas que esperaram a primeira
+
+        self._lock = threading.Lock()
+        self._locks_por_chave: dict[str, threading.Lock] = {}
+        self._conn: sqlite3.Connection | None = None
+        self._caminho = Path(caminho)
+
+    def _conexao(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._caminho, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buscas (
+                    chave TEXT PRIMARY KEY,
+                    consulta TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    gravado_em REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def _ler(self, chave: str, ignorar_ttl: bool = False):
+        with self._lock:
+            linha = self._conexao().execute(
+                "SELECT resultado, gravado_em FROM buscas WHERE chave = ?", (chave,)
+            ).fetchone()
+        if linha is None:
+            return None
+        if not ignorar_ttl and time.time() - linha[1] > self.ttl_segundos:
+            return None
+        return json.loads(linha[0])
+
+    def _gravar(self, chave: str, consulta: str, resultado) -> None:
+        with self._lock:
+            conn = self._conexao()
+            conn.execute(
+                "INSERT OR REPLACE INTO buscas VALUES (?, ?, ?, ?)",
+                (chave, consulta, json.dumps(resultado, ensure_ascii=False, default=str), time.time()),
+            )
+            conn.commit()
+
+    def obter(self, consulta: str, parametros: dict | None, buscar):
+        """
+        Resultado da busca: do cache se houver (dentro do TTL), senão
+        `buscar()`. Buscas idênticas simultâneas (agentes em paralelo)
+        esperam a primeira terminar em vez de irem todas à rede.
+        Retorna (resultado, veio_do_cache).
+        """
+        if self.modo == "desligado":
+            return buscar(), False
+
+        chave = chave_busca(consulta, parametros)
+
+        if self.modo == "replay":
+            resultado = self._ler(chave, ignorar_ttl=True)
+            if resultado is None:
+                self.falhas += 1
+                raise BuscaNaoGravada(f"Sem resultado gravado para a busca {consulta!r} (modo replay).")
+            self.acertos += 1
+            return resultado, True
+
+        with self._lock:
+            lock_chave = self._locks_por_chave.setdefault(chave, threading.Lock())
+
+        if lock_chave.locked():
+            self.aguardadas += 1
+        with lock_chave:
+            resultado = self._ler(chave)
+            if resultado is not None:
+                self.acertos += 1
+                return resultado, True
+
+            self.falhas += 1
+            resultado = buscar()
+            if resultado:
+                self._gravar(chave, consulta, resultado)
+            return resultado, False
+
+    def resumo(self) -> str:
+        total = self.acertos + self.falhas
+        taxa = (self.acertos / total * 100) if total else 0.0
+        return (
+            f"cache de buscas ({self.modo}): {self.acertos} acertos, {self.falhas} falhas "
+            f"({taxa:.0f}% de acerto, {self.aguardadas} buscas simultâneas deduplicadas)"
+        )
+
+
+_cache_buscas_padrao: CacheBuscas | None = None
+_lock_padrao = threading.Lock()
+
+
+def cache_buscas_padrao() -> CacheBuscas:
+    global _cache_buscas_padrao
+    with _lock_padrao:
+        if _cache_buscas_padrao is None:
+            _cache_buscas_padrao = CacheBuscas()
+        return _cache_buscas_padrao
@@ -0,0 +1,357 @@
+# scripts/cache_http.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# ============================================================
+# Cache HTTP em disco compartilhado pelos coletores
+# ============================================================
+#
+# Modos (variável de ambiente CACHE_HTTP_MODO):
+#   - "ativo"     (padrão): serve respostas dentro do TTL da fonte; fora dele,
+#                 vai à rede e grava a nova resposta.
+#   - "replay":   serve SOMENTE respostas gravadas (ignora TTL). Uma requisição
+#                 sem gravação gera RespostaNaoGravada — útil para rodar e medir
+#                 o pipeline offline.
+#   - "desligado": comportamento original (sempre rede, nada é gravado).
+#
+# No modo ativo, uma resposta expirada que tenha ETag/Last-Modified é
+# revalidada com GET condicional (If-None-Match / If-Modified-Since): um 304
+# renova a gravação sem baixar o corpo de novo.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+ARQUIVO_CACHE = Path(os.getenv("CACHE_HTTP_ARQUIVO", DATA_DIR / ".cache" / "http.sqlite"))
+
+MODO_PADRAO = os.getenv("CACHE_HTTP_MODO", "ativo").strip().lower()
+MODOS_VALIDOS = {"ativo", "replay", "desligado"}
+
+# TTL (segundos) por fonte de dados
+TTL_POR_FONTE = {
+    "alpha_vantage": 12 * 60 * 60,  # série diária: muda uma vez por pregão
+    "bacen": 6 * 60 * 60,
+    "noticias": 15 * 60,
+    "padrao": 60 * 60,
+}
+
+# Parâmetros que não entram na chave (segredos e afins)
+PARAMS_IGNORADOS = {"apikey", "api_key", "token", "key"}
+
+
+class RespostaNaoGravada(Exception):
+    """Requisição sem resposta gravada no modo replay."""
+
+
+class RequisicaoCancelada(Exception):
+    """A requisição precisaria ir à rede, mas o chamador não liberou (ex.: cota esgotada)."""
+
+
+# ============================================================
+# Resposta desacoplada do requests (mesma interface usada nos scripts)
+# ============================================================
+
+class RespostaHTTP:
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes,
+        headers: dict | None = None,
+        encoding: str | None = None,
+        do_cache: bool = False,
+        revalidada: bool = False,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.encoding = encoding or "utf-8"
+        self.do_cache = do_cache
+        self.revalidada = revalidada  # servida do cache após um 304
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+# ============================================================
+# Sessão HTTP com pool de conexões
+# ============================================================
+
+def criar_sessao_http(tamanho_pool: int = 10) -> requests.Session:
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, tamanho_pool))
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+def _sem_segredos(query: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    return [(k, v) for k, v in query if k.lower() not in PARAMS_IGNORADOS]
+
+
+def url_sem_segredos(url: str) -> str:
+    """URL com os PARAMS_IGNORADOS removidos da query (é o que vai para o disco)."""
+    partes = urlsplit(url)
+    query = _sem_segredos(parse_qsl(partes.query, keep_blank_values=True))
+    return urlunsplit((partes.scheme, partes.netloc, partes.path, urlencode(query), partes.fragment))
+
+
+def chave_requisicao(url: str, params: dict | None = None) -> str:
+    """Chave estável: URL normalizada + parâmetros ordenados (sem segredos)."""
+    partes = urlsplit(url)
+    query = parse_qsl(partes.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    query = sorted(_sem_segredos(query))
+
+    normalizada = urlunsplit(
+        (partes.scheme.lower(), partes.netloc.lower(), partes.path, urlencode(query), "")
+    )
+    return hashlib.sha256(normalizada.encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+class CacheHTTP:
+    def __init__(
+        self,
+        caminho: Path = ARQUIVO_CACHE,
+        modo: str = MODO_PADRAO,
+        ttls: dict[str, int] | None = None,
+    ):
+        if modo not in MODOS_VALIDOS:
+            raise ValueError(f"Modo de cache inválido: {modo!r} (use {sorted(MODOS_VALIDOS)}).")
+
+        self.modo = modo
+        self.ttls = {**TTL_POR_FONTE, **(ttls or {})}
+        self.acertos = 0
+        self.falhas = 0
+        self.revalidacoes = 0
+        self.expiradas_servidas = 0  # gravações vencidas servidas porque a rede falhou
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._caminho = Path(caminho)
+
+    def _contar(self, contador: str) -> None:
+        # get() roda em várias threads dos coletores: `+=` sem lock perde contagens
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    # ---------------- armazenamento ---------------- #
+
+    def _conexao(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._caminho, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    fonte TEXT NOT NULL,
+                    status INTEGER NOT NULL,
+                    headers TEXT NOT NULL,
+                    encoding TEXT,
+                    corpo BLOB NOT NULL,
+                    gravado_em REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    def _ler(self, chave: str):
+        with self._lock:
+            return self._conexao().execute(
+                "SELECT url, status, headers, encoding, corpo, gravado_em FROM respostas WHERE chave = ?",
+                (chave,),
+            ).fetchone()
+
+    def _gravar(self, chave: str, fonte: str, resposta: RespostaHTTP) -> None:
+        with self._lock:
+            conn = self._conexao()
+            conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    chave,
+                    url_sem_segredos(resposta.url),
+                    fonte,
+                    resposta.status_code,
+                    json.dumps(dict(resposta.headers)),
+                    resposta.encoding,
+                    zlib.compress(resposta.content, 6),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def _renovar(self, chave: str) -> None:
+        with self._lock:
+            conn = self._conexao()
+            conn.execute("UPDATE respostas SET gravado_em = ? WHERE chave = ?", (time.time(), chave))
+            conn.commit()
+
+    @staticmethod
+    def _resposta_da_linha(linha, revalidada: bool = False) -> RespostaHTTP:
+        url, status, headers, encoding, corpo, _ = linha
+        return RespostaHTTP(
+            url, status, zlib.decompress(corpo), json.loads(headers), encoding,
+            do_cache=True, revalidada=revalidada,
+        )
+
+    @staticmethod
+    def _headers_condicionais(linha, headers: dict | None) -> dict | None:
+        """Acrescenta If-None-Match / If-Modified-Since a partir da resposta gravada."""
+        if linha is None:
+            return headers
+        gravados = CaseInsensitiveDict(json.loads(linha[2]))
+        condicionais = {}
+        if gravados.get("ETag"):
+            condicionais["If-None-Match"] = gravados["ETag"]
+        if gravados.get("Last-Modified"):
+            condicionais["If-Modified-Since"] = gravados["Last-Modified"]
+        if not condicionais:
+            return headers
+        return {**(headers or {}), **condicionais}
+
+    # ---------------- API pública ---------------- #
+
+    def get(
+        self,
+        url: str,
+        params: dict | None = None,
+        headers: dict | None = None,
+        fonte: str = "padrao",
+        timeout: float = 30,
+        sessao: requests.Session | None = None,
+        antes_da_rede=None,
+        armazenar_se=None,
+    ) -> RespostaHTTP:
+        """
+        GET com cache.
+
+        - `antes_da_rede`: callable chamado apenas quando a requisição vai de
+          fato à rede (ex.: `limitador.adquirir`). Se retornar False, levanta
+          RequisicaoCancelada.
+        - `armazenar_se`: callable(resposta) -> bool que decide se a resposta
+          deve ser gravada (padrão: apenas status 200).
+        """
+        if self.modo == "desligado":
+            return self._buscar_na_rede(url, params, headers, timeout, sessao, antes_da_rede)
+
+        chave = chave_requisicao(url, params)
+        linha = self._ler(chave)
+
+        if self.modo == "replay":
+            if linha is None:
+                self._contar("falhas")
+                raise RespostaNaoGravada(f"Sem resposta gravada para {url} (modo replay).")
+            self._contar("acertos")
+            return self._resposta_da_linha(linha)
+
+        ttl = self.ttls.get(fonte, self.ttls["padrao"])
+        if linha is not None and time.time() - linha[5] <= ttl:
+            self._contar("acertos")
+            return self._resposta_da_linha(linha)
+
+        try:
+            resposta = self._buscar_na_rede(
+                url, params, self._headers_condicionais(linha, headers), timeout, sessao, antes_da_rede
+            )
+        except requests.RequestException:
+            if linha is not None:
+                self._contar("expiradas_servidas")
+                print(f"⚠️ Falha de rede em {url}; usando resposta gravada expirada.")
+                return self._resposta_da_linha(linha)
+            self._contar("falhas")
+            raise
+
+        if resposta.status_code == 304 and linha is not None:
+            # Não mudou no servidor: a cópia gravada volta a valer por mais um TTL
+            self._contar("revalidacoes")
+            self._renovar(chave)
+            return self._resposta_da_linha(linha, revalidada=True)
+
+        self._contar("falhas")
+
+        deve_gravar = armazenar_se(resposta) if armazenar_se else resposta.status_code == 200
+        if deve_gravar:
+            self._gravar(chave, fonte, resposta)
+
+        return resposta
+
+    def _buscar_na_rede(self, url, params, headers, timeout, sessao, antes_da_rede) -> RespostaHTTP:
+        if antes_da_rede is not None and not antes_da_rede():
+            raise RequisicaoCancelada(url)
+
+        http = sessao or sessao_compartilhada()
+        resp = http.get(url, params=params, headers=headers, timeout=timeout)
+        return RespostaHTTP(
+            resp.url,
+            resp.status_code,
+            resp.content,
+            dict(resp.headers),
+            resp.encoding or resp.apparent_encoding,
+        )
+
+    def resumo(self) -> str:
+        with self._lock:
+            acertos, revalidacoes, falhas, expiradas = (
+                self.acertos, self.revalidacoes, self.falhas, self.expiradas_servidas
+            )
+        total = acertos + revalidacoes + falhas + expiradas
+        taxa = ((acertos + revalidacoes) / total * 100) if total else 0.0
+        texto = (
+            f"cache HTTP ({self.modo}): {acertos} acertos, {revalidacoes} revalidações (304), "
+            f"{falhas} falhas ({taxa:.0f}% de acerto)"
+        )
+        if expiradas:
+            texto += f", {expiradas} respostas expiradas servidas por falha de rede"
+        return texto
+
+
+# ============================================================
+# Instâncias compartilhadas por processo
+# ============================================================
+#
+# Quando o orquestrador (main/main.py) roda os coletores no mesmo processo,
+# todos reaproveitam a mesma sessão (keep-alive) e o mesmo cache.
+
+_sessao_padrao: requests.Session | None = None
+
+_cache_padrao: CacheHTTP | None = None
+_lock_padrao = threading.Lock()
+
+
+def sessao_compartilhada() -> requests.Session:
+    global _sessao_padrao
+    with _lock_padrao:
+        if _sessao_padrao is None:
+            _sessao_padrao = criar_sessao_http(tamanho_pool=16)
+        return _sessao_padrao
+
+
+def cache_padrao() -> CacheHTTP:
+    global _cache_padrao
+    with _lock_padrao:
+        if _cache_padrao is None:
+            _cache_padrao = CacheHTTP()
+        return _cache_padrao
@@ -0,0 +1,150 @@
+# scripts/cache_llm.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# ============================================================
+# Cache em disco das respostas do LLM (gravação / replay)
+# ============================================================
+#
+# Chave: sha256 do `llm_string` (modelo, temperatura e demais parâmetros)
+# + lista completa de mensagens. Mesmo prompt no mesmo modelo com os mesmos
+# parâmetros -> mesma resposta gravada. Serve ao ChatOpenAI do chat (como
+# `cache=` do LangChain) e aos agentes do CrewAI (LLMInstrumentado, em
+# llm_instrumentado.py, que chama lookup/update diretamente).
+#
+# Modos (variável de ambiente CACHE_LLM_MODO), no mesmo esquema do cache HTTP:
+#   - "desligado" (padrão): sempre chama a API, nada é gravado — a análise
+#                 diária nunca devolve a resposta de um dia anterior só
+#                 porque os dados de entrada não mudaram (fim de semana,
+#                 coletor parado);
+#   - "ativo":    serve respostas gravadas e grava as novas — uma execução
+#                 interrompida, ao ser repetida, só paga as chamadas que
+#                 ainda não tinham sido feitas (escolha explícita);
+#   - "replay":   serve SOMENTE respostas gravadas; uma chamada sem gravação
+#                 gera RespostaLLMNaoGravada (pipeline offline, sem API).
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+ARQUIVO_CACHE_LLM = Path(os.getenv("CACHE_LLM_ARQUIVO", DATA_DIR / ".cache" / "llm.sqlite"))
+
+MODO_CACHE_LLM = os.getenv("CACHE_LLM_MODO", "desligado").strip().lower()
+MODOS_VALIDOS = {"ativo", "replay", "desligado"}
+
+# Marca colocada nas mensagens servidas do cache (a telemetria não as cobra)
+METADADO_DO_CACHE = "do_cache_llm"
+
+
+class RespostaLLMNaoGravada(Exception):
+    """Chamada ao LLM sem resposta gravada no modo replay."""
+
+
+def chave_llm(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+
+class CacheLLMDisco(BaseCache):
+    def __init__(self, caminho: Path = ARQUIVO_CACHE_LLM, modo: str = MODO_CACHE_LLM):
+        if modo not in MODOS_VALIDOS:
+            raise ValueError(f"Modo de cache do LLM inválido: {modo!r} (use {sorted(MODOS_VALIDOS)}).")
+
+        self.modo = modo
+        self.acertos = 0
+        self.falhas = 0
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._caminho = Path(caminho)
+
+    def _conexao(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._caminho, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS respostas (
+                    chave TEXT PRIMARY KEY,
+                    geracoes BLOB NOT NULL,
+                    gravado_em REAL NOT NULL
+                )
+                """
+            )
+        return self._conn
+
+    # ---------------- interface BaseCache ---------------- #
+
+    def lookup(self, prompt: str, llm_string: str):
+        if self.modo == "desligado":
+            return None
+
+        with self._lock:
+            linha = self._conexao().execute(
+                "SELECT geracoes FROM respostas WHERE chave = ?", (chave_llm(prompt, llm_string),)
+            ).fetchone()
+
+        if linha is None:
+            self.falhas += 1
+            if self.modo == "replay":
+                raise RespostaLLMNaoGravada(
+                    "Sem resposta gravada para esta chamada ao LLM (modo replay). "
+                    "Rode uma vez com CACHE_LLM_MODO=ativo para gravar."
+                )
+            return None
+
+        self.acertos += 1
+        geracoes = [loads(g) for g in json.loads(zlib.decompress(linha[0]))]
+        for geracao in geracoes:
+            mensagem = getattr(geracao, "message", None)
+            if mensagem is not None:
+                mensagem.response_metadata = {**mensagem.response_metadata, METADADO_DO_CACHE: True}
+        return geracoes
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        if self.modo != "ativo":
+            return
+        corpo = zlib.compress(json.dumps([dumps(g) for g in return_val]).encode("utf-8"), 6)
+        with self._lock:
+            conn = self._conexao()
+            conn.execute(
+                "INSERT OR REPLACE INTO respostas VALUES (?, ?, ?)",
+                (chave_llm(prompt, llm_string), corpo, time.time()),
+            )
+            conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            conn = self._conexao()
+            conn.execute("DELETE FROM respostas")
+            conn.commit()
+
+    # ---------------- relatório ---------------- #
+
+    def resumo(self) -> str:
+        total = self.acertos + self.falhas
+        taxa = (self.acertos / total * 100) if total else 0.0
+        return f"cache LLM ({self.modo}): {self.acertos} acertos, {self.falhas} falhas ({taxa:.0f}% de acerto)"
+
+
+_cache_llm_padrao: CacheLLMDisco | None = None
+_lock_padrao = threading.Lock()
+
+
+def cache_llm_padrao() -> CacheLLMDisco | None:
+    """Instância compartilhada por processo; None no modo desligado."""
+    global _cache_llm_padrao
+    if MODO_CACHE_LLM == "desligado":
+        return None
+    with _lock_padrao:
+        if _cache_llm_padrao is None:
+            _cache_llm_padrao = CacheLLMDisco()
+        return _cache_llm_padrao
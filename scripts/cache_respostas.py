@@ -0,0 +1,215 @@
+# scripts/cache_respostas.py
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from cache_buscas import STOPWORDS_BUSCA
+from filtro_palavras import normalizar_texto
+
+# ============================================================
+# Cache semântico das respostas do chatbot (entre sessões)
+# ============================================================
+#
+# Perguntas quase iguais de usuários diferentes ("qual a SELIC agora?" /
+# "SELIC atual?") reaproveitam a mesma resposta em vez de uma nova chamada
+# ao LLM. Cada pergunta normalizada vira um vetor esparso por hashing
+# (palavras + trigramas de caracteres, sem vocabulário a treinar) e a busca
+# é um produto matricial em NumPy contra todas as perguntas guardadas.
+#
+# Salvaguardas:
+#   - similaridade de cosseno mínima (CACHE_RESPOSTAS_LIMIAR);
+#   - alguns termos precisam coincidir exatamente, além da similaridade:
+#     os com dígitos (tickers, anos, percentuais: "PETR4" x "PETR3"), os que
+#     dão a intenção da pergunta ("qual" x "explique", "agora" x "em 2020")
+#     e as negações ("vale a pena" x "não vale a pena");
+#   - as entradas valem para uma versão dos dados: quando a impressão
+#     digital dos arquivos muda, o cache é esvaziado;
+#   - capacidade fixa, com descarte do menos usado recentemente (LRU).
+
+LIMIAR_SIMILARIDADE = float(os.getenv("CACHE_RESPOSTAS_LIMIAR", "0.9"))
+CAPACIDADE_PADRAO = int(os.getenv("CACHE_RESPOSTAS_CAPACIDADE", "256"))
+
+DIMENSAO = 2**12
+PESO_TRIGRAMA = 0.5
+
+# Só palavras sem conteúdo nem intenção (artigos, preposições, cortesia)
+STOPWORDS_CACHE = STOPWORDS_BUSCA | {
+    "um", "uma", "ao", "aos", "me", "voce", "pode", "poderia", "sabe", "the", "is",
+}
+
+# Termos que mudam o que se pergunta: ficam no vetor E precisam coincidir
+TERMOS_INTENCAO = {
+    "qual", "quais", "quanto", "quanta", "quantos", "quantas", "como", "que", "quem",
+    "quando", "onde", "porque", "explique", "defina", "significa", "conceito",
+    "compare", "diferenca", "previsao", "projecao", "tendencia", "historico",
+    "what", "how", "why", "when",
+}
+NEGACOES = {"nao", "nunca", "sem", "nem", "jamais", "nenhum", "nenhuma", "not"}
+# Sinônimos de "agora" viram um único termo ("SELIC atual?" = "SELIC hoje?")
+SINONIMOS = {"hoje": "agora", "atual": "agora", "atualmente": "agora", "now": "agora"}
+
+_RE_PALAVRA = re.compile(r"\w+")
+
+
+def _exige_coincidencia(palavra: str) -> bool:
+    return (
+        palavra in TERMOS_INTENCAO
+        or palavra in NEGACOES
+        or palavra == "agora"
+        or any(c.isdigit() for c in palavra)
+    )
+
+
+def _termos(pergunta: str) -> tuple[list[str], frozenset[str]]:
+    """(termos para o vetor, termos que precisam coincidir exatamente)."""
+    palavras = [
+        SINONIMOS.get(p, p)
+        for p in _RE_PALAVRA.findall(normalizar_texto(pergunta))
+        if p not in STOPWORDS_CACHE or p in NEGACOES
+    ]
+    termos = list(palavras)
+    for palavra in palavras:
+        marcada = f" {palavra} "
+        termos.extend(f"#{marcada[i:i + 3]}" for i in range(len(marcada) - 2))
+    return termos, frozenset(p for p in palavras if _exige_coincidencia(p))
+
+
+def _hash_termo(termo: str) -> int:
+    return int.from_bytes(hashlib.blake2b(termo.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def vetorizar(pergunta: str) -> tuple[np.ndarray, frozenset[str]]:
+    """Vetor L2-normalizado (DIMENSAO,) por hashing com sinal + termos que precisam coincidir."""
+    termos, exatos = _termos(pergunta)
+    vetor = np.zeros(DIMENSAO, dtype=np.float32)
+    if not termos:
+        return vetor, exatos
+
+    hashes = np.fromiter((_hash_termo(t) for t in termos), dtype=np.uint64, count=len(termos))
+    indices = (hashes % DIMENSAO).astype(np.intp)
+    sinais = np.where((hashes >> np.uint64(63)) == 0, 1.0, -1.0).astype(np.float32)
+    pesos = np.array([PESO_TRIGRAMA if t.startswith("#") else 1.0 for t in termos], dtype=np.float32)
+    np.add.at(vetor, indices, sinais * pesos)
+
+    norma = np.linalg.norm(vetor)
+    if norma > 0:
+        vetor /= norma
+    return vetor, exatos
+
+
+@dataclass
+class RespostaEmCache:
+    pergunta: str
+    resposta: str
+    latencia_s: float  # tempo que a resposta original levou
+    termos_exatos: frozenset[str]
+    acertos: int = 0
+
+
+class CacheRespostas:
+    def __init__(
+        self,
+        capacidade: int = CAPACIDADE_PADRAO,
+        limiar: float = LIMIAR_SIMILARIDADE,
+    ):
+        self.capacidade = capacidade
+        self.limiar = limiar
+
+        self._vetores = np.zeros((capacidade, DIMENSAO), dtype=np.float32)
+        self._ocupados = np.zeros(capacidade, dtype=bool)
+        self._entradas: OrderedDict[int, RespostaEmCache] = OrderedDict()  # slot -> entrada, ordem LRU
+        self._versao_dados: str | None = None
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.invalidacoes = 0
+        self.latencia_economizada_s = 0.0
+        self.tempo_consultas_s = 0.0
+
+    def _validar_versao(self, versao_dados: str) -> None:
+        if versao_dados != self._versao_dados:
+            if self._entradas:
+                self.invalidacoes += 1
+            self._entradas.clear()
+            self._ocupados[:] = False
+            self._versao_dados = versao_dados
+
+    def buscar(self, pergunta: str, versao_dados: str) -> tuple[RespostaEmCache, float] | None:
+        """(entrada, similaridade) da pergunta guardada mais parecida, se passar do limiar."""
+        t0 = time.perf_counter()
+        vetor, exatos = vetorizar(pergunta)
+        with self._lock:
+            self._validar_versao(versao_dados)
+            encontrada = None
+            if self._entradas and vetor.any():
+                similaridades = self._vetores @ vetor
+                similaridades[~self._ocupados] = -1.0
+                # Candidatas da mais parecida para a menos, até o limiar
+                for slot in np.argsort(similaridades)[::-1]:
+                    similaridade = float(similaridades[slot])
+                    if similaridade < self.limiar:
+                        break
+                    if self._entradas[slot].termos_exatos == exatos:
+                        encontrada = (slot, similaridade)
+                        break
+
+            if encontrada is None:
+                self.falhas += 1
+                self.tempo_consultas_s += time.perf_counter() - t0
+                return None
+
+            slot, similaridade = encontrada
+            entrada = self._entradas[slot]
+            self._entradas.move_to_end(slot)
+            entrada.acertos += 1
+            self.acertos += 1
+            self.latencia_economizada_s += entrada.latencia_s
+            self.tempo_consultas_s += time.perf_counter() - t0
+            return entrada, similaridade
+
+    def guardar(self, pergunta: str, resposta: str, latencia_s: float, versao_dados: str) -> None:
+        vetor, exatos = vetorizar(pergunta)
+        if not vetor.any() or not resposta:
+            return
+        with self._lock:
+            self._validar_versao(versao_dados)
+            livres = np.flatnonzero(~self._ocupados)
+            if livres.size:
+                slot = int(livres[0])
+            else:
+                slot, _ = self._entradas.popitem(last=False)
+                self.descartes += 1
+
+            self._vetores[slot] = vetor
+            self._ocupados[slot] = True
+            self._entradas[slot] = RespostaEmCache(pergunta, resposta, latencia_s, exatos)
+
+    def metricas(self) -> dict:
+        total = self.acertos + self.falhas
+        return {
+            "entradas": len(self._entradas),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / total if total else 0.0,
+            "latencia_economizada_s": self.latencia_economizada_s,
+            "consulta_media_ms": self.tempo_consultas_s / total * 1000 if total else 0.0,
+            "descartes": self.descartes,
+            "invalidacoes": self.invalidacoes,
+        }
+
+    def resumo(self) -> str:
+        m = self.metricas()
+        return (
+            f"cache de respostas: {m['acertos']} acertos, {m['falhas']} falhas "
+            f"({m['taxa_acerto'] * 100:.0f}% de acerto) · {m['latencia_economizada_s']:.1f}s economizados · "
+            f"{m['entradas']}/{self.capacidade} entradas · consulta média {m['consulta_media_ms']:.2f} ms"
+        )
@@ -0,0 +1,162 @@
+# scripts/carregador_dados.py
+
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import armazenamento_precos
+import arquivo_noticias
+from armazenamento_precos import carregar_precos
+
+# ============================================================
+# Carregamento tipado dos datasets (dashboard + agentes)
+# ============================================================
+#
+# Cada dataset é lido com esquema explícito:
+#   - datas como datetime64 (formato conhecido, sem inferência);
+#   - preços em float32 e volume/valores em float64;
+#   - colunas repetitivas (ticker, indicador, fonte) como category.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+
+ARQUIVO_INDICADORES = DATA_DIR / "indicadores_economicos.csv"
+
+# O SGS devolve datas no formato brasileiro
+FORMATO_DATA_INDICADORES = "%d/%m/%Y"
+
+COLUNAS_PRECO_FLOAT32 = ["abertura", "alta", "baixa", "fechamento"]
+
+
+def _ler_csv(caminho: Path, **kwargs) -> pd.DataFrame:
+    if not caminho.exists():
+        raise FileNotFoundError(f"Arquivo {caminho.name} não encontrado em {caminho.parent}.")
+    return pd.read_csv(caminho, encoding="utf-8-sig", **kwargs)
+
+
+# ============================================================
+# Ações
+# ============================================================
+
+def carregar_acoes(
+    tickers: list[str] | None = None,
+    inicio=None,
+    fim=None,
+    ultimos_n: int | None = None,
+) -> pd.DataFrame:
+    """
+    Preços diários: [data, abertura, alta, baixa, fechamento, volume, ticker].
+    Aceita os mesmos filtros de janela de `carregar_precos`.
+    """
+    df = carregar_precos(tickers=tickers, inicio=inicio, fim=fim, ultimos_n=ultimos_n)
+
+    df["data"] = pd.to_datetime(df["data"])
+    df[COLUNAS_PRECO_FLOAT32] = df[COLUNAS_PRECO_FLOAT32].astype("float32")
+    df["volume"] = df["volume"].astype("float64")
+    df["ticker"] = df["ticker"].astype("category")
+    return df
+
+
+# ============================================================
+# Indicadores econômicos
+# ============================================================
+
+def carregar_indicadores(caminho: Path = ARQUIVO_INDICADORES) -> pd.DataFrame:
+    """Indicadores do BACEN: [data, valor, indicador, data_coleta]."""
+    df = _ler_csv(
+        caminho,
+        dtype={"valor": "float64", "indicador": "category"},
+    )
+    df["data"] = pd.to_datetime(df["data"], format=FORMATO_DATA_INDICADORES, errors="coerce")
+    df["data_coleta"] = pd.to_datetime(df["data_coleta"], errors="coerce")
+    return df.dropna(subset=["data", "valor"]).reset_index(drop=True)
+
+
+# ============================================================
+# Notícias
+# ============================================================
+
+def carregar_noticias(
+    ultimas_horas: float | None = None,
+    por_fonte: int | None = None,
+) -> pd.DataFrame:
+    """
+    Notícias do arquivo histórico, da mais recente para a mais antiga:
+    [titulo, link, fonte, data_coleta, palavras_chave].
+    Aceita os mesmos filtros de `arquivo_noticias.carregar`.
+    """
+    df = arquivo_noticias.carregar(ultimas_horas=ultimas_horas, por_fonte=por_fonte)
+
+    for coluna in arquivo_noticias.COLUNAS:
+        if coluna not in df.columns:
+            df[coluna] = None
+    df = df[arquivo_noticias.COLUNAS].copy()
+
+    df["titulo"] = df["titulo"].astype("string")
+    df["link"] = df["link"].astype("string")
+    df["palavras_chave"] = df["palavras_chave"].astype("string")
+    df["fonte"] = df["fonte"].astype("category")
+    df["data_coleta"] = pd.to_datetime(df["data_coleta"], errors="coerce")
+    return df
+
+
+# ============================================================
+# Impressão digital dos arquivos (invalidação de caches)
+# ============================================================
+#
+# Quem mantém datasets em memória (ex.: o painel Streamlit) usa a impressão
+# digital como parte da chave do cache: ela muda sempre que o pipeline
+# reescreve ou anexa arquivos, e calculá-la custa só um stat() por arquivo.
+
+# Arquivos e diretórios de onde cada dataset é lido
+ORIGENS = {
+    "acoes": (armazenamento_precos.DIR_PRECOS, armazenamento_precos.ARQUIVO_LEGADO),
+    "indicadores": (ARQUIVO_INDICADORES,),
+    "noticias": (arquivo_noticias.DIR_NOTICIAS, arquivo_noticias.ARQUIVO_LEGADO),
+}
+
+
+def impressao_digital(*caminhos: Path) -> str:
+    """
+    Hash curto de (caminho, tamanho, mtime) dos arquivos informados.
+    Diretórios entram como manifesto de todos os arquivos abaixo deles;
+    caminhos inexistentes também contam (o arquivo surgir muda o hash).
+    """
+    manifesto = []
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            arquivos = sorted(p for p in caminho.rglob("*") if p.is_file())
+        else:
+            arquivos = [caminho]
+
+        for arquivo in arquivos:
+            try:
+                info = arquivo.stat()
+                manifesto.append(f"{arquivo}|{info.st_size}|{info.st_mtime_ns}")
+            except FileNotFoundError:
+                manifesto.append(f"{arquivo}|ausente")
+
+    return hashlib.blake2b("\n".join(manifesto).encode("utf-8"), digest_size=12).hexdigest()
+
+
+def impressao_digital_dataset(nome: str) -> str:
+    return impressao_digital(*ORIGENS[nome])
+
+
+# ============================================================
+# Memória
+# ============================================================
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    """Memória ocupada pelo DataFrame (inclui strings), em MB."""
+    return df.memory_usage(deep=True).sum() / 1024**2
+
+
+def resumo_memoria(frames: dict[str, pd.DataFrame]) -> str:
+    linhas = [
+        f"   - {nome}: {len(df)} linhas, {memoria_mb(df):.3f} MB"
+        for nome, df in frames.items()
+    ]
+    return "🧮 Memória dos datasets carregados:\n" + "\n".join(linhas)
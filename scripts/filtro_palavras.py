@@ -0,0 +1,107 @@
+# scripts/filtro_palavras.py
+
+import re
+import unicodedata
+
+# ============================================================
+# Filtro de palavras-chave compilado (insensível a acentos)
+# ============================================================
+#
+# A lista de palavras é compilada UMA vez em uma única regex em forma de
+# trie (prefixos comuns compartilhados), aplicada sobre texto normalizado:
+# sem acentos e em minúsculas. Assim "inflacao" casa com "inflação" e o
+# custo por título deixa de crescer com o número de palavras-chave.
+
+
+def normalizar_texto(texto: str) -> str:
+    """Remove acentos (NFKD sem marcas combinantes) e aplica casefold."""
+    decomposto = unicodedata.normalize("NFKD", texto)
+    sem_acentos = "".join(c for c in decomposto if not unicodedata.combining(c))
+    return sem_acentos.casefold()
+
+
+_FIM = ""  # marcador de fim de palavra na trie
+
+
+def _montar_trie(palavras: list[str]) -> dict:
+    trie: dict = {}
+    for palavra in palavras:
+        no = trie
+        for caractere in palavra:
+            no = no.setdefault(caractere, {})
+        no[_FIM] = True
+    return trie
+
+
+def _regex_da_trie(no: dict) -> str:
+    ramos = []
+    termina_aqui = _FIM in no
+
+    for caractere in sorted(k for k in no if k != _FIM):
+        ramos.append(re.escape(caractere) + _regex_da_trie(no[caractere]))
+
+    if not ramos:
+        return ""
+
+    corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+    if termina_aqui:
+        # Palavra termina aqui, mas pode continuar (ex.: "taxa" / "taxa de juros")
+        return "(?:" + corpo + ")?"
+    return corpo
+
+
+class FiltroPalavrasChave:
+    """
+    Casa títulos contra uma lista de palavras-chave.
+
+    `encontrar(texto)` retorna as palavras-chave (na grafia original da
+    lista) presentes no texto, na ordem da lista, sem repetição.
+    """
+
+    def __init__(self, palavras: list[str]):
+        self._originais: dict[str, str] = {}
+        for palavra in palavras:
+            normalizada = normalizar_texto(palavra.strip())
+            if normalizada:
+                self._originais.setdefault(normalizada, palavra.strip())
+
+        self._ordem = {n: i for i, n in enumerate(self._originais)}
+        self._trie = _montar_trie(list(self._originais))
+
+        # Lookahead: testa todas as posições, permitindo palavras sobrepostas
+        # (ex.: "juros" dentro de "taxa de juros").
+        if self._originais:
+            self._regex = re.compile("(?=(" + _regex_da_trie(self._trie) + "))")
+        else:
+            self._regex = None
+
+    def _palavras_no_prefixo(self, trecho: str) -> list[str]:
+        """Todas as palavras-chave que são prefixo de `trecho` (caminho na trie)."""
+        achadas = []
+        no = self._trie
+        prefixo = []
+        for caractere in trecho:
+            no = no.get(caractere)
+            if no is None:
+                break
+            prefixo.append(caractere)
+            if _FIM in no:
+                achadas.append("".join(prefixo))
+        return achadas
+
+    def encontrar(self, texto: str) -> list[str]:
+        if self._regex is None or not texto:
+            return []
+
+        normalizadas = set()
+        for m in self._regex.finditer(normalizar_texto(texto)):
+            trecho = m.group(1)
+            if trecho:
+                normalizadas.update(self._palavras_no_prefixo(trecho))
+
+        return [self._originais[n] for n in sorted(normalizadas, key=self._ordem.__getitem__)]
+
+    def contem(self, texto: str) -> bool:
+        if self._regex is None or not texto:
+            return False
+        return any(m.group(1) for m in self._regex.finditer(normalizar_texto(texto)))
@@ -2,12 +2,15 @@
 
 import os
 import sys
-import requests
+import argparse
 import pandas as pd
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
+from cache_http import cache_padrao
+
 # ============================================================
 # Carregar variáveis de ambiente (.env para uso local)
 # (Aqui não há chave obrigatória, mas mantemos por consistência)
@@ -20,7 +23,7 @@ load_dotenv()
 
 # Diretório raiz do projeto (assumindo que este script está em scripts/)
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
 DATA_DIR.mkdir(exist_ok=True)
 
 ARQUIVO_SAIDA = DATA_DIR / "indicadores_economicos.csv"
@@ -38,106 +41,265 @@ INDICADORES_SGS = {
     "IGP-M": 189,
 }
 
+URL_SGS = os.getenv("BACEN_SGS_URL", "https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}/dados")
+
+# O SGS limita consultas por intervalo de datas de séries diárias a 10 anos
+JANELA_MAXIMA_ANOS = 10
+ANO_INICIAL_BACKFILL = 2000
+MAX_REQUISICOES_SIMULTANEAS = 6
+
+FORMATO_DATA_SGS = "%d/%m/%Y"
+
 # ============================================================
-# Função para coletar indicadores no BACEN (SGS)
+# Histórico persistente (o próprio CSV de saída)
 # ============================================================
 
-def coletar_indicadores_bacen(
+def carregar_historico(caminho: Path = ARQUIVO_SAIDA) -> pd.DataFrame:
+    """Lê o histórico já armazenado (vazio se o arquivo não existir)."""
+    colunas = ["data", "valor", "indicador", "data_coleta"]
+    if not caminho.exists():
+        return pd.DataFrame(columns=colunas)
+    try:
+        return pd.read_csv(caminho, encoding="utf-8-sig")
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(columns=colunas)
+
+
+def ultimas_observacoes(df_historico: pd.DataFrame) -> dict[str, date]:
+    """Data da observação mais recente de cada indicador no histórico."""
+    if df_historico.empty:
+        return {}
+    datas = pd.to_datetime(df_historico["data"], format=FORMATO_DATA_SGS, errors="coerce")
+    maximas = datas.groupby(df_historico["indicador"]).max().dropna()
+    return {nome: ts.date() for nome, ts in maximas.items()}
+
+
+def mesclar_historico(df_historico: pd.DataFrame, df_novo: pd.DataFrame) -> pd.DataFrame:
+    """Une histórico e novas observações sem duplicar (indicador, data)."""
+    df = pd.concat([df_historico, df_novo], ignore_index=True)
+    df["_data"] = pd.to_datetime(df["data"], format=FORMATO_DATA_SGS, errors="coerce")
+    df = (
+        df.dropna(subset=["_data"])
+        .drop_duplicates(subset=["indicador", "_data"], keep="last")
+        .sort_values(["indicador", "_data"], kind="stable")
+        .drop(columns=["_data"])
+        .reset_index(drop=True)
+    )
+    return df
+
+
+# ============================================================
+# Planejamento das requisições
+# ============================================================
+
+def janelas_de_datas(inicio: date, fim: date, anos: int = JANELA_MAXIMA_ANOS) -> list[tuple[date, date]]:
+    """Divide [inicio, fim] em janelas consecutivas de no máximo `anos` anos."""
+    janelas = []
+    atual = inicio
+    while atual <= fim:
+        try:
+            limite = atual.replace(year=atual.year + anos) - timedelta(days=1)
+        except ValueError:  # 29/02
+            limite = atual.replace(year=atual.year + anos, day=28) - timedelta(days=1)
+        janela_fim = min(limite, fim)
+        janelas.append((atual, janela_fim))
+        atual = janela_fim + timedelta(days=1)
+    return janelas
+
+
+def planejar_requisicoes(
     indicadores: dict,
-    n_ultimos: int = 20
-) -> pd.DataFrame:
+    n_ultimos: int,
+    ultimas_datas: dict[str, date],
+    backfill_desde: date | None = None,
+) -> list[tuple[str, int, dict]]:
     """
-    Coleta os últimos `n_ultimos` registros de cada série do SGS (BACEN)
-    e retorna um DataFrame consolidado com as colunas:
-    [data, valor, indicador, data_coleta].
+    Gera a lista de (nome, código, parâmetros) a consultar.
+
+    - backfill: janelas de até JANELA_MAXIMA_ANOS desde `backfill_desde`;
+    - incremental: apenas datas posteriores à última observação armazenada;
+    - série sem histórico: últimas `n_ultimos` observações.
     """
-    todos_dados = []
+    hoje = datetime.now().date()
+    plano = []
 
     for nome, codigo in indicadores.items():
-        url = (
-            f"https://api.bcb.gov.br/dados/serie/bcdata.sgs.{codigo}"
-            f"/dados/ultimos/{n_ultimos}?formato=json"
-        )
-
-        print(f"🔄 Coletando indicador '{nome}' (código {codigo}) do BACEN...")
-        try:
-            response = requests.get(url, timeout=30)
-        except Exception as e:
-            print(f"❌ Erro de conexão ao buscar {nome} (código {codigo}): {e}")
+        if backfill_desde is not None:
+            for inicio, fim in janelas_de_datas(backfill_desde, hoje):
+                plano.append((nome, codigo, {"dataInicial": inicio, "dataFinal": fim}))
             continue
 
-        if response.status_code != 200:
-            print(
-                f"❌ Erro HTTP ao buscar {nome} (código {codigo}). "
-                f"Status: {response.status_code}"
-            )
-            continue
+        ultima = ultimas_datas.get(nome)
+        if ultima is None:
+            plano.append((nome, codigo, {"ultimos": n_ultimos}))
+        elif ultima < hoje:
+            inicio = ultima + timedelta(days=1)
+            for janela_inicio, janela_fim in janelas_de_datas(inicio, hoje):
+                plano.append((nome, codigo, {"dataInicial": janela_inicio, "dataFinal": janela_fim}))
+        else:
+            print(f"⏭️ {nome} já está atualizado até {ultima.strftime(FORMATO_DATA_SGS)}.")
 
-        try:
-            dados = response.json()
-        except Exception as e:
-            print(f"❌ Erro ao decodificar JSON para {nome}: {e}")
-            continue
+    return plano
 
-        if not dados:
-            print(f"ℹ️ Nenhum dado retornado para {nome}.")
-            continue
 
-        df = pd.DataFrame(dados)
+def _montar_requisicao(codigo: int, parametros: dict) -> tuple[str, dict]:
+    base = URL_SGS.format(codigo=codigo)
+    if "ultimos" in parametros:
+        return f"{base}/ultimos/{parametros['ultimos']}", {"formato": "json"}
+    return base, {
+        "formato": "json",
+        "dataInicial": parametros["dataInicial"].strftime(FORMATO_DATA_SGS),
+        "dataFinal": parametros["dataFinal"].strftime(FORMATO_DATA_SGS),
+    }
 
-        # Algumas séries vêm com 'valor' em formato string com vírgula
-        if "valor" not in df.columns or "data" not in df.columns:
-            print(f"⚠️ Estrutura inesperada ao buscar {nome}: {df.columns.tolist()}")
-            continue
 
-        df["valor"] = (
-            df["valor"]
-            .astype(str)
-            .str.replace(",", ".", regex=False)
+# ============================================================
+# Função para coletar uma série no BACEN (SGS)
+# ============================================================
+
+def buscar_serie_sgs(nome: str, codigo: int, parametros: dict) -> pd.DataFrame | None:
+    url, params = _montar_requisicao(codigo, parametros)
+    if "ultimos" in parametros:
+        periodo = f"últimos {parametros['ultimos']}"
+    else:
+        periodo = f"{params['dataInicial']} a {params['dataFinal']}"
+
+    print(f"🔄 Coletando indicador '{nome}' (código {codigo}, {periodo}) do BACEN...")
+    try:
+        response = cache_padrao().get(url, params=params, fonte="bacen", timeout=30)
+    except Exception as e:
+        print(f"❌ Erro de conexão ao buscar {nome} (código {codigo}): {e}")
+        return None
+
+    # O SGS responde 404 quando não há observações no intervalo pedido
+    if response.status_code == 404 and "ultimos" not in parametros:
+        print(f"ℹ️ Sem observações novas para {nome} em {periodo}.")
+        return None
+
+    if response.status_code != 200:
+        print(
+            f"❌ Erro HTTP ao buscar {nome} (código {codigo}). "
+            f"Status: {response.status_code}"
         )
+        return None
 
-        # Converter para float, descartando valores que não convertem
-        df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
-        df.dropna(subset=["valor"], inplace=True)
+    try:
+        dados = response.json()
+    except Exception as e:
+        print(f"❌ Erro ao decodificar JSON para {nome}: {e}")
+        return None
 
-        if df.empty:
-            print(f"ℹ️ Após conversão, não há valores numéricos válidos para {nome}.")
-            continue
+    if not dados:
+        print(f"ℹ️ Nenhum dado retornado para {nome}.")
+        return None
 
-        df["indicador"] = nome
-        df["data_coleta"] = datetime.now().date()
+    df = pd.DataFrame(dados)
 
-        todos_dados.append(df)
+    # Algumas séries vêm com 'valor' em formato string com vírgula
+    if "valor" not in df.columns or "data" not in df.columns:
+        print(f"⚠️ Estrutura inesperada ao buscar {nome}: {df.columns.tolist()}")
+        return None
 
-    if not todos_dados:
-        print("⚠️ Nenhum indicador pôde ser coletado com sucesso.")
+    df["valor"] = (
+        df["valor"]
+        .astype(str)
+        .str.replace(",", ".", regex=False)
+    )
+
+    # Converter para float, descartando valores que não convertem
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    df.dropna(subset=["valor"], inplace=True)
+
+    if df.empty:
+        print(f"ℹ️ Após conversão, não há valores numéricos válidos para {nome}.")
+        return None
+
+    df["indicador"] = nome
+    df["data_coleta"] = datetime.now().date()
+
+    return df[["data", "valor", "indicador", "data_coleta"]]
+
+
+def coletar_indicadores_bacen(
+    indicadores: dict,
+    n_ultimos: int = 20,
+    ultimas_datas: dict[str, date] | None = None,
+    backfill_desde: date | None = None,
+    max_workers: int = MAX_REQUISICOES_SIMULTANEAS,
+) -> pd.DataFrame:
+    """
+    Coleta as séries do SGS (BACEN) em paralelo e retorna um DataFrame
+    consolidado com as colunas: [data, valor, indicador, data_coleta].
+
+    Com `ultimas_datas`, pede apenas observações posteriores à última
+    armazenada de cada série; com `backfill_desde`, baixa o histórico longo
+    em janelas que respeitam o limite de intervalo do SGS.
+    """
+    plano = planejar_requisicoes(indicadores, n_ultimos, ultimas_datas or {}, backfill_desde)
+    if not plano:
         return pd.DataFrame(columns=["data", "valor", "indicador", "data_coleta"])
 
-    df_final = pd.concat(todos_dados, ignore_index=True)
-    df_final.rename(columns={"data": "data", "valor": "valor"}, inplace=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        resultados = list(executor.map(lambda req: buscar_serie_sgs(*req), plano))
 
-    return df_final
+    todos_dados = [df for df in resultados if df is not None]
+
+    if not todos_dados:
+        print("ℹ️ Nenhuma observação nova foi coletada.")
+        return pd.DataFrame(columns=["data", "valor", "indicador", "data_coleta"])
+
+    return pd.concat(todos_dados, ignore_index=True)
 
 
 # ============================================================
 # Execução principal
 # ============================================================
 
-def main():
-    df_indicadores = coletar_indicadores_bacen(INDICADORES_SGS, n_ultimos=20)
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Coleta incremental de indicadores do BACEN (SGS).")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Baixa o histórico longo de todas as séries em janelas de até 10 anos.",
+    )
+    parser.add_argument(
+        "--desde",
+        type=int,
+        default=ANO_INICIAL_BACKFILL,
+        help=f"Ano inicial do backfill (padrão: {ANO_INICIAL_BACKFILL}).",
+    )
+    # argv explícito: chamado pelo orquestrador, não herda o sys.argv dele
+    args = parser.parse_args(argv or [])
+
+    df_historico = carregar_historico()
+    backfill_desde = date(args.desde, 1, 1) if args.backfill else None
 
-    if df_indicadores.empty:
-        print("ℹ️ Nenhum dado consolidado para salvar em CSV.")
+    df_novos = coletar_indicadores_bacen(
+        INDICADORES_SGS,
+        n_ultimos=20,
+        ultimas_datas=ultimas_observacoes(df_historico),
+        backfill_desde=backfill_desde,
+    )
+    print(f"🗃️ {cache_padrao().resumo()}")
+
+    if df_novos.empty:
+        print("ℹ️ Nenhum dado novo para salvar em CSV.")
         # Não consideramos isso um erro fatal para CI/CD, então não damos sys.exit(1)
         return
 
+    df_indicadores = mesclar_historico(df_historico, df_novos)
+    adicionadas = len(df_indicadores) - len(df_historico)
+
     try:
         df_indicadores.to_csv(ARQUIVO_SAIDA, index=False, encoding="utf-8-sig")
-        print(f"✅ Arquivo '{ARQUIVO_SAIDA}' salvo com sucesso ({len(df_indicadores)} linhas).")
+        print(
+            f"✅ Arquivo '{ARQUIVO_SAIDA}' salvo com sucesso "
+            f"({len(df_indicadores)} linhas, {adicionadas} novas)."
+        )
     except Exception as e:
         print(f"❌ Erro ao salvar arquivo '{ARQUIVO_SAIDA}': {e}")
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1:])
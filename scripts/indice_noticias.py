@@ -0,0 +1,204 @@
+# scripts/indice_noticias.py
+
+import hashlib
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from filtro_palavras import normalizar_texto
+
+# ============================================================
+# Índice persistente de notícias já vistas (entre execuções)
+# ============================================================
+#
+# Duas chaves de deduplicação:
+#   1. URL canônica: sem parâmetros de rastreamento, fragmento, "www.",
+#      barra final e diferença http/https;
+#   2. MinHash das palavras do título: títulos quase iguais (mesma matéria
+#      republicada por outro portal, com pequenas edições) têm assinaturas
+#      com alta proporção de componentes iguais.
+#
+# A busca por títulos parecidos usa LSH (16 faixas de 4 componentes): só são
+# comparados os títulos que compartilham alguma faixa inteira com o novo —
+# O(1) amortizado em vez de varrer o histórico.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+ARQUIVO_INDICE = DATA_DIR / "indice_noticias.json"
+
+DIAS_RETENCAO = 30
+NUM_PERMUTACOES = 64
+LINHAS_POR_FAIXA = 4
+SIMILARIDADE_MINIMA = 0.7  # Jaccard estimado para considerar quase duplicado
+
+PARAMS_RASTREAMENTO = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "cmpid", "origem", "origin", "from", "amp",
+}
+PREFIXOS_RASTREAMENTO = ("utm_", "__twitter", "_ga")
+
+# Palavras muito frequentes não ajudam a distinguir títulos
+STOPWORDS = {
+    "a", "o", "as", "os", "de", "do", "da", "dos", "das", "e", "em", "no", "na",
+    "nos", "nas", "com", "para", "por", "ao", "aos", "um", "uma", "que", "se",
+}
+
+
+def canonizar_url(url: str) -> str:
+    partes = urlsplit(url.strip())
+    host = partes.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+
+    caminho = partes.path or "/"
+    if caminho.endswith("/amp") or caminho.endswith("/amp/"):
+        caminho = caminho.rstrip("/")[: -len("/amp")] or "/"
+    if len(caminho) > 1:
+        caminho = caminho.rstrip("/")
+
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if k.lower() not in PARAMS_RASTREAMENTO and not k.lower().startswith(PREFIXOS_RASTREAMENTO)
+    )
+
+    # http e https apontam para a mesma matéria
+    return urlunsplit(("https", host, caminho, urlencode(query), ""))
+
+
+_RE_PALAVRA = re.compile(r"\w+")
+_PRIMO = (1 << 61) - 1
+_rng = random.Random(20240601)  # semente fixa: assinaturas estáveis entre execuções
+_COEFICIENTES = [
+    (_rng.randrange(1, _PRIMO), _rng.randrange(0, _PRIMO))
+    for _ in range(NUM_PERMUTACOES)
+]
+
+
+def _hash32(texto: str) -> int:
+    return int.from_bytes(hashlib.blake2b(texto.encode("utf-8"), digest_size=4).digest(), "big")
+
+
+def palavras_titulo(titulo: str) -> set[str]:
+    return {
+        p for p in _RE_PALAVRA.findall(normalizar_texto(titulo))
+        if p not in STOPWORDS
+    }
+
+
+def minhash(titulo: str) -> tuple[int, ...]:
+    """Assinatura MinHash (NUM_PERMUTACOES componentes) das palavras do título."""
+    palavras = palavras_titulo(titulo)
+    if not palavras:
+        return tuple([0] * NUM_PERMUTACOES)
+
+    hashes = [_hash32(p) for p in palavras]
+    # Cada permutação é simulada por h(x) = (a*x + b) mod p
+    return tuple(
+        min((a * x + b) % _PRIMO for x in hashes) & 0xFFFFFFFF
+        for a, b in _COEFICIENTES
+    )
+
+
+def _faixas(assinatura: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+    return [
+        (i, assinatura[i * LINHAS_POR_FAIXA:(i + 1) * LINHAS_POR_FAIXA])
+        for i in range(NUM_PERMUTACOES // LINHAS_POR_FAIXA)
+    ]
+
+
+def similaridade(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Jaccard estimado: fração de componentes iguais nas assinaturas."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTACOES
+
+
+class IndiceNoticias:
+    def __init__(self, caminho: Path = ARQUIVO_INDICE, dias_retencao: int = DIAS_RETENCAO):
+        self.caminho = Path(caminho)
+        self.dias_retencao = dias_retencao
+
+        self._urls: dict[str, str] = {}  # url canônica -> data em que foi vista
+        self._titulos: dict[tuple[int, ...], str] = {}  # minhash -> data em que foi visto
+        self._faixas: dict[tuple[int, tuple[int, ...]], set[tuple[int, ...]]] = {}
+
+        self._carregar()
+
+    # ---------------- persistência ---------------- #
+
+    def _carregar(self) -> None:
+        if not self.caminho.exists():
+            return
+        try:
+            dados = json.loads(self.caminho.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Índice de notícias ilegível ({e}); começando um novo.")
+            return
+
+        limite = (datetime.now() - timedelta(days=self.dias_retencao)).strftime("%Y-%m-%d")
+        for url, visto_em in dados.get("urls", {}).items():
+            if visto_em >= limite:
+                self._urls[url] = visto_em
+        for assinatura, visto_em in dados.get("titulos", []):
+            if visto_em >= limite:
+                self._adicionar_titulo(tuple(assinatura), visto_em)
+
+    def salvar(self) -> None:
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        dados = {
+            "urls": self._urls,
+            "titulos": [[list(assinatura), visto_em] for assinatura, visto_em in self._titulos.items()],
+        }
+        temporario = self.caminho.with_suffix(".tmp")
+        temporario.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+        temporario.replace(self.caminho)
+
+    # ---------------- consultas ---------------- #
+
+    def _adicionar_titulo(self, assinatura: tuple[int, ...], visto_em: str) -> None:
+        self._titulos[assinatura] = visto_em
+        for faixa in _faixas(assinatura):
+            self._faixas.setdefault(faixa, set()).add(assinatura)
+
+    def titulo_parecido(self, assinatura: tuple[int, ...]) -> bool:
+        candidatos = set()
+        for faixa in _faixas(assinatura):
+            candidatos.update(self._faixas.get(faixa, ()))
+        return any(similaridade(assinatura, c) >= SIMILARIDADE_MINIMA for c in candidatos)
+
+    def motivo_duplicata(self, link: str, titulo: str) -> str | None:
+        """Retorna 'url', 'titulo' ou None (notícia nova)."""
+        if canonizar_url(link) in self._urls:
+            return "url"
+        if self.titulo_parecido(minhash(titulo)):
+            return "titulo"
+        return None
+
+    def registrar(self, link: str, titulo: str, visto_em: str | None = None) -> None:
+        visto_em = visto_em or datetime.now().strftime("%Y-%m-%d")
+        self._urls[canonizar_url(link)] = visto_em
+        self._adicionar_titulo(minhash(titulo), visto_em)
+
+    def filtrar_novas(self, noticias: list[dict]) -> tuple[list[dict], dict[str, int]]:
+        """
+        Mantém apenas notícias nunca vistas (nem nesta execução nem nas
+        anteriores) e as registra no índice. Retorna (novas, contagem por motivo).
+        """
+        novas = []
+        descartes = {"url": 0, "titulo": 0}
+
+        for noticia in noticias:
+            motivo = self.motivo_duplicata(noticia["link"], noticia["titulo"])
+            if motivo:
+                descartes[motivo] += 1
+                continue
+            self.registrar(noticia["link"], noticia["titulo"])
+            novas.append(noticia)
+
+        return novas, descartes
+
+    def __len__(self) -> int:
+        return len(self._urls)
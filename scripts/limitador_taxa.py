@@ -0,0 +1,151 @@
+# scripts/limitador_taxa.py
+
+import threading
+import time
+from contextlib import contextmanager
+
+# ============================================================
+# Limitador de taxa (token bucket) para APIs com cota
+# ============================================================
+
+class LimitadorDeTaxa:
+    """
+    Token bucket thread-safe com limite por minuto e, opcionalmente, por dia.
+
+    - `chamadas_por_minuto`: capacidade do balde, reposto continuamente
+      (ex.: 5/min → 1 token a cada 12s).
+    - `chamadas_por_dia`: teto absoluto de chamadas nesta execução
+      (None = sem teto diário).
+
+    `adquirir()` bloqueia até haver token disponível e retorna False
+    apenas quando a cota diária já foi consumida.
+    """
+
+    def __init__(
+        self,
+        chamadas_por_minuto: float,
+        chamadas_por_dia: int | None = None,
+        rajada: int | None = None,
+    ):
+        if chamadas_por_minuto <= 0:
+            raise ValueError("chamadas_por_minuto deve ser maior que zero.")
+
+        self.taxa_por_segundo = chamadas_por_minuto / 60.0
+        # Capacidade do balde: por padrão 1 (sem rajadas), para não estourar
+        # a janela deslizante que algumas APIs (Alpha Vantage) aplicam.
+        self.capacidade = float(rajada if rajada is not None else 1)
+        self.chamadas_por_dia = chamadas_por_dia
+
+        self._tokens = self.capacidade
+        self._ultimo_reabastecimento = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.chamadas_realizadas = 0
+        self._inicio: float | None = None
+        self._ultima_chamada: float | None = None
+
+    def _reabastecer(self, agora: float) -> None:
+        decorrido = agora - self._ultimo_reabastecimento
+        self._tokens = min(self.capacidade, self._tokens + decorrido * self.taxa_por_segundo)
+        self._ultimo_reabastecimento = agora
+
+    def adquirir(self) -> bool:
+        """Bloqueia até liberar uma chamada. Retorna False se a cota diária acabou."""
+        while True:
+            with self._lock:
+                if self.chamadas_por_dia is not None and self.chamadas_realizadas >= self.chamadas_por_dia:
+                    return False
+
+                agora = time.monotonic()
+                self._reabastecer(agora)
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.chamadas_realizadas += 1
+                    if self._inicio is None:
+                        self._inicio = agora
+                    self._ultima_chamada = agora
+                    return True
+
+                espera = (1 - self._tokens) / self.taxa_por_segundo
+
+            time.sleep(espera)
+
+    def chamadas_por_minuto_atingidas(self) -> float:
+        """Taxa efetiva observada entre a primeira e a última chamada liberada."""
+        if self.chamadas_realizadas < 2 or self._inicio is None or self._ultima_chamada is None:
+            return 0.0
+        janela = self._ultima_chamada - self._inicio
+        if janela <= 0:
+            return 0.0
+        # n chamadas liberadas ocupam (n - 1) intervalos
+        return (self.chamadas_realizadas - 1) / janela * 60.0
+
+
+# ============================================================
+# Limite de chamadas simultâneas (com medição da fila)
+# ============================================================
+
+class LimiteConcorrencia:
+    """
+    Semáforo que limita quantas chamadas ficam em andamento ao mesmo tempo.
+    Quem excede o limite espera na fila em vez de disparar outra requisição
+    (e levar um erro de rate limit do provedor).
+
+    `vaga()` é um context manager que devolve quantos segundos se esperou.
+    """
+
+    def __init__(self, maximo: int, espera_maxima: float | None = None):
+        if maximo <= 0:
+            raise ValueError("maximo deve ser maior que zero.")
+
+        self.maximo = maximo
+        self.espera_maxima = espera_maxima
+        self._semaforo = threading.BoundedSemaphore(maximo)
+        self._lock = threading.Lock()
+
+        self.em_andamento = 0
+        self.na_fila = 0
+        self.liberadas = 0
+        self.esperas_longas = 0  # desistências por espera_maxima
+        self.espera_total = 0.0
+        self.espera_maior = 0.0
+
+    @contextmanager
+    def vaga(self):
+        t0 = time.monotonic()
+        with self._lock:
+            self.na_fila += 1
+        try:
+            obtida = self._semaforo.acquire(timeout=self.espera_maxima)
+        finally:
+            with self._lock:
+                self.na_fila -= 1
+        espera = time.monotonic() - t0
+
+        if not obtida:
+            with self._lock:
+                self.esperas_longas += 1
+            raise TimeoutError(
+                f"Nenhuma vaga livre após {espera:.1f}s ({self.maximo} chamadas simultâneas em andamento)."
+            )
+
+        with self._lock:
+            self.em_andamento += 1
+            self.liberadas += 1
+            self.espera_total += espera
+            self.espera_maior = max(self.espera_maior, espera)
+        try:
+            yield espera
+        finally:
+            with self._lock:
+                self.em_andamento -= 1
+            self._semaforo.release()
+
+    def resumo(self) -> str:
+        media = self.espera_total / self.liberadas if self.liberadas else 0.0
+        return (
+            f"{self.em_andamento}/{self.maximo} em andamento · {self.na_fila} na fila · "
+            f"espera média {media:.2f}s (máx. {self.espera_maior:.2f}s) em {self.liberadas} chamadas"
+            + (f" · {self.esperas_longas} desistências" if self.esperas_longas else "")
+        )
@@ -0,0 +1,188 @@
+# scripts/llm_instrumentado.py
+
+import json
+import threading
+import time
+from typing import Any
+
+from crewai import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+from langchain_core.outputs import Generation
+from pydantic import Field, PrivateAttr
+
+from telemetria import custo_estimado
+
+# ============================================================
+# LLM dos agentes do CrewAI (cache em disco, tokens e telemetria)
+# ============================================================
+#
+# O CrewAI 1.x converte qualquer modelo que não seja um BaseLLM seu no
+# próprio LLM nativo: `cache=` e `callbacks=` de um ChatOpenAI do LangChain
+# seriam descartados. Este BaseLLM fala direto com a API de chat da OpenAI
+# (SDK `openai`) e usa só a interface pública do BaseLLM (call e os
+# métodos supports_* / get_*), sem depender de atributos internos:
+#   - o cache em disco (cache_llm.CacheLLMDisco) é consultado antes da API;
+#     no modo replay, uma chamada sem gravação gera RespostaLLMNaoGravada
+#     sem tocar na rede;
+#   - os tokens vêm do `usage` de cada resposta da API e são somados aqui
+#     (get_token_usage_summary, que é o que crew.usage_metrics soma);
+#   - cada chamada vira uma linha da telemetria (duração, tokens e custo),
+#     atribuída ao agente deste LLM — os `callbacks=` do LangChain, que
+#     faziam isso antes, também são descartados pelo CrewAI 1.x.
+
+# Janela do gpt-4.1 / gpt-4.1-mini, com margem para a resposta
+JANELA_CONTEXTO_TOKENS = int(1_047_576 * 0.85)
+
+# Palavra de parada do formato de texto do CrewAI (Thought/Action/Observation):
+# o modelo para antes de inventar o resultado da ferramenta
+PARADAS_REACT = ["\nObservation:"]
+
+
+class LLMInstrumentado(BaseLLM):
+    """
+    LLM dos agentes com cache em disco e telemetria. `cliente` é um cliente
+    da API de chat da OpenAI (openai.OpenAI ou compatível); `telemetria`,
+    `agente` e `tarefa` são opcionais (sem `tarefa`, vale a tarefa atual
+    da telemetria).
+
+    Com o cache ativo (modos ativo/replay), as ferramentas seguem o formato
+    de texto (Thought/Action/Observation), não o function calling nativo:
+    toda resposta é texto e os prompts são os mesmos ao gravar e ao
+    reproduzir. Sem cache, o function calling nativo continua disponível.
+    """
+
+    cliente: Any = Field(exclude=True)
+    cache: Any = Field(default=None, exclude=True)
+    telemetria: Any = Field(default=None, exclude=True)
+    agente: str | None = None
+    tarefa: str | None = None
+
+    _uso: dict = PrivateAttr(
+        default_factory=lambda: {
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "successful_requests": 0,
+        }
+    )
+    _lock_uso: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def supports_function_calling(self) -> bool:
+        return self.cache is None
+
+    def supports_stop_words(self) -> bool:
+        return True
+
+    def get_context_window_size(self) -> int:
+        return JANELA_CONTEXTO_TOKENS
+
+    def get_token_usage_summary(self) -> UsageMetrics:
+        with self._lock_uso:
+            return UsageMetrics(**self._uso)
+
+    # ---------------- API ---------------- #
+
+    def _paradas(self, tools) -> list[str] | None:
+        if tools:
+            return None  # function calling nativo: sem o formato de texto
+        return list(dict.fromkeys([*self.stop, *PARADAS_REACT]))
+
+    def _completar(self, messages: list[dict], tools=None, available_functions=None) -> tuple[Any, tuple[int, int]]:
+        """(resposta, (tokens de prompt, tokens de resposta)) de uma chamada à API."""
+        parametros = {"model": self.model, "messages": messages, "temperature": self.temperature}
+        paradas = self._paradas(tools)
+        if paradas:
+            parametros["stop"] = paradas
+        if tools:
+            parametros["tools"] = tools
+        resposta = self.cliente.chat.completions.create(**parametros)
+
+        uso = getattr(resposta, "usage", None)
+        tokens_prompt = int(getattr(uso, "prompt_tokens", 0) or 0)
+        tokens_resposta = int(getattr(uso, "completion_tokens", 0) or 0)
+        with self._lock_uso:
+            self._uso["prompt_tokens"] += tokens_prompt
+            self._uso["completion_tokens"] += tokens_resposta
+            self._uso["total_tokens"] += tokens_prompt + tokens_resposta
+            self._uso["successful_requests"] += 1
+
+        mensagem = resposta.choices[0].message
+        chamadas = getattr(mensagem, "tool_calls", None)
+        if chamadas:
+            if not available_functions:
+                return chamadas, (tokens_prompt, tokens_resposta)  # o executor do agente roda a ferramenta
+            funcao = chamadas[0].function
+            resultado = available_functions[funcao.name](**json.loads(funcao.arguments or "{}"))
+            return resultado, (tokens_prompt, tokens_resposta)
+        return mensagem.content or "", (tokens_prompt, tokens_resposta)
+
+    # ---------------- cache ---------------- #
+
+    def _chave(self, messages: list[dict]) -> tuple[str, str]:
+        prompt = json.dumps(messages, ensure_ascii=False, sort_keys=True, default=str)
+        parametros = json.dumps(
+            {"model": self.model, "temperature": self.temperature, "stop": self._paradas(None)},
+            sort_keys=True,
+        )
+        return prompt, parametros
+
+    def responder(self, messages, tools=None, available_functions=None) -> tuple[Any, tuple[int, int], bool]:
+        """(resposta, (tokens de prompt, tokens de resposta), veio do cache)."""
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        if self.cache is None or tools:
+            return (*self._completar(messages, tools, available_functions), False)
+
+        prompt, parametros = self._chave(messages)
+        gravadas = self.cache.lookup(prompt, parametros)  # no replay, falha sem gravação
+        if gravadas:
+            return gravadas[0].text, (0, 0), True
+
+        resposta, uso = self._completar(messages)
+        self.cache.update(prompt, parametros, [Generation(text=resposta)])
+        return resposta, uso, False
+
+    def call(
+        self,
+        messages,
+        tools=None,
+        callbacks=None,
+        available_functions=None,
+        from_task=None,
+        from_agent=None,
+        response_model=None,
+    ) -> Any:
+        if self.telemetria is None:
+            return self.responder(messages, tools, available_functions)[0]
+
+        inicio = time.time()
+        t0 = time.perf_counter()
+        try:
+            resposta, (tokens_prompt, tokens_resposta), do_cache = self.responder(
+                messages, tools, available_functions
+            )
+        except Exception as e:
+            self.telemetria.registrar_chamada(
+                "llm",
+                self.model,
+                inicio,
+                time.perf_counter() - t0,
+                agente=self.agente,
+                tarefa=self.tarefa,
+                erro=repr(e),
+            )
+            raise
+
+        self.telemetria.registrar_chamada(
+            "llm",
+            f"{self.model} (cache)" if do_cache else self.model,
+            inicio,
+            time.perf_counter() - t0,
+            tokens_prompt,
+            tokens_resposta,
+            # Respostas servidas do cache em disco não são cobradas
+            0.0 if do_cache else custo_estimado(self.model, tokens_prompt, tokens_resposta),
+            agente=self.agente,
+            tarefa=self.tarefa,
+        )
+        return resposta
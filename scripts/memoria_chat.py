@@ -0,0 +1,134 @@
+# scripts/memoria_chat.py
+
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+from resumo_contexto import estimar_tokens, linhas_no_orcamento
+
+# ============================================================
+# Memória limitada da conversa do chatbot
+# ============================================================
+#
+# Reenviar o histórico inteiro a cada pergunta faz o prompt (e a latência)
+# crescer sem limite ao longo da conversa. A memória guarda:
+#   - as últimas K trocas na íntegra;
+#   - um resumo das trocas anteriores, atualizado incrementalmente: cada
+#     troca que sai da janela é "dobrada" no resumo (resumo anterior +
+#     trocas que saíram -> novo resumo), nunca a conversa inteira de novo.
+# O total (resumo + janela) respeita um orçamento de tokens, de modo que o
+# custo de cada pergunta fica praticamente constante.
+
+TROCAS_INTEGRAIS = int(os.getenv("CHAT_MEMORIA_TROCAS", "4"))
+MEMORIA_MAX_TOKENS = int(os.getenv("CHAT_MEMORIA_MAX_TOKENS", "1500"))
+RESUMO_MAX_TOKENS = int(os.getenv("CHAT_MEMORIA_RESUMO_MAX_TOKENS", "400"))
+
+# Respostas muito longas são guardadas truncadas
+MAX_CARACTERES_TROCA = 4000
+
+# Trecho de cada troca usado no resumo extrativo (sem LLM)
+CARACTERES_RESUMO_EXTRATIVO = 160
+
+
+@dataclass
+class Troca:
+    pergunta: str
+    resposta: str
+
+    def tokens(self) -> int:
+        return estimar_tokens(self.pergunta) + estimar_tokens(self.resposta)
+
+
+# resumir(resumo_anterior, trocas_que_sairam, max_tokens) -> novo resumo
+Resumidor = Callable[[str, list[Troca], int], str]
+
+
+def _truncar(texto: str, limite: int) -> str:
+    return texto if len(texto) <= limite else texto[: limite - 1] + "…"
+
+
+def resumo_extrativo(resumo_anterior: str, trocas: list[Troca], max_tokens: int) -> str:
+    """Resumo sem LLM: uma linha por troca, mantendo as mais recentes no orçamento."""
+    linhas = [linha for linha in resumo_anterior.splitlines() if linha.strip()]
+    for troca in trocas:
+        linhas.append(
+            f"- Usuário: {_truncar(troca.pergunta, CARACTERES_RESUMO_EXTRATIVO)} | "
+            f"Analista: {_truncar(' '.join(troca.resposta.split()), CARACTERES_RESUMO_EXTRATIVO)}"
+        )
+    # Prioriza as linhas mais recentes
+    mantidas = linhas_no_orcamento(linhas[::-1], max_tokens)
+    return "\n".join(mantidas[::-1])
+
+
+class MemoriaConversa:
+    """
+    Janela das últimas `trocas_integrais` trocas + resumo das anteriores.
+
+    `resumir` produz o novo resumo a partir do anterior e das trocas que
+    saíram da janela (tipicamente uma chamada barata ao LLM). Se não for
+    informado ou falhar, usa-se o resumo extrativo.
+    """
+
+    def __init__(
+        self,
+        resumir: Resumidor | None = None,
+        trocas_integrais: int = TROCAS_INTEGRAIS,
+        max_tokens: int = MEMORIA_MAX_TOKENS,
+        max_tokens_resumo: int = RESUMO_MAX_TOKENS,
+    ):
+        self.resumir = resumir
+        self.trocas_integrais = trocas_integrais
+        self.max_tokens = max_tokens
+        self.max_tokens_resumo = min(max_tokens_resumo, max_tokens)
+
+        self.resumo = ""
+        self.recentes: deque[Troca] = deque()
+        self.total_trocas = 0
+        self.resumos_feitos = 0
+        self.falhas_resumo = 0
+
+    def tokens(self) -> int:
+        return estimar_tokens(self.resumo) + sum(t.tokens() for t in self.recentes)
+
+    def adicionar(self, pergunta: str, resposta: str) -> None:
+        """Registra uma troca concluída e dobra no resumo o que exceder a janela/orçamento."""
+        self.recentes.append(
+            Troca(_truncar(pergunta, MAX_CARACTERES_TROCA), _truncar(resposta, MAX_CARACTERES_TROCA))
+        )
+        self.total_trocas += 1
+
+        saindo = []
+        while len(self.recentes) > self.trocas_integrais:
+            saindo.append(self.recentes.popleft())
+        # A janela também cede espaço se as trocas forem longas demais
+        orcamento_janela = self.max_tokens - self.max_tokens_resumo
+        while len(self.recentes) > 1 and sum(t.tokens() for t in self.recentes) > orcamento_janela:
+            saindo.append(self.recentes.popleft())
+
+        if saindo:
+            self._dobrar(saindo)
+
+    def _dobrar(self, trocas: list[Troca]) -> None:
+        novo = None
+        if self.resumir is not None:
+            try:
+                novo = self.resumir(self.resumo, trocas, self.max_tokens_resumo)
+            except Exception:
+                self.falhas_resumo += 1
+        if not novo:
+            novo = resumo_extrativo(self.resumo, trocas, self.max_tokens_resumo)
+
+        # O resumidor pode ignorar o limite pedido: corta no orçamento
+        if estimar_tokens(novo) > self.max_tokens_resumo:
+            cortado = "\n".join(linhas_no_orcamento(novo.splitlines(), self.max_tokens_resumo))
+            novo = cortado or _truncar(novo, self.max_tokens_resumo * 3)
+
+        self.resumo = novo.strip()
+        self.resumos_feitos += 1
+
+    def descricao(self) -> str:
+        return (
+            f"{self.total_trocas} trocas · {len(self.recentes)} na íntegra · "
+            f"resumo atualizado {self.resumos_feitos}x · ~{self.tokens()} tokens de memória"
+        )
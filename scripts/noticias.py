@@ -1,12 +1,26 @@
 # scripts/noticias.py
 
+import hashlib
+import json
 import os
 import sys
-import requests
+import time
 import pandas as pd
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urlsplit
+
+try:
+    import lxml.html
+except ImportError:  # fallback: BeautifulSoup restrito a <a href>
+    lxml = None
+
+import arquivo_noticias
+from cache_http import cache_padrao
+from filtro_palavras import FiltroPalavrasChave
+from indice_noticias import IndiceNoticias
 
 # ============================================================
 # Configurações de diretório e arquivo de saída
@@ -14,10 +28,11 @@ from datetime import datetime
 
 # Diretório raiz do projeto (assumindo que este script está em scripts/)
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
 DATA_DIR.mkdir(exist_ok=True)
 
-ARQUIVO_SAIDA = DATA_DIR / "noticias_investimentos.csv"
+# Hash do último HTML processado por fonte + contadores de páginas inalteradas
+ARQUIVO_ESTADO_FONTES = DATA_DIR / ".cache" / "noticias_fontes.json"
 
 # ============================================================
 # Parâmetros de scraping
@@ -28,6 +43,9 @@ PALAVRAS_CHAVE = [
     "bolsa", "ibovespa", "economia", "mercado", "taxa básica", "taxa de juros"
 ]
 
+# Compilado uma única vez (regex em trie sobre texto sem acentos)
+FILTRO_PALAVRAS = FiltroPalavrasChave(PALAVRAS_CHAVE)
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -43,29 +61,78 @@ SITES = {
     "Exame Economia": "https://exame.com/economia/",
 }
 
+# Redireciona todas as fontes para outro servidor (ex.: benchmark offline):
+# https://g1.globo.com/economia/ -> {NOTICIAS_URL_BASE}/g1.globo.com/economia/
+NOTICIAS_URL_BASE = os.getenv("NOTICIAS_URL_BASE")
+if NOTICIAS_URL_BASE:
+    SITES = {
+        nome: f"{NOTICIAS_URL_BASE.rstrip('/')}/{url.split('://', 1)[1]}"
+        for nome, url in SITES.items()
+    }
+
+# Timeout (s) por host; hosts fora do mapa usam o padrão
+TIMEOUT_PADRAO = 20
+TIMEOUT_POR_HOST = {
+    "www.cnnbrasil.com.br": 20,
+    "g1.globo.com": 15,
+    "www.infomoney.com.br": 20,
+    "exame.com": 20,
+}
+
 # ============================================================
 # Funções auxiliares
 # ============================================================
 
-def filtrar_noticias(html: str, base_url: str, fonte: str) -> list[dict]:
+def extrair_links(html: str) -> list[tuple[str, str]]:
+    """
+    Extrai apenas os pares (texto, href) das tags <a href>, sem montar
+    a árvore completa do BeautifulSoup. Usa lxml quando disponível.
+    """
+    if lxml is not None:
+        try:
+            doc = lxml.html.fromstring(html)
+        except ValueError:
+            # Strings com declaração de encoding precisam ir como bytes
+            doc = lxml.html.fromstring(html.encode("utf-8"))
+        return [
+            (a.text_content(), a.get("href"))
+            for a in doc.iter("a")
+            if a.get("href") is not None
+        ]
+
+    from bs4 import BeautifulSoup, SoupStrainer
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("a", href=True))
+    return [(a.get_text(), a["href"]) for a in soup.find_all("a", href=True)]
+
+
+def filtrar_noticias(
+    html: str,
+    base_url: str,
+    fonte: str,
+    data_coleta: str | None = None,
+    filtro: FiltroPalavrasChave = FILTRO_PALAVRAS,
+) -> list[dict]:
     """
     Recebe o HTML de uma página, a base_url do site e o nome da fonte.
-    Retorna uma lista de dicionários com título, link, fonte e data_coleta.
+    Retorna uma lista de dicionários com título, link, fonte, data_coleta
+    e as palavras-chave encontradas no título.
     """
-    soup = BeautifulSoup(html, "html.parser")
     encontrados: list[dict] = []
+    if data_coleta is None:
+        data_coleta = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for a in soup.find_all("a", href=True):
-        titulo = a.get_text().strip()
-        titulo_lower = titulo.lower()
-        link = a["href"].strip()
+    for texto, href in extrair_links(html):
+        titulo = texto.strip()
+        link = href.strip()
 
         # Ignorar títulos vazios ou muito curtos
-        if not titulo or len(titulo_lower) < 10:
+        if not titulo or len(titulo) < 10:
             continue
 
-        # Verificar se contém algum termo de interesse
-        if not any(palavra in titulo_lower for palavra in PALAVRAS_CHAVE):
+        # Verificar se contém algum termo de interesse (sem diferenciar acentos)
+        palavras = filtro.encontrar(titulo)
+        if not palavras:
             continue
 
         # Normalizar link
@@ -82,63 +149,181 @@ def filtrar_noticias(html: str, base_url: str, fonte: str) -> list[dict]:
                 "titulo": titulo.strip(),
                 "link": link,
                 "fonte": fonte,
-                "data_coleta": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "data_coleta": data_coleta,
+                "palavras_chave": "; ".join(palavras),
             }
         )
 
     return encontrados
 
 
+def hash_conteudo(conteudo: bytes) -> str:
+    return hashlib.sha256(conteudo).hexdigest()
+
+
+def carregar_estado_fontes(caminho: Path = ARQUIVO_ESTADO_FONTES) -> dict[str, dict]:
+    """{fonte: {"hash": ..., "inalteradas": n, "alteradas": n}} da última execução."""
+    if not caminho.exists():
+        return {}
+    try:
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Estado das fontes ilegível ({e}); todas as páginas serão processadas.")
+        return {}
+
+
+def salvar_estado_fontes(estado: dict[str, dict], caminho: Path = ARQUIVO_ESTADO_FONTES) -> None:
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix(".tmp")
+    temporario.write_text(json.dumps(estado, ensure_ascii=False, indent=2), encoding="utf-8")
+    temporario.replace(caminho)
+
+
 # ============================================================
 # Execução principal
 # ============================================================
 
+@dataclass
+class ResultadoColeta:
+    noticias: list[dict]
+    tempo_download: float = 0.0
+    tempo_parse: float = 0.0
+    situacao: str = "erro"  # "alterada", "304", "hash" (inalterada) ou "erro"
+    hash: str | None = None
+
+
+def coletar_site(
+    nome_site: str,
+    url: str,
+    data_coleta: str,
+    hash_anterior: str | None = None,
+) -> ResultadoColeta:
+    """
+    Baixa e filtra uma fonte. Se a página não mudou desde a última coleta
+    (304 na revalidação do cache ou corpo com o mesmo hash), o parsing é
+    pulado: nenhuma notícia nova poderia sair dela.
+    """
+    host = urlsplit(url).netloc
+    timeout = TIMEOUT_POR_HOST.get(host, TIMEOUT_PADRAO)
+    print(f"🔎 Coletando notícias de: {nome_site} ({url})")
+
+    t0 = time.perf_counter()
+    try:
+        resp = cache_padrao().get(url, headers=HEADERS, fonte="noticias", timeout=timeout)
+    except Exception as e:
+        print(f"❌ Erro de conexão ao acessar {nome_site}: {e}")
+        return ResultadoColeta([], time.perf_counter() - t0)
+    tempo_download = time.perf_counter() - t0
+
+    if resp.status_code != 200:
+        print(f"❌ Erro HTTP ao acessar {nome_site}: Status {resp.status_code}")
+        return ResultadoColeta([], tempo_download)
+
+    hash_atual = hash_conteudo(resp.content)
+    if hash_anterior is not None and hash_atual == hash_anterior:
+        situacao = "304" if resp.revalidada else "hash"
+        print(f"⏭️ {nome_site} sem alterações desde a última coleta ({situacao}); parsing pulado.")
+        return ResultadoColeta([], tempo_download, 0.0, situacao, hash_atual)
+
+    # base_url = "https://g1.globo.com" etc.
+    base_url = "/".join(url.split("/")[:3])
+
+    t1 = time.perf_counter()
+    try:
+        encontrados = filtrar_noticias(resp.text, base_url, nome_site, data_coleta)
+    except Exception as e:
+        print(f"❌ Erro ao processar HTML de {nome_site}: {e}")
+        return ResultadoColeta([], tempo_download, time.perf_counter() - t1)
+    tempo_parse = time.perf_counter() - t1
+
+    print(f"✅ Encontradas {len(encontrados)} notícias relevantes em {nome_site}.")
+    return ResultadoColeta(encontrados, tempo_download, tempo_parse, "alterada", hash_atual)
+
+
+def manter_arquivo() -> None:
+    """Retenção e compactação das partições do arquivo de notícias."""
+    removidas = arquivo_noticias.aplicar_retencao()
+    compactadas = arquivo_noticias.compactar()
+    if removidas or compactadas:
+        print(
+            f"🧹 Arquivo de notícias: {removidas} partições além de "
+            f"{arquivo_noticias.DIAS_RETENCAO} dias removidas, {compactadas} compactadas."
+        )
+
+
 def main():
     noticias: list[dict] = []
+    data_coleta = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    estado = carregar_estado_fontes()
 
-    for nome_site, url in SITES.items():
-        print(f"🔎 Coletando notícias de: {nome_site} ({url})")
+    # Todas as fontes em paralelo, sobre a sessão HTTP compartilhada (pool keep-alive)
+    def coletar(item):
+        nome_site, url = item
+        return coletar_site(nome_site, url, data_coleta, estado.get(nome_site, {}).get("hash"))
 
-        try:
-            resp = requests.get(url, headers=HEADERS, timeout=20)
-        except Exception as e:
-            print(f"❌ Erro de conexão ao acessar {nome_site}: {e}")
-            continue
+    with ThreadPoolExecutor(max_workers=max(1, len(SITES))) as executor:
+        resultados = list(executor.map(coletar, SITES.items()))
 
-        if resp.status_code != 200:
-            print(f"❌ Erro HTTP ao acessar {nome_site}: Status {resp.status_code}")
-            continue
+    print("⏱️ Tempos por fonte (download | parsing | página | inalteradas/alteradas acumuladas):")
+    for nome_site, resultado in zip(SITES, resultados):
+        if resultado.hash is not None:
+            estado_fonte = estado.setdefault(nome_site, {"hash": None, "inalteradas": 0, "alteradas": 0})
+            estado_fonte["hash"] = resultado.hash
+            if resultado.situacao == "alterada":
+                estado_fonte["alteradas"] += 1
+            else:
+                estado_fonte["inalteradas"] += 1
 
-        # base_url = "https://g1.globo.com" etc.
-        base_url = "/".join(url.split("/")[:3])
+        contadores = estado.get(nome_site, {})
+        print(
+            f"   - {nome_site:<20} {resultado.tempo_download * 1000:8.0f} ms | "
+            f"{resultado.tempo_parse * 1000:6.0f} ms | {resultado.situacao:<8} | "
+            f"{contadores.get('inalteradas', 0)}/{contadores.get('alteradas', 0)}"
+        )
+        noticias.extend(resultado.noticias)
 
-        try:
-            encontrados = filtrar_noticias(resp.text, base_url, nome_site)
-            print(f"✅ Encontradas {len(encontrados)} notícias relevantes em {nome_site}.")
-            noticias.extend(encontrados)
-        except Exception as e:
-            print(f"❌ Erro ao processar HTML de {nome_site}: {e}")
-            continue
+    print(f"🗃️ {cache_padrao().resumo()}")
 
     if not noticias:
         print("ℹ️ Nenhuma notícia encontrada com os filtros atuais.")
+        salvar_estado_fontes(estado)
+        # Dias sem notícias (ex.: todas as páginas inalteradas) também limpam o arquivo
+        manter_arquivo()
         # Não consideramos erro fatal para CI/CD
         return
 
-    # Remover duplicadas por combinação de (titulo, link)
-    df = pd.DataFrame(noticias)
-    antes = len(df)
-    df = df.drop_duplicates(subset=["titulo", "link"])
-    depois = len(df)
+    # Remover duplicadas desta execução e de execuções anteriores
+    # (URL canônica + títulos quase iguais entre portais)
+    indice = IndiceNoticias()
+    novas, descartes = indice.filtrar_novas(noticias)
 
-    print(f"🧹 Removidas {antes - depois} duplicatas. Total final: {depois} notícias.")
+    print(
+        f"🧹 Removidas {len(noticias) - len(novas)} duplicatas "
+        f"({descartes['url']} por URL, {descartes['titulo']} por título parecido). "
+        f"Total final: {len(novas)} notícias novas."
+    )
 
-    try:
-        df.to_csv(ARQUIVO_SAIDA, index=False, encoding="utf-8-sig")
-        print(f"📁 CSV de notícias salvo em: {ARQUIVO_SAIDA}")
-    except Exception as e:
-        print(f"❌ Erro ao salvar arquivo '{ARQUIVO_SAIDA}': {e}")
-        sys.exit(1)
+    if novas:
+        try:
+            gravadas = arquivo_noticias.anexar(pd.DataFrame(novas))
+            print(f"📁 {gravadas} notícias anexadas em: {arquivo_noticias.DIR_NOTICIAS}")
+        except Exception as e:
+            print(f"❌ Erro ao gravar notícias em '{arquivo_noticias.DIR_NOTICIAS}': {e}")
+            sys.exit(1)
+    else:
+        print("ℹ️ Nenhuma notícia nova desde a última coleta.")
+
+    # Os hashes só avançam depois que as notícias das páginas novas foram gravadas
+    salvar_estado_fontes(estado)
+
+    manter_arquivo()
+
+    if not novas:
+        return
+
+    # Só marca como vistas depois que as notícias foram gravadas
+    indice.salvar()
+    print(f"🗂️ Índice de notícias vistas: {len(indice)} URLs nos últimos {indice.dias_retencao} dias.")
 
 
 if __name__ == "__main__":
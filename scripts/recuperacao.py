@@ -0,0 +1,234 @@
+# scripts/recuperacao.py
+
+import os
+import re
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from cache_buscas import STOPWORDS_BUSCA
+from filtro_palavras import normalizar_texto
+from resumo_contexto import resumir_series
+
+# ============================================================
+# Recuperação de trechos para o chatbot (BM25 em NumPy)
+# ============================================================
+#
+# Colar o relatório dos agentes, os indicadores e as notícias inteiros em
+# cada pergunta seria lento e caro. Os três viram trechos curtos:
+#   - relatório: blocos de parágrafos dentro de cada seção (com o título);
+#   - indicadores: um trecho por indicador (últimos valores + estatísticas);
+#   - notícias: um trecho por manchete.
+# O índice BM25 é montado uma vez por versão dos arquivos; cada pergunta
+# recebe só os `k` trechos mais relevantes.
+
+TOP_K = int(os.getenv("RECUPERACAO_TOP_K", "6"))
+
+# Parâmetros usuais do BM25
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TAMANHO_TRECHO = 700  # caracteres por trecho do relatório
+ULTIMOS_VALORES_INDICADOR = 6
+
+# Na busca, palavras interrogativas e de tempo não ajudam a achar trechos
+STOPWORDS_RECUPERACAO = STOPWORDS_BUSCA | {
+    "qual", "quais", "como", "esta", "estao", "que", "me", "fale", "diga", "explique",
+    "agora", "hoje", "atual", "atualmente", "momento", "um", "uma", "ao", "aos", "se",
+    "voce", "pode", "poderia", "sabe", "what", "is", "how", "the", "now",
+}
+
+_RE_PALAVRA = re.compile(r"\w+")
+
+
+def tokenizar(texto: str) -> list[str]:
+    return [p for p in _RE_PALAVRA.findall(normalizar_texto(texto)) if p not in STOPWORDS_RECUPERACAO]
+
+
+@dataclass
+class Trecho:
+    origem: str  # "relatorio", "indicadores" ou "noticias"
+    titulo: str
+    texto: str
+
+    def formatado(self) -> str:
+        return f"[{self.origem} · {self.titulo}]\n{self.texto}"
+
+
+# ============================================================
+# Divisão em trechos
+# ============================================================
+
+def trechos_relatorio(markdown: str) -> list[Trecho]:
+    trechos = []
+    secao = "Relatório"
+    blocos: list[str] = []
+
+    def fechar():
+        if blocos:
+            trechos.append(Trecho("relatorio", secao, "\n\n".join(blocos)))
+            blocos.clear()
+
+    for paragrafo in re.split(r"\n\s*\n", markdown):
+        paragrafo = paragrafo.strip()
+        if not paragrafo:
+            continue
+        if paragrafo.startswith("#"):
+            fechar()
+            primeira_linha, _, resto = paragrafo.partition("\n")
+            secao = primeira_linha.lstrip("#").strip() or secao
+            paragrafo = resto.strip()
+            if not paragrafo:
+                continue
+        if blocos and sum(map(len, blocos)) + len(paragrafo) > TAMANHO_TRECHO:
+            fechar()
+        blocos.append(paragrafo)
+    fechar()
+    return trechos
+
+
+def trechos_indicadores(df: pd.DataFrame) -> list[Trecho]:
+    if df.empty:
+        return []
+    resumo = resumir_series(df, "indicador", "valor", volatilidade="diferencas").set_index("indicador")
+    ultimos = (
+        df.sort_values(["indicador", "data"], kind="stable")
+        .groupby("indicador", observed=True)
+        .tail(ULTIMOS_VALORES_INDICADOR)
+    )
+
+    trechos = []
+    for indicador, grupo in ultimos.groupby("indicador", observed=True, sort=True):
+        linha = resumo.loc[indicador]
+        valores = "; ".join(f"{d:%d/%m/%Y}: {v:.2f}" for d, v in zip(grupo["data"], grupo["valor"]))
+        trechos.append(
+            Trecho(
+                "indicadores",
+                str(indicador),
+                f"{indicador} (BACEN/SGS) — últimos valores: {valores}. "
+                f"No período de {linha['inicio']:%d/%m/%Y} a {linha['fim']:%d/%m/%Y}: "
+                f"mínimo {linha['min']:.2f}, máximo {linha['max']:.2f}, tendência de {linha['tendencia']}.",
+            )
+        )
+    return trechos
+
+
+def trechos_noticias(df: pd.DataFrame) -> list[Trecho]:
+    trechos = []
+    for titulo, fonte, data, palavras in zip(
+        df["titulo"], df["fonte"], df["data_coleta"], df["palavras_chave"]
+    ):
+        if pd.isna(titulo):
+            continue
+        quando = f" em {data:%d/%m/%Y}" if pd.notna(data) else ""
+        temas = f" (temas: {palavras})" if pd.notna(palavras) and palavras else ""
+        trechos.append(Trecho("noticias", str(fonte), f"{titulo} — {fonte}{quando}{temas}"))
+    return trechos
+
+
+# ============================================================
+# Índice BM25
+# ============================================================
+
+class IndiceBM25:
+    """
+    Índice invertido em arrays NumPy: para cada termo, os trechos em que
+    aparece e a frequência. A consulta soma as contribuições BM25 só das
+    listas dos termos da pergunta.
+    """
+
+    def __init__(self, trechos: list[Trecho]):
+        t0 = time.perf_counter()
+        self.trechos = trechos
+
+        vocabulario: dict[str, int] = {}
+        termos_por_trecho, docs_por_trecho, freq_por_trecho = [], [], []
+        comprimentos = np.zeros(len(trechos), dtype=np.float32)
+
+        for i, trecho in enumerate(trechos):
+            tokens = tokenizar(f"{trecho.titulo} {trecho.texto}")
+            comprimentos[i] = len(tokens)
+            ids, freqs = np.unique(
+                np.fromiter((vocabulario.setdefault(t, len(vocabulario)) for t in tokens), dtype=np.int64),
+                return_counts=True,
+            )
+            termos_por_trecho.append(ids)
+            freq_por_trecho.append(freqs)
+            docs_por_trecho.append(np.full(len(ids), i, dtype=np.int64))
+
+        self.vocabulario = vocabulario
+        if trechos:
+            termos = np.concatenate(termos_por_trecho)
+            docs = np.concatenate(docs_por_trecho)
+            freqs = np.concatenate(freq_por_trecho).astype(np.float32)
+        else:
+            termos = docs = np.zeros(0, dtype=np.int64)
+            freqs = np.zeros(0, dtype=np.float32)
+
+        # Postings agrupados por termo (ordem estável: trechos crescentes)
+        ordem = np.argsort(termos, kind="stable")
+        self._docs = docs[ordem]
+        self._inicio = np.searchsorted(termos[ordem], np.arange(len(vocabulario) + 1))
+
+        df_termo = np.diff(self._inicio).astype(np.float32)
+        n = max(len(trechos), 1)
+        self._idf = np.log1p((n - df_termo + 0.5) / (df_termo + 0.5))
+
+        # Parte do BM25 que não depende da pergunta, pré-calculada por posting
+        media = comprimentos.mean() if len(trechos) else 1.0
+        normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * comprimentos / max(media, 1e-9))
+        tf = freqs[ordem]
+        self._pesos = tf * (BM25_K1 + 1) / (tf + normalizacao[self._docs])
+
+        self.tempo_construcao_s = time.perf_counter() - t0
+        self.consultas = 0
+        self.tempo_consultas_s = 0.0
+
+    def buscar(self, pergunta: str, k: int = TOP_K) -> list[tuple[Trecho, float]]:
+        t0 = time.perf_counter()
+        pontuacao = np.zeros(len(self.trechos), dtype=np.float32)
+        for termo in set(tokenizar(pergunta)):
+            tid = self.vocabulario.get(termo)
+            if tid is None:
+                continue
+            ini, fim = self._inicio[tid], self._inicio[tid + 1]
+            np.add.at(pontuacao, self._docs[ini:fim], self._idf[tid] * self._pesos[ini:fim])
+
+        candidatos = np.flatnonzero(pontuacao > 0)
+        if len(candidatos) > k:
+            candidatos = candidatos[np.argpartition(pontuacao[candidatos], -k)[-k:]]
+        candidatos = candidatos[np.argsort(pontuacao[candidatos])[::-1]]
+
+        self.consultas += 1
+        self.tempo_consultas_s += time.perf_counter() - t0
+        return [(self.trechos[i], float(pontuacao[i])) for i in candidatos]
+
+    def descricao(self) -> str:
+        media_ms = self.tempo_consultas_s / self.consultas * 1000 if self.consultas else 0.0
+        return (
+            f"{len(self.trechos)} trechos · {len(self.vocabulario)} termos · "
+            f"montado em {self.tempo_construcao_s * 1000:.0f} ms · "
+            f"{self.consultas} consultas (média {media_ms:.2f} ms)"
+        )
+
+
+def construir_indice(
+    relatorio: str | None,
+    df_indicadores: pd.DataFrame | None,
+    df_noticias: pd.DataFrame | None,
+) -> IndiceBM25:
+    """Índice com o que estiver disponível (qualquer fonte pode faltar)."""
+    trechos = []
+    if relatorio:
+        trechos += trechos_relatorio(relatorio)
+    if df_indicadores is not None:
+        trechos += trechos_indicadores(df_indicadores)
+    if df_noticias is not None:
+        trechos += trechos_noticias(df_noticias)
+    return IndiceBM25(trechos)
+
+
+def contexto_recuperado(resultados: list[tuple[Trecho, float]]) -> str:
+    return "\n\n".join(trecho.formatado() for trecho, _ in resultados)
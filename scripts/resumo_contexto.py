@@ -0,0 +1,125 @@
+# scripts/resumo_contexto.py
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    import tiktoken
+except ImportError:  # estimativa aproximada (~4 caracteres por token)
+    tiktoken = None
+
+# ============================================================
+# Resumo estatístico das séries para o contexto dos agentes
+# ============================================================
+#
+# Em vez de colar as tabelas inteiras no prompt (tamanho proporcional ao
+# número de linhas), cada ticker / indicador vira uma única linha com:
+#   último valor, variação no período, mínimo/máximo, volatilidade e
+#   tendência (inclinação da reta de mínimos quadrados).
+# Tudo calculado com groupby vetorizado, sem laço por série.
+
+MODELO_TOKENS = "gpt-4.1-mini"
+CONTEXTO_MAX_TOKENS = int(os.getenv("CONTEXTO_MAX_TOKENS", "3000"))
+
+# |variação da reta no período| / amplitude da série abaixo disso = lateral
+LIMIAR_TENDENCIA = 0.3
+
+
+@lru_cache(maxsize=1)
+def _codificador():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(MODELO_TOKENS)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Sem acesso aos arquivos BPE (ex.: ambiente offline)
+        return None
+
+
+def estimar_tokens(texto: str) -> int:
+    codificador = _codificador()
+    if codificador is None:
+        return len(texto) // 4
+    return len(codificador.encode(texto))
+
+
+def resumir_series(
+    df: pd.DataFrame,
+    chave: str,
+    valor: str,
+    data: str = "data",
+    volatilidade: str = "retornos",
+) -> pd.DataFrame:
+    """
+    Uma linha por série (`chave`), com estatísticas de `valor` ao longo de `data`.
+
+    - `volatilidade="retornos"`: desvio-padrão das variações percentuais (%),
+      adequado a preços;
+    - `volatilidade="diferencas"`: desvio-padrão das diferenças entre
+      observações, na unidade da série (taxas, índices).
+    """
+    df = df[[chave, data, valor]].dropna(subset=[valor]).sort_values([chave, data], kind="stable")
+    grupos = df.groupby(chave, sort=False, observed=True)
+
+    # Regressão linear valor ~ posição, por grupo, a partir de somas
+    x = grupos.cumcount().astype("float64")
+    y = df[valor].astype("float64")
+    somas = pd.DataFrame({chave: df[chave], "x": x, "y": y, "xy": x * y, "xx": x * x}).groupby(
+        chave, sort=False, observed=True
+    ).sum()
+    n = grupos.size()
+    denominador = n * somas["xx"] - somas["x"] ** 2
+    inclinacao = (n * somas["xy"] - somas["x"] * somas["y"]) / denominador.replace(0, np.nan)
+
+    if volatilidade == "retornos":
+        variacoes = grupos[valor].pct_change() * 100
+    else:
+        variacoes = grupos[valor].diff()
+
+    resumo = pd.DataFrame(
+        {
+            "obs": n,
+            "inicio": grupos[data].first(),
+            "fim": grupos[data].last(),
+            "ultimo": grupos[valor].last(),
+            "var_%": (grupos[valor].last() / grupos[valor].first() - 1) * 100,
+            "min": grupos[valor].min(),
+            "max": grupos[valor].max(),
+            "vol": variacoes.groupby(df[chave], sort=False, observed=True).std(),
+        }
+    )
+
+    amplitude = (resumo["max"] - resumo["min"]).replace(0, np.nan)
+    forca = (inclinacao * (n - 1) / amplitude).fillna(0.0)
+    resumo["tendencia"] = np.select(
+        [forca >= LIMIAR_TENDENCIA, forca <= -LIMIAR_TENDENCIA], ["alta", "baixa"], default="lateral"
+    )
+    resumo["incl/obs"] = inclinacao
+
+    return resumo.reset_index()
+
+
+def tabela_resumo(resumo: pd.DataFrame, casas: int = 2) -> str:
+    """Resumo em markdown compacto (datas sem hora, números arredondados)."""
+    resumo = resumo.copy()
+    for coluna in ("inicio", "fim"):
+        resumo[coluna] = pd.to_datetime(resumo[coluna]).dt.strftime("%Y-%m-%d")
+    return resumo.round(casas).to_markdown(index=False, floatfmt=f".{casas}f")
+
+
+def linhas_no_orcamento(linhas: list[str], max_tokens: int) -> list[str]:
+    """Maior prefixo de `linhas` que cabe em `max_tokens`."""
+    selecionadas = []
+    usados = 0
+    for linha in linhas:
+        custo = estimar_tokens(linha) + 1
+        if usados + custo > max_tokens:
+            break
+        selecionadas.append(linha)
+        usados += custo
+    return selecionadas
@@ -0,0 +1,383 @@
+# scripts/telemetria.py
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from langchain_core.callbacks import BaseCallbackHandler
+
+from cache_llm import METADADO_DO_CACHE
+
+# ============================================================
+# Telemetria de chamadas de LLM e ferramentas
+# ============================================================
+#
+# Cada chamada (LLM ou ferramenta) vira uma linha em data/telemetria.sqlite
+# com duração, tokens de prompt/resposta e custo estimado, marcada com a
+# execução (uma kickoff da Crew ou uma sessão do chat), o agente e a tarefa.
+# Os resumos por agente, tarefa e execução saem de consultas sobre essa tabela;
+# o dashboard lê o mesmo arquivo para os gráficos.
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
+ARQUIVO_TELEMETRIA = Path(os.getenv("TELEMETRIA_ARQUIVO", DATA_DIR / "telemetria.sqlite"))
+
+# US$ por 1 milhão de tokens (prompt, resposta). Modelos fora da tabela
+# ficam com custo 0 — o número de tokens continua registrado.
+PRECOS_POR_MILHAO = {
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+# US$ por chamada de ferramenta paga
+CUSTO_POR_CHAMADA_FERRAMENTA = {
+    "serper": 0.001,
+}
+
+COLUNAS_RESUMO = ["chamadas", "duracao_s", "tokens_prompt", "tokens_resposta", "custo_usd"]
+
+
+def custo_estimado(modelo: str | None, tokens_prompt: int, tokens_resposta: int) -> float:
+    if not modelo:
+        return 0.0
+    # Maior prefixo conhecido: "gpt-4.1-mini-2025-04-14" -> "gpt-4.1-mini"
+    candidatos = [m for m in PRECOS_POR_MILHAO if modelo.startswith(m)]
+    if not candidatos:
+        return 0.0
+    preco_prompt, preco_resposta = PRECOS_POR_MILHAO[max(candidatos, key=len)]
+    return (tokens_prompt * preco_prompt + tokens_resposta * preco_resposta) / 1_000_000
+
+
+class Telemetria:
+    """Registro das chamadas de uma execução (Crew ou sessão do chat)."""
+
+    def __init__(self, origem: str, caminho: Path = ARQUIVO_TELEMETRIA, execucao: str | None = None):
+        self.origem = origem
+        self.execucao = execucao or f"{origem}-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+        # Atribuição das chamadas: atualizada pelo chamador (ex.: task_callback da Crew).
+        # Um valor por instância, compartilhado entre threads: chamadas em paralelo
+        # (ex.: uma Crew por ticker) devem informar `agente`/`tarefa` explicitamente.
+        self.agente_atual: str | None = None
+        self.tarefa_atual: str | None = None
+
+        self._caminho = Path(caminho)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._inicio = time.time()
+
+    # ---------------- armazenamento ---------------- #
+
+    def _conexao(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._caminho, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS chamadas (
+                    execucao TEXT NOT NULL,
+                    origem TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    nome TEXT,
+                    agente TEXT,
+                    tarefa TEXT,
+                    inicio REAL NOT NULL,
+                    duracao_s REAL NOT NULL,
+                    tokens_prompt INTEGER NOT NULL DEFAULT 0,
+                    tokens_resposta INTEGER NOT NULL DEFAULT 0,
+                    custo_usd REAL NOT NULL DEFAULT 0,
+                    erro TEXT,
+                    primeiro_token_s REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chamadas_execucao ON chamadas (execucao);
+                CREATE TABLE IF NOT EXISTS tarefas (
+                    execucao TEXT NOT NULL,
+                    tarefa TEXT NOT NULL,
+                    agente TEXT,
+                    fim REAL NOT NULL,
+                    duracao_s REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS execucoes (
+                    execucao TEXT PRIMARY KEY,
+                    origem TEXT NOT NULL,
+                    inicio REAL NOT NULL,
+                    fim REAL,
+                    duracao_s REAL,
+                    status TEXT,
+                    tokens_prompt_informados INTEGER,
+                    tokens_resposta_informados INTEGER
+                );
+                """
+            )
+            # Bancos criados antes da medição do tempo até o primeiro token
+            colunas = {linha[1] for linha in self._conn.execute("PRAGMA table_info(chamadas)")}
+            if "primeiro_token_s" not in colunas:
+                self._conn.execute("ALTER TABLE chamadas ADD COLUMN primeiro_token_s REAL")
+        return self._conn
+
+    def _executar(self, sql: str, valores: tuple) -> None:
+        with self._lock:
+            conn = self._conexao()
+            conn.execute(sql, valores)
+            conn.commit()
+
+    # ---------------- registro ---------------- #
+
+    def iniciar_execucao(self) -> None:
+        self._inicio = time.time()
+        self._executar(
+            "INSERT OR REPLACE INTO execucoes (execucao, origem, inicio, status) VALUES (?, ?, ?, ?)",
+            (self.execucao, self.origem, self._inicio, "em andamento"),
+        )
+
+    def finalizar_execucao(
+        self,
+        status: str = "ok",
+        tokens_prompt_informados: int | None = None,
+        tokens_resposta_informados: int | None = None,
+    ) -> None:
+        """Fecha a execução. Os tokens "informados" vêm do próprio framework (ex.: crew.usage_metrics)."""
+        fim = time.time()
+        self._executar(
+            """
+            UPDATE execucoes
+               SET fim = ?, duracao_s = ?, status = ?,
+                   tokens_prompt_informados = ?, tokens_resposta_informados = ?
+             WHERE execucao = ?
+            """,
+            (fim, fim - self._inicio, status, tokens_prompt_informados, tokens_resposta_informados, self.execucao),
+        )
+
+    def registrar_chamada(
+        self,
+        tipo: str,
+        nome: str | None,
+        inicio: float,
+        duracao_s: float,
+        tokens_prompt: int = 0,
+        tokens_resposta: int = 0,
+        custo_usd: float = 0.0,
+        agente: str | None = None,
+        tarefa: str | None = None,
+        erro: str | None = None,
+        primeiro_token_s: float | None = None,
+    ) -> None:
+        self._executar(
+            """
+            INSERT INTO chamadas (execucao, origem, tipo, nome, agente, tarefa, inicio, duracao_s,
+                                  tokens_prompt, tokens_resposta, custo_usd, erro, primeiro_token_s)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                self.execucao,
+                self.origem,
+                tipo,
+                nome,
+                agente or self.agente_atual,
+                tarefa or self.tarefa_atual,
+                inicio,
+                duracao_s,
+                tokens_prompt,
+                tokens_resposta,
+                custo_usd,
+                erro,
+                primeiro_token_s,
+            ),
+        )
+
+    def registrar_tarefa(self, tarefa: str, agente: str | None, duracao_s: float) -> None:
+        self._executar(
+            "INSERT INTO tarefas VALUES (?, ?, ?, ?, ?)",
+            (self.execucao, tarefa, agente, time.time(), duracao_s),
+        )
+
+    @contextmanager
+    def medir_ferramenta(self, nome: str, agente: str | None = None, tarefa: str | None = None):
+        """Mede uma chamada de ferramenta (custo fixo por chamada, se tabelado)."""
+        inicio = time.time()
+        t0 = time.perf_counter()
+        erro = None
+        try:
+            yield
+        except Exception as e:
+            erro = repr(e)
+            raise
+        finally:
+            self.registrar_chamada(
+                "ferramenta",
+                nome,
+                inicio,
+                time.perf_counter() - t0,
+                custo_usd=CUSTO_POR_CHAMADA_FERRAMENTA.get(nome, 0.0),
+                agente=agente,
+                tarefa=tarefa,
+                erro=erro,
+            )
+
+    def callback(self, agente: str | None = None) -> "CallbackTelemetria":
+        return CallbackTelemetria(self, agente)
+
+    # ---------------- consultas ---------------- #
+
+    def chamadas(self) -> pd.DataFrame:
+        return carregar_chamadas(self._caminho, self.execucao)
+
+    def imprimir_resumo(self) -> None:
+        df = self.chamadas()
+        if df.empty:
+            print("📡 Telemetria: nenhuma chamada registrada nesta execução.")
+            return
+
+        total = resumo_por(df, "tipo").sum(numeric_only=True)
+        print(
+            f"📡 Telemetria ({self.execucao}): {int(total['chamadas'])} chamadas, "
+            f"{total['duracao_s']:.1f}s, {int(total['tokens_prompt'])}+{int(total['tokens_resposta'])} tokens, "
+            f"~US$ {total['custo_usd']:.4f}"
+        )
+        for coluna in ("agente", "tarefa"):
+            print(f"   Por {coluna}:")
+            for nome, linha in resumo_por(df, coluna).iterrows():
+                print(
+                    f"   - {nome:<40} {int(linha['chamadas']):4d} chamadas | {linha['duracao_s']:7.1f}s | "
+                    f"{int(linha['tokens_prompt'] + linha['tokens_resposta']):7d} tokens | US$ {linha['custo_usd']:.4f}"
+                )
+
+
+# ============================================================
+# Callback do LangChain (tokens e latência de cada chamada ao LLM do chat;
+# os agentes do CrewAI registram pelo LLMInstrumentado)
+# ============================================================
+
+def _uso_de_tokens(resposta) -> tuple[str | None, int, int, bool]:
+    """(modelo, tokens de prompt, tokens de resposta, veio do cache) de um LLMResult."""
+    saida = resposta.llm_output or {}
+    modelo = saida.get("model_name")
+    uso = saida.get("token_usage") or {}
+    tokens_prompt = uso.get("prompt_tokens", 0) or 0
+    tokens_resposta = uso.get("completion_tokens", 0) or 0
+    do_cache = False
+
+    if not uso:
+        # Respostas em streaming trazem o uso na mensagem, não no llm_output
+        for geracoes in resposta.generations:
+            for geracao in geracoes:
+                mensagem = getattr(geracao, "message", None)
+                metadados = getattr(mensagem, "usage_metadata", None) or {}
+                tokens_prompt += metadados.get("input_tokens", 0)
+                tokens_resposta += metadados.get("output_tokens", 0)
+                metadados_resposta = getattr(mensagem, "response_metadata", None) or {}
+                modelo = modelo or metadados_resposta.get("model_name")
+                do_cache = do_cache or bool(metadados_resposta.get(METADADO_DO_CACHE))
+
+    return modelo, int(tokens_prompt), int(tokens_resposta), do_cache
+
+
+class CallbackTelemetria(BaseCallbackHandler):
+    def __init__(self, telemetria: Telemetria, agente: str | None = None):
+        self.telemetria = telemetria
+        self.agente = agente
+        self._inicios: dict = {}
+        self._primeiros_tokens: dict = {}
+
+    def _iniciar(self, run_id) -> None:
+        self._inicios[run_id] = (time.time(), time.perf_counter())
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        # Só chamado em streaming: guarda o tempo até o primeiro pedaço com texto
+        if token and run_id not in self._primeiros_tokens and run_id in self._inicios:
+            self._primeiros_tokens[run_id] = time.perf_counter() - self._inicios[run_id][1]
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._iniciar(run_id)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._iniciar(run_id)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        inicio, t0 = self._inicios.pop(run_id, (time.time(), time.perf_counter()))
+        modelo, tokens_prompt, tokens_resposta, do_cache = _uso_de_tokens(response)
+        self.telemetria.registrar_chamada(
+            "llm",
+            f"{modelo} (cache)" if do_cache else modelo,
+            inicio,
+            time.perf_counter() - t0,
+            tokens_prompt,
+            tokens_resposta,
+            # Respostas servidas do cache em disco não são cobradas
+            0.0 if do_cache else custo_estimado(modelo, tokens_prompt, tokens_resposta),
+            agente=self.agente,
+            primeiro_token_s=self._primeiros_tokens.pop(run_id, None),
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        inicio, t0 = self._inicios.pop(run_id, (time.time(), time.perf_counter()))
+        self._primeiros_tokens.pop(run_id, None)
+        self.telemetria.registrar_chamada(
+            "llm", None, inicio, time.perf_counter() - t0, agente=self.agente, erro=repr(error)
+        )
+
+
+# ============================================================
+# Consultas (resumos por agente, tarefa e execução)
+# ============================================================
+
+def carregar_chamadas(caminho: Path = ARQUIVO_TELEMETRIA, execucao: str | None = None) -> pd.DataFrame:
+    if not Path(caminho).exists():
+        return pd.DataFrame()
+    with sqlite3.connect(caminho) as conn:
+        tabelas = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "chamadas" not in tabelas:
+            return pd.DataFrame()
+        if execucao is None:
+            return pd.read_sql_query("SELECT * FROM chamadas", conn)
+        return pd.read_sql_query("SELECT * FROM chamadas WHERE execucao = ?", conn, params=(execucao,))
+
+
+def carregar_execucoes(caminho: Path = ARQUIVO_TELEMETRIA, origem: str | None = None) -> pd.DataFrame:
+    """Uma linha por execução, com os totais das chamadas registradas."""
+    if not Path(caminho).exists():
+        return pd.DataFrame()
+    with sqlite3.connect(caminho) as conn:
+        tabelas = {linha[0] for linha in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "execucoes" not in tabelas:
+            return pd.DataFrame()
+        df = pd.read_sql_query(
+            """
+            SELECT e.*,
+                   COUNT(c.execucao) AS chamadas,
+                   COALESCE(SUM(c.tokens_prompt), 0) AS tokens_prompt,
+                   COALESCE(SUM(c.tokens_resposta), 0) AS tokens_resposta,
+                   COALESCE(SUM(c.custo_usd), 0) AS custo_usd
+              FROM execucoes e
+              LEFT JOIN chamadas c ON c.execucao = e.execucao
+             GROUP BY e.execucao
+             ORDER BY e.inicio DESC
+            """,
+            conn,
+        )
+    if origem is not None:
+        df = df[df["origem"] == origem]
+    df["inicio"] = pd.to_datetime(df["inicio"], unit="s")
+    return df.reset_index(drop=True)
+
+
+def resumo_por(df: pd.DataFrame, coluna: str) -> pd.DataFrame:
+    """Totais de chamadas, duração, tokens e custo agrupados por `coluna`."""
+    if df.empty:
+        return pd.DataFrame(columns=COLUNAS_RESUMO)
+    return (
+        df.assign(chamadas=1, **{coluna: df[coluna].fillna("(sem atribuição)")})
+        .groupby(coluna)[COLUNAS_RESUMO]
+        .sum()
+        .sort_values("duracao_s", ascending=False)
+    )
@@ -1,8 +1,12 @@
 # streamlit/dashboard.py
 
 import os
+import sys
+import time
+from collections import Counter
 from pathlib import Path
 
+import httpx
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
@@ -41,13 +45,24 @@ st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 # Caminhos de arquivos (raiz do projeto + /data)
 # ============================================================
 ROOT_DIR = Path(__file__).resolve().parents[1]
-DATA_DIR = ROOT_DIR / "data"
+DATA_DIR = Path(os.getenv("PROJETO_DATA_DIR", ROOT_DIR / "data"))
 
 ARQUIVO_RELATORIO_AGENTES = DATA_DIR / "relatorio_indicacao_acoes.md"
 ARQUIVO_ACOES = DATA_DIR / "top_10_acoes.csv"
 ARQUIVO_INDICADORES_ECONOMICOS = DATA_DIR / "indicadores_economicos.csv"
 ARQUIVO_NOTICIAS = DATA_DIR / "noticias_investimentos.csv"
 
+# Módulos compartilhados dos coletores (scripts/)
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+from armazenamento_precos import DIR_PRECOS  # noqa: E402
+from arquivo_noticias import DIR_NOTICIAS  # noqa: E402
+import carregador_dados  # noqa: E402
+from limitador_taxa import LimiteConcorrencia  # noqa: E402
+from cache_respostas import CacheRespostas  # noqa: E402
+from memoria_chat import MemoriaConversa, Troca  # noqa: E402
+import recuperacao  # noqa: E402
+from telemetria import Telemetria, carregar_chamadas, carregar_execucoes, resumo_por  # noqa: E402
+
 # ============================================================
 # Carregar variáveis de ambiente
 # ============================================================
@@ -57,21 +72,85 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # ============================================================
 # Inicialização do modelo de chat (OpenAI nativo)
 # ============================================================
+#
+# O script é reexecutado a cada interação de cada sessão: o cliente (e o
+# pool de conexões HTTP, mantidas abertas entre as chamadas) é criado uma
+# única vez por processo e compartilhado. O limite de concorrência faz uma
+# rajada de usuários esperar na fila em vez de estourar o rate limit.
+MAX_COMPLETIONS_SIMULTANEAS = int(os.getenv("CHAT_MAX_SIMULTANEAS", "4"))
+ESPERA_MAXIMA_FILA_S = float(os.getenv("CHAT_ESPERA_MAXIMA_S", "60"))
+
+@st.cache_resource
+def cliente_chat(api_key: str) -> ChatOpenAI:
+    return ChatOpenAI(
+        model="gpt-4.1-mini",
+        temperature=0.4,
+        api_key=api_key,
+        # Uso de tokens também nas respostas em streaming (telemetria)
+        stream_usage=True,
+        http_client=httpx.Client(
+            limits=httpx.Limits(
+                max_connections=MAX_COMPLETIONS_SIMULTANEAS * 2,
+                max_keepalive_connections=MAX_COMPLETIONS_SIMULTANEAS,
+                keepalive_expiry=120,
+            ),
+            timeout=httpx.Timeout(120, connect=10),
+        ),
+    )
+
+@st.cache_resource
+def limite_chat() -> LimiteConcorrencia:
+    return LimiteConcorrencia(MAX_COMPLETIONS_SIMULTANEAS, espera_maxima=ESPERA_MAXIMA_FILA_S)
+
 chat_model = None
 if not OPENAI_API_KEY:
     st.error("Variável de ambiente OPENAI_API_KEY não encontrada.")
     st.warning("O chatbot estará desabilitado até que a chave seja configurada.")
 else:
     try:
-        chat_model = ChatOpenAI(
-            model="gpt-4.1-mini",
-            temperature=0.4,
-            api_key=OPENAI_API_KEY,
-        )
+        chat_model = cliente_chat(OPENAI_API_KEY)
     except Exception as e:
         st.error(f"Erro ao inicializar o modelo de chat: {e}")
         st.warning("As funcionalidades do chatbot estarão desabilitadas.")
 
+# Telemetria do chat: uma "execução" por processo do servidor
+@st.cache_resource
+def telemetria_chat() -> Telemetria:
+    telemetria = Telemetria("chat")
+    telemetria.iniciar_execucao()
+    return telemetria
+
+# Respostas compartilhadas entre as sessões, válidas para uma versão dos dados
+@st.cache_resource
+def cache_respostas_chat() -> CacheRespostas:
+    return CacheRespostas()
+
+def versao_dados_chat() -> str:
+    origens = [caminho for caminhos in carregador_dados.ORIGENS.values() for caminho in caminhos]
+    return carregador_dados.impressao_digital(ARQUIVO_RELATORIO_AGENTES, *origens)
+
+# Índice de trechos (relatório, indicadores, notícias) remontado só quando os arquivos mudam
+NOTICIAS_POR_FONTE_RECUPERACAO = 30
+
+@st.cache_resource(max_entries=2)
+def _indice_recuperacao(versao: str) -> recuperacao.IndiceBM25:
+    relatorio = (
+        ARQUIVO_RELATORIO_AGENTES.read_text(encoding="utf-8") if ARQUIVO_RELATORIO_AGENTES.exists() else None
+    )
+    fontes = {}
+    for nome, carregar in (
+        ("indicadores", carregador_dados.carregar_indicadores),
+        ("noticias", lambda: carregador_dados.carregar_noticias(por_fonte=NOTICIAS_POR_FONTE_RECUPERACAO)),
+    ):
+        try:
+            fontes[nome] = carregar()
+        except Exception:
+            fontes[nome] = None
+    return recuperacao.construir_indice(relatorio, fontes["indicadores"], fontes["noticias"])
+
+def indice_recuperacao() -> recuperacao.IndiceBM25:
+    return _indice_recuperacao(versao_dados_chat())
+
 # ============================================================
 # Contexto do chatbot
 # ============================================================
@@ -87,10 +166,9 @@ Você é o "Analista Econômico Virtual", um assistente de IA especializado em e
 Ajudar o usuário a entender o cenário econômico, responder perguntas sobre investimentos e finanças de forma clara, objetiva e consultiva.
 
 **Contexto Econômico Atual (base para suas respostas):**
-- Inflação (IPCA): tendência de desaceleração nos últimos meses.
-- Taxa de Juros (SELIC): 10,75% ao ano.
-- Mercado de Ações: PETR4, VALE3 e WEGE3 apresentam maiores volumes recentes.
-- Cenário Macroeconômico e Notícias: atenção à alta do petróleo e discussões sobre risco fiscal no país.
+A cada pergunta, você recebe abaixo os trechos mais relevantes do relatório dos agentes,
+dos indicadores do BACEN e das notícias coletadas. Use-os como fonte de números e fatos;
+se não cobrirem a pergunta, diga isso em vez de supor valores.
 
 **Diretrizes:**
 1. Baseie-se principalmente nesse contexto ao responder.
@@ -103,10 +181,36 @@ Ajudar o usuário a entender o cenário econômico, responder perguntas sobre in
 """
 
 # ============================================================
-# Estado da sessão para histórico do chat
+# Memória da conversa (janela recente + resumo das trocas antigas)
 # ============================================================
+PROMPT_RESUMO_CONVERSA = """
+Você mantém o resumo de uma conversa entre um usuário e o Analista Econômico Virtual.
+Atualize o resumo existente incorporando as novas trocas. Preserve perguntas em aberto,
+ativos, indicadores e números citados e as preferências do usuário. Responda apenas com
+o resumo, em tópicos curtos, com no máximo {max_palavras} palavras.
+"""
+
+def resumir_conversa(resumo_anterior: str, trocas: list[Troca], max_tokens: int) -> str:
+    novas_trocas = "\n\n".join(f"Usuário: {t.pergunta}\nAnalista: {t.resposta}" for t in trocas)
+    with limite_chat().vaga():
+        resposta = chat_model.invoke(
+            [
+                SystemMessage(content=PROMPT_RESUMO_CONVERSA.format(max_palavras=max_tokens * 2 // 3)),
+                HumanMessage(
+                    content=f"Resumo até agora:\n{resumo_anterior or '(vazio)'}\n\nNovas trocas:\n{novas_trocas}"
+                ),
+            ],
+            config={"callbacks": [telemetria_chat().callback("chat (resumo)")]},
+        )
+    return resposta.content
+
+# Só para exibição: o prompt usa a memória acima, não esta lista
+MAX_TROCAS_EXIBIDAS = 30
+
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+if "memoria_chat" not in st.session_state:
+    st.session_state.memoria_chat = MemoriaConversa(resumir=resumir_conversa)
 
 # ============================================================
 # Cabeçalho
@@ -126,24 +230,78 @@ st.header("💬 Converse com o Analista Econômico Virtual")
 pergunta_cliente = st.text_input("Digite sua pergunta sobre investimentos ou economia:")
 
 if pergunta_cliente and chat_model:
-    mensagens = [SystemMessage(content=contexto_chat)]
-
-    # Reconstruir o histórico
-    for troca in st.session_state.chat_history:
-        mensagens.append(HumanMessage(content=troca["pergunta"]))
-        mensagens.append(AIMessage(content=troca["resposta"]))
+    memoria = st.session_state.memoria_chat
+    contexto_sistema = contexto_chat
+
+    # Só os trechos dos dados relevantes para esta pergunta entram no prompt
+    indice = indice_recuperacao()
+    t0_busca = time.perf_counter()
+    trechos = indice.buscar(pergunta_cliente)
+    tempo_busca = time.perf_counter() - t0_busca
+    if trechos:
+        contexto_sistema += f"\n**Trechos relevantes dos dados:**\n{recuperacao.contexto_recuperado(trechos)}\n"
+    if memoria.resumo:
+        contexto_sistema += f"\n**Resumo da conversa até aqui:**\n{memoria.resumo}\n"
+    mensagens = [SystemMessage(content=contexto_sistema)]
+
+    # Só as trocas mais recentes vão na íntegra
+    for troca in memoria.recentes:
+        mensagens.append(HumanMessage(content=troca.pergunta))
+        mensagens.append(AIMessage(content=troca.resposta))
 
     mensagens.append(HumanMessage(content=pergunta_cliente))
 
+    # Os pedaços da resposta são exibidos à medida que chegam
+    tempos = {}
+
+    def fluxo_resposta():
+        t0 = time.perf_counter()
+        # A vaga fica ocupada até o último pedaço (ou até a sessão abandonar o stream)
+        with limite_chat().vaga() as espera:
+            tempos["fila"] = espera
+            for pedaco in chat_model.stream(
+                mensagens, config={"callbacks": [telemetria_chat().callback("chat")]}
+            ):
+                if pedaco.content:
+                    tempos.setdefault("primeiro_token", time.perf_counter() - t0)
+                    yield pedaco.content
+        tempos["total"] = time.perf_counter() - t0
+
+    # Uma pergunta que abre a conversa não depende de trocas anteriores,
+    # então pode ser respondida pelo cache compartilhado entre sessões
+    pergunta_isolada = memoria.total_trocas == 0
+    versao_dados = versao_dados_chat()
+    em_cache = (
+        cache_respostas_chat().buscar(pergunta_cliente, versao_dados) if pergunta_isolada else None
+    )
+
     try:
-        resposta_obj = chat_model(mensagens)
-        resposta = resposta_obj.content
+        st.markdown("### 🧠 Resposta do Agente:")
+        if em_cache:
+            entrada, similaridade = em_cache
+            resposta = entrada.resposta
+            st.write(resposta)
+            st.caption(
+                f"⚡ Resposta reaproveitada de uma pergunta semelhante: “{entrada.pergunta}” "
+                f"(similaridade {similaridade:.2f})"
+            )
+        else:
+            resposta = st.write_stream(fluxo_resposta())
+            st.caption(
+                f"⏱️ Primeiro token em {tempos.get('primeiro_token', tempos['total']):.1f}s · "
+                f"resposta completa em {tempos['total']:.1f}s · "
+                f"⏳ fila {tempos['fila']:.1f}s · "
+                f"🔎 {len(trechos)} trechos recuperados em {tempo_busca * 1000:.1f} ms"
+            )
+            if pergunta_isolada:
+                cache_respostas_chat().guardar(pergunta_cliente, resposta, tempos["total"], versao_dados)
+
+        # Só entra no histórico a resposta que chegou completa
         st.session_state.chat_history.append(
             {"pergunta": pergunta_cliente, "resposta": resposta}
         )
-
-        st.markdown("### 🧠 Resposta do Agente:")
-        st.write(resposta)
+        del st.session_state.chat_history[:-MAX_TROCAS_EXIBIDAS]
+        memoria.adicionar(pergunta_cliente, resposta)
     except Exception as e:
         st.error(f"Erro ao obter resposta do agente: {e}")
 
@@ -158,14 +316,37 @@ if chat_model:
             st.markdown(f"**Agente:** {troca['resposta']}")
             if i < len(st.session_state.chat_history) - 1:
                 st.markdown("---")
+        st.caption(f"🧠 Memória: {st.session_state.memoria_chat.descricao()}")
 
 st.divider()
 
 # ============================================================
 # Funções utilitárias de carregamento
 # ============================================================
-@st.cache_data
-def carregar_relatorio_md(caminho: Path) -> str:
+#
+# Os caches são chaveados pela impressão digital dos arquivos de origem
+# (tamanho + mtime, ou o manifesto de um diretório): quando o pipeline
+# regrava os dados, a próxima execução do script relê só o que mudou, sem
+# precisar reiniciar o servidor. max_entries mantém a versão atual e a
+# anterior de cada dataset (sessões abertas durante a troca).
+
+@st.cache_resource
+def estatisticas_carregadores() -> Counter:
+    """Contadores do processo: '<nome>:chamadas' e '<nome>:leituras' (falhas do cache)."""
+    return Counter()
+
+def resumo_cache_carregadores() -> list[str]:
+    estatisticas = estatisticas_carregadores()
+    linhas = []
+    for nome in ["relatorio", *CARREGADORES]:
+        chamadas = estatisticas[f"{nome}:chamadas"]
+        leituras = estatisticas[f"{nome}:leituras"]
+        linhas.append(f"{nome}: {chamadas - leituras} acertos · {leituras} leituras do disco")
+    return linhas
+
+@st.cache_data(max_entries=2)
+def _carregar_relatorio_md(caminho: Path, impressao: str) -> str:
+    estatisticas_carregadores()["relatorio:leituras"] += 1
     if caminho.exists():
         try:
             return caminho.read_text(encoding="utf-8")
@@ -173,19 +354,103 @@ def carregar_relatorio_md(caminho: Path) -> str:
             return f"Erro ao ler o relatório: {e}"
     return "Relatório não encontrado. Execute a análise dos agentes primeiro."
 
-@st.cache_data
-def carregar_csv(caminho: Path):
-    if not caminho.exists():
-        return f"Arquivo {caminho.name} não encontrado."
+def carregar_relatorio_md(caminho: Path) -> str:
+    estatisticas_carregadores()["relatorio:chamadas"] += 1
+    return _carregar_relatorio_md(caminho, carregador_dados.impressao_digital(caminho))
+
+# Notícias mais recentes por fonte carregadas do arquivo histórico
+NUM_NOTICIAS_POR_FONTE = 10
+
+# Datasets tipados (datas já convertidas, ticker/indicador/fonte categóricos)
+CARREGADORES = {
+    "acoes": (carregador_dados.carregar_acoes, f"{DIR_PRECOS.name}/ ou {ARQUIVO_ACOES.name}"),
+    "indicadores": (carregador_dados.carregar_indicadores, ARQUIVO_INDICADORES_ECONOMICOS.name),
+    "noticias": (
+        lambda: carregador_dados.carregar_noticias(por_fonte=NUM_NOTICIAS_POR_FONTE),
+        f"{DIR_NOTICIAS.name}/ ou {ARQUIVO_NOTICIAS.name}",
+    ),
+}
+
+@st.cache_data(max_entries=2 * len(CARREGADORES))
+def _carregar_dataset(nome: str, impressao: str):
+    estatisticas_carregadores()[f"{nome}:leituras"] += 1
+    carregador, origem = CARREGADORES[nome]
     try:
-        df = pd.read_csv(caminho)
+        df = carregador()
         if df.empty:
-            return f"Arquivo {caminho.name} está vazio."
+            return f"Nenhum dado encontrado em {origem}."
         return df
+    except FileNotFoundError:
+        return f"Arquivo {origem} não encontrado."
     except pd.errors.EmptyDataError:
-        return f"Arquivo {caminho.name} não contém dados para parsear."
+        return f"Arquivo {origem} não contém dados para parsear."
     except Exception as e:
-        return f"Erro ao carregar {caminho.name}: {e}"
+        return f"Erro ao carregar {origem}: {e}"
+
+def carregar_dataset(nome: str):
+    estatisticas_carregadores()[f"{nome}:chamadas"] += 1
+    return _carregar_dataset(nome, carregador_dados.impressao_digital_dataset(nome))
+
+# ============================================================
+# Índices por ticker e por indicador
+# ============================================================
+#
+# Trocar a opção de um selectbox reexecuta o script inteiro. Em vez de
+# filtrar, converter datas e ordenar a cada execução, cada dataset vira
+# (uma vez por versão dos arquivos) um dicionário chave -> fatia já
+# ordenada e com datas convertidas, e a troca é uma consulta ao dicionário.
+# cache_resource devolve o mesmo objeto a todas as sessões, sem cópia: as
+# fatias são somente leitura.
+
+# Colunas de data aceitas nos dados de ações (CSV legado: 'Unnamed: 0')
+COLUNAS_DATA_ACOES = ["Unnamed: 0", "data", "Data", "Date"]
+
+def _indexar(df: pd.DataFrame, chave: str, coluna_data: str) -> dict[str, pd.DataFrame]:
+    ordenado = df.dropna(subset=[coluna_data]).sort_values([chave, coluna_data], kind="stable")
+    return {
+        str(valor): fatia.reset_index(drop=True)
+        for valor, fatia in ordenado.groupby(chave, observed=True, sort=True)
+    }
+
+def _indexar_acoes(df: pd.DataFrame) -> dict[str, pd.DataFrame] | str:
+    if "ticker" not in df.columns:
+        return "Coluna 'ticker' não encontrada nos dados de ações."
+
+    for candidata in COLUNAS_DATA_ACOES:
+        if candidata in df.columns:
+            datas = pd.to_datetime(df[candidata], errors="coerce")
+            if datas.notna().any():
+                return _indexar(df.assign(data_plot=datas), "ticker", "data_plot")
+
+    return (
+        "Não foi possível identificar a coluna de data para o gráfico de ações. "
+        "Verifique se existe uma coluna como 'Unnamed: 0', 'data', 'Data' ou 'Date'."
+    )
+
+def _indexar_indicadores(df: pd.DataFrame) -> dict[str, pd.DataFrame] | str:
+    required_cols = ["data", "valor", "indicador"]
+    if not all(col in df.columns for col in required_cols):
+        return (
+            f"O arquivo {ARQUIVO_INDICADORES_ECONOMICOS.name} deve conter as colunas: "
+            f"{', '.join(required_cols)}."
+        )
+    return _indexar(df, "indicador", "data")
+
+INDEXADORES = {
+    "acoes": _indexar_acoes,
+    "indicadores": _indexar_indicadores,
+}
+
+@st.cache_resource(max_entries=2 * len(INDEXADORES))
+def _indice_dataset(nome: str, impressao: str):
+    df = _carregar_dataset(nome, impressao)
+    if not isinstance(df, pd.DataFrame):
+        return df
+    return INDEXADORES[nome](df)
+
+def indice_dataset(nome: str):
+    """Dicionário chave -> fatia ordenada, ou a mensagem de erro do carregamento."""
+    return _indice_dataset(nome, carregador_dados.impressao_digital_dataset(nome))
 
 # ============================================================
 # Seção: Relatório dos agentes
@@ -212,86 +477,61 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("📈 Top 10 Ações (últimos registros)")
 
-    df_acoes = carregar_csv(ARQUIVO_ACOES)
-    if isinstance(df_acoes, pd.DataFrame):
-        if "ticker" not in df_acoes.columns:
-            st.error(f"Coluna 'ticker' não encontrada no arquivo {ARQUIVO_ACOES.name}.")
+    indice_acoes = indice_dataset("acoes")
+    if isinstance(indice_acoes, dict):
+        tickers = list(indice_acoes)
+        if not tickers:
+            st.info("Nenhum ticker encontrado no arquivo de ações.")
         else:
-            tickers = sorted(df_acoes["ticker"].unique())
-            if not tickers:
-                st.info("Nenhum ticker encontrado no arquivo de ações.")
-            else:
-                ticker_selecionado = st.selectbox(
-                    "Selecione uma ação para ver o gráfico:",
-                    tickers,
-                )
-
-                if ticker_selecionado:
-                    df_ticker = df_acoes[df_acoes["ticker"] == ticker_selecionado].copy()
-
-                    # Detectar coluna de data (pode ser 'Unnamed: 0', 'data', 'Data', 'Date')
-                    date_col = None
-                    for candidate in ["Unnamed: 0", "data", "Data", "Date"]:
-                        if candidate in df_ticker.columns:
-                            conv = pd.to_datetime(df_ticker[candidate], errors="coerce")
-                            if conv.notna().any():
-                                date_col = candidate
-                                df_ticker["data_plot"] = conv
-                                break
-
-                    if date_col is None:
-                        st.warning(
-                            "Não foi possível identificar a coluna de data para o gráfico de ações. "
-                            "Verifique se existe uma coluna como 'Unnamed: 0', 'data', 'Data' ou 'Date'."
-                        )
-                    else:
-                        df_ticker = df_ticker.dropna(subset=["data_plot"])
-                        df_ticker = df_ticker.sort_values("data_plot")
-
-                        if "fechamento" in df_ticker.columns and not df_ticker.empty:
-                            # === GRÁFICO NEON VERDE ===
-                            fig = px.line(
-                                df_ticker,
-                                x="data_plot",
-                                y="fechamento",
-                                title=f"Preço de Fechamento — {ticker_selecionado}",
-                                markers=False,
-                            )
-
-                            fig.update_traces(
-                                line=dict(color="#22c55e", width=2.5)  # verde neon
-                            )
-
-                            fig.update_layout(
-                                template="plotly_dark",
-                                paper_bgcolor="rgba(0,0,0,0)",
-                                plot_bgcolor="#020617",
-                                font=dict(color="#e5e7eb"),
-                                margin=dict(l=40, r=20, t=40, b=40),
-                                xaxis=dict(
-                                    showgrid=False,
-                                    zeroline=False,
-                                    showline=False,
-                                ),
-                                yaxis=dict(
-                                    showgrid=False,
-                                    zeroline=False,
-                                    showline=False,
-                                ),
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
-                        else:
-                            st.info(
-                                f"Não há dados de fechamento válidos para plotar para {ticker_selecionado}."
-                            )
-
-                        with st.expander(f"Ver tabela de dados - {ticker_selecionado}", expanded=False):
-                            st.dataframe(
-                                df_acoes[df_acoes["ticker"] == ticker_selecionado],
-                                height=300,
-                            )
-    elif isinstance(df_acoes, str):
-        st.error(df_acoes)
+            ticker_selecionado = st.selectbox(
+                "Selecione uma ação para ver o gráfico:",
+                tickers,
+            )
+
+            if ticker_selecionado:
+                df_ticker = indice_acoes[ticker_selecionado]
+
+                if "fechamento" in df_ticker.columns and not df_ticker.empty:
+                    # === GRÁFICO NEON VERDE ===
+                    fig = px.line(
+                        df_ticker,
+                        x="data_plot",
+                        y="fechamento",
+                        title=f"Preço de Fechamento — {ticker_selecionado}",
+                        markers=False,
+                    )
+
+                    fig.update_traces(
+                        line=dict(color="#22c55e", width=2.5)  # verde neon
+                    )
+
+                    fig.update_layout(
+                        template="plotly_dark",
+                        paper_bgcolor="rgba(0,0,0,0)",
+                        plot_bgcolor="#020617",
+                        font=dict(color="#e5e7eb"),
+                        margin=dict(l=40, r=20, t=40, b=40),
+                        xaxis=dict(
+                            showgrid=False,
+                            zeroline=False,
+                            showline=False,
+                        ),
+                        yaxis=dict(
+                            showgrid=False,
+                            zeroline=False,
+                            showline=False,
+                        ),
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+                else:
+                    st.info(
+                        f"Não há dados de fechamento válidos para plotar para {ticker_selecionado}."
+                    )
+
+                with st.expander(f"Ver tabela de dados - {ticker_selecionado}", expanded=False):
+                    st.dataframe(df_ticker.drop(columns="data_plot"), height=300)
+    elif isinstance(indice_acoes, str):
+        st.error(indice_acoes)
 
 # ------------------------
 # COLUNA 2 – INDICADORES
@@ -299,97 +539,66 @@ with col1:
 with col2:
     st.subheader("📉 Indicadores Econômicos (IPCA, SELIC, PIB, Dólar, etc.)")
 
-    df_indicadores = carregar_csv(ARQUIVO_INDICADORES_ECONOMICOS)
+    indice_indicadores = indice_dataset("indicadores")
 
-    if isinstance(df_indicadores, pd.DataFrame):
-        required_cols = ["data", "valor", "indicador"]
-        if not all(col in df_indicadores.columns for col in required_cols):
-            st.error(
-                f"O arquivo {ARQUIVO_INDICADORES_ECONOMICOS.name} deve conter as colunas: "
-                f"{', '.join(required_cols)}."
-            )
+    if isinstance(indice_indicadores, dict):
+        # Datas já chegam como datetime64 (formato dd/mm/aaaa do SGS)
+        indicadores_disponiveis = list(indice_indicadores)
+        if not indicadores_disponiveis:
+            st.warning("Não há dados válidos de indicadores após conversão de datas.")
         else:
-            # Converter datas
-            df_indicadores["data"] = pd.to_datetime(
-                df_indicadores["data"], errors="coerce"
+            indicador_selecionado = st.selectbox(
+                "Selecione o indicador para visualização:",
+                indicadores_disponiveis,
             )
-            df_indicadores = df_indicadores.dropna(subset=["data"])
 
-            if df_indicadores.empty:
-                st.warning("Não há dados válidos de indicadores após conversão de datas.")
-            else:
-                indicadores_disponiveis = sorted(df_indicadores["indicador"].unique())
-                if not indicadores_disponiveis:
-                    st.warning("Nenhum indicador encontrado na coluna 'indicador'.")
+            if indicador_selecionado:
+                df_plot = indice_indicadores[indicador_selecionado]
+
+                if df_plot.empty:
+                    st.info(
+                        f"Não há dados para o indicador '{indicador_selecionado}'."
+                    )
                 else:
-                    indicador_selecionado = st.selectbox(
-                        "Selecione o indicador para visualização:",
-                        indicadores_disponiveis,
+                    # === GRÁFICO NEON VERDE PARA INDICADOR ===
+                    fig = px.area(
+                        df_plot,
+                        x="data",
+                        y="valor",
+                        title=f"{indicador_selecionado} — últimos registros",
                     )
 
-                    if indicador_selecionado:
-                        df_plot = df_indicadores[
-                            df_indicadores["indicador"] == indicador_selecionado
-                        ].copy()
-
-                        if df_plot.empty:
-                            st.info(
-                                f"Não há dados para o indicador '{indicador_selecionado}'."
-                            )
-                        else:
-                            # Garantir valor numérico
-                            if not pd.api.types.is_numeric_dtype(df_plot["valor"]):
-                                df_plot["valor"] = pd.to_numeric(
-                                    df_plot["valor"], errors="coerce"
-                                )
-                                df_plot = df_plot.dropna(subset=["valor"])
-
-                            if df_plot.empty:
-                                st.info(
-                                    f"Não há valores numéricos válidos para plotar para '{indicador_selecionado}'."
-                                )
-                            else:
-                                df_plot = df_plot.sort_values("data")
-
-                                # === GRÁFICO NEON VERDE PARA INDICADOR ===
-                                fig = px.area(
-                                    df_plot,
-                                    x="data",
-                                    y="valor",
-                                    title=f"{indicador_selecionado} — últimos registros",
-                                )
-
-                                fig.update_traces(
-                                    line=dict(color="#22c55e", width=2.0),
-                                    fillcolor="rgba(34,197,94,0.15)",  # verde translúcido
-                                )
-
-                                fig.update_layout(
-                                    template="plotly_dark",
-                                    paper_bgcolor="rgba(0,0,0,0)",
-                                    plot_bgcolor="#020617",
-                                    font=dict(color="#e5e7eb"),
-                                    margin=dict(l=40, r=20, t=40, b=40),
-                                    xaxis=dict(
-                                        showgrid=False,
-                                        zeroline=False,
-                                        showline=False,
-                                    ),
-                                    yaxis=dict(
-                                        showgrid=False,
-                                        zeroline=False,
-                                        showline=False,
-                                    ),
-                                )
-                                st.plotly_chart(fig, use_container_width=True)
-
-                                with st.expander(
-                                    f"Ver tabela de dados - {indicador_selecionado}",
-                                    expanded=False,
-                                ):
-                                    st.dataframe(df_plot, height=300)
-    elif isinstance(df_indicadores, str):
-        st.error(df_indicadores)
+                    fig.update_traces(
+                        line=dict(color="#22c55e", width=2.0),
+                        fillcolor="rgba(34,197,94,0.15)",  # verde translúcido
+                    )
+
+                    fig.update_layout(
+                        template="plotly_dark",
+                        paper_bgcolor="rgba(0,0,0,0)",
+                        plot_bgcolor="#020617",
+                        font=dict(color="#e5e7eb"),
+                        margin=dict(l=40, r=20, t=40, b=40),
+                        xaxis=dict(
+                            showgrid=False,
+                            zeroline=False,
+                            showline=False,
+                        ),
+                        yaxis=dict(
+                            showgrid=False,
+                            zeroline=False,
+                            showline=False,
+                        ),
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                    with st.expander(
+                        f"Ver tabela de dados - {indicador_selecionado}",
+                        expanded=False,
+                    ):
+                        st.dataframe(df_plot, height=300)
+    elif isinstance(indice_indicadores, str):
+        st.error(indice_indicadores)
 
 st.divider()
 
@@ -398,7 +607,7 @@ st.divider()
 # ============================================================
 st.subheader("📰 Notícias Recentes de Investimento")
 
-df_noticias = carregar_csv(ARQUIVO_NOTICIAS)
+df_noticias = carregar_dataset("noticias")
 if isinstance(df_noticias, pd.DataFrame):
     if "titulo" in df_noticias.columns and "link" in df_noticias.columns:
         for _, row in df_noticias.head(min(10, len(df_noticias))).iterrows():
@@ -421,6 +630,60 @@ if isinstance(df_noticias, pd.DataFrame):
 elif isinstance(df_noticias, str):
     st.error(df_noticias)
 
+st.divider()
+
+# ============================================================
+# Telemetria das execuções (tokens, latência e custo)
+# ============================================================
+@st.cache_data(ttl=60)
+def carregar_telemetria():
+    return carregar_execucoes(), carregar_chamadas()
+
+st.subheader("📡 Telemetria dos Agentes")
+
+df_execucoes, df_chamadas = carregar_telemetria()
+df_execucoes_crew = (
+    df_execucoes[df_execucoes["origem"] == "crew"] if not df_execucoes.empty else df_execucoes
+)
+
+if df_execucoes_crew.empty:
+    st.info("Nenhuma execução da Crew registrada ainda (data/telemetria.sqlite).")
+else:
+    ultima = df_execucoes_crew.iloc[0]
+    df_ultima = df_chamadas[df_chamadas["execucao"] == ultima["execucao"]]
+
+    m1, m2, m3, m4 = st.columns(4)
+    duracao = ultima["duracao_s"] if pd.notna(ultima["duracao_s"]) else 0.0
+    m1.metric("Duração da última execução", f"{duracao:.0f}s")
+    m2.metric("Chamadas (LLM + ferramentas)", int(ultima["chamadas"]))
+    m3.metric("Tokens", f"{int(ultima['tokens_prompt'] + ultima['tokens_resposta']):,}")
+    m4.metric("Custo estimado", f"US$ {ultima['custo_usd']:.4f}")
+
+    if not df_ultima.empty:
+        col_agente, col_tarefa = st.columns(2)
+        for coluna_layout, agrupamento, titulo in (
+            (col_agente, "agente", "Tempo por agente (s)"),
+            (col_tarefa, "tarefa", "Tempo por tarefa (s)"),
+        ):
+            df_resumo = resumo_por(df_ultima, agrupamento).reset_index()
+            fig = px.bar(df_resumo, x=agrupamento, y="duracao_s", title=titulo, hover_data=["chamadas", "custo_usd"])
+            fig.update_traces(marker_color="#22c55e")
+            fig.update_layout(
+                template="plotly_dark",
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="#020617",
+                font=dict(color="#e5e7eb"),
+                margin=dict(l=40, r=20, t=40, b=40),
+            )
+            coluna_layout.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Histórico de execuções", expanded=False):
+        st.dataframe(
+            df_execucoes[["execucao", "origem", "inicio", "duracao_s", "status", "chamadas",
+                          "tokens_prompt", "tokens_resposta", "custo_usd"]],
+            height=300,
+        )
+
 # ============================================================
 # Rodapé / Sidebar
 # ============================================================
@@ -428,3 +691,24 @@ st.sidebar.info(
     f"Painel atualizado em: {pd.Timestamp.now().strftime('%d/%m/%Y %H:%M:%S')}"
 )
 st.sidebar.markdown("Desenvolvido para demonstração de LLMs + agentes + dados financeiros.")
+
+with st.sidebar.expander("🧮 Memória dos dados carregados", expanded=False):
+    for nome in CARREGADORES:
+        df_memoria = carregar_dataset(nome)
+        if isinstance(df_memoria, pd.DataFrame):
+            st.caption(
+                f"{nome}: {len(df_memoria)} linhas · {carregador_dados.memoria_mb(df_memoria):.3f} MB"
+            )
+
+with st.sidebar.expander("🗃️ Cache dos carregadores", expanded=False):
+    for linha in resumo_cache_carregadores():
+        st.caption(linha)
+
+with st.sidebar.expander("⚡ Cache de respostas do chat", expanded=False):
+    st.caption(cache_respostas_chat().resumo())
+
+with st.sidebar.expander("🔎 Índice de recuperação do chat", expanded=False):
+    st.caption(indice_recuperacao().descricao())
+
+with st.sidebar.expander("🚦 Fila de chamadas ao LLM", expanded=False):
+    st.caption(limite_chat().resumo())
@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import sys
+from pathlib import Path
+
+# Os módulos de scripts/ importam uns aos outros pelo nome (como ao rodar os scripts)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
@@ -0,0 +1,135 @@
+# tests/test_cache_http.py
+
+import sqlite3
+import threading
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from cache_http import CacheHTTP, RespostaNaoGravada, chave_requisicao
+
+URL = "https://www.alphavantage.co/query"
+PARAMS = {"function": "TIME_SERIES_DAILY", "symbol": "PETR4.SA", "apikey": "SEGREDO123"}
+
+
+class SessaoFalsa:
+    """Imita requests.Session.get; responde com a fila `respostas` (status, corpo, headers)."""
+
+    def __init__(self, *respostas):
+        self.respostas = list(respostas) or [(200, b'{"ok": 1}', {})]
+        self.chamadas: list[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        with self._lock:
+            self.chamadas.append({"url": url, "params": params, "headers": headers or {}})
+            status, corpo, cabecalhos = self.respostas[min(len(self.chamadas), len(self.respostas)) - 1]
+        if isinstance(status, Exception):
+            raise status
+        query = "&".join(f"{k}={v}" for k, v in (params or {}).items())
+        return SimpleNamespace(
+            url=f"{url}?{query}" if query else url,
+            status_code=status,
+            content=corpo,
+            headers=cabecalhos,
+            encoding="utf-8",
+            apparent_encoding="utf-8",
+        )
+
+
+def criar(tmp_path, modo="ativo", ttl=3600) -> CacheHTTP:
+    return CacheHTTP(tmp_path / "http.sqlite", modo=modo, ttls={"padrao": ttl})
+
+
+def envelhecer(tmp_path, segundos: float) -> None:
+    with sqlite3.connect(tmp_path / "http.sqlite") as conn:
+        conn.execute("UPDATE respostas SET gravado_em = gravado_em - ?", (segundos,))
+
+
+def test_dentro_do_ttl_serve_do_disco(tmp_path):
+    cache, sessao = criar(tmp_path), SessaoFalsa()
+
+    primeira = cache.get(URL, PARAMS, sessao=sessao)
+    segunda = cache.get(URL, PARAMS, sessao=sessao)
+
+    assert len(sessao.chamadas) == 1
+    assert not primeira.do_cache and segunda.do_cache
+    assert segunda.json() == {"ok": 1}
+    assert (cache.acertos, cache.falhas) == (1, 1)
+
+
+def test_fora_do_ttl_volta_a_rede(tmp_path):
+    cache, sessao = criar(tmp_path, ttl=60), SessaoFalsa()
+    cache.get(URL, PARAMS, sessao=sessao)
+    envelhecer(tmp_path, 120)
+
+    cache.get(URL, PARAMS, sessao=sessao)
+
+    assert len(sessao.chamadas) == 2
+
+
+def test_304_renova_a_gravacao_sem_baixar_de_novo(tmp_path):
+    sessao = SessaoFalsa((200, b"corpo original", {"ETag": '"v1"'}), (304, b"", {}))
+    cache = criar(tmp_path, ttl=60)
+    cache.get(URL, PARAMS, sessao=sessao)
+    envelhecer(tmp_path, 120)
+
+    revalidada = cache.get(URL, PARAMS, sessao=sessao)
+
+    assert sessao.chamadas[1]["headers"]["If-None-Match"] == '"v1"'
+    assert revalidada.revalidada and revalidada.content == b"corpo original"
+    assert cache.revalidacoes == 1
+    # A gravação voltou a valer por mais um TTL: a próxima nem vai à rede
+    cache.get(URL, PARAMS, sessao=sessao)
+    assert len(sessao.chamadas) == 2
+
+
+def test_replay_serve_gravadas_e_falha_sem_gravacao(tmp_path):
+    criar(tmp_path).get(URL, PARAMS, sessao=SessaoFalsa())
+    envelhecer(tmp_path, 10**6)  # replay ignora o TTL
+
+    cache, sessao = criar(tmp_path, modo="replay"), SessaoFalsa()
+    assert cache.get(URL, PARAMS, sessao=sessao).do_cache
+    with pytest.raises(RespostaNaoGravada):
+        cache.get(URL, {**PARAMS, "symbol": "VALE3.SA"}, sessao=sessao)
+    assert sessao.chamadas == []
+
+
+def test_chave_da_api_nao_entra_na_chave_nem_no_disco(tmp_path):
+    assert chave_requisicao(URL, PARAMS) == chave_requisicao(URL, {**PARAMS, "apikey": "OUTRA"})
+
+    criar(tmp_path).get(URL, PARAMS, sessao=SessaoFalsa())
+
+    with sqlite3.connect(tmp_path / "http.sqlite") as conn:
+        (url_gravada,) = conn.execute("SELECT url FROM respostas").fetchone()
+    assert "SEGREDO123" not in url_gravada and "symbol=PETR4.SA" in url_gravada
+    assert b"SEGREDO123" not in (tmp_path / "http.sqlite").read_bytes()
+
+
+def test_falha_de_rede_serve_gravacao_expirada_com_contador_proprio(tmp_path):
+    sessao = SessaoFalsa((200, b"antiga", {}), (requests.ConnectionError("offline"), b"", {}))
+    cache = criar(tmp_path, ttl=60)
+    cache.get(URL, PARAMS, sessao=sessao)
+    envelhecer(tmp_path, 120)
+
+    assert cache.get(URL, PARAMS, sessao=sessao).content == b"antiga"
+    assert (cache.falhas, cache.expiradas_servidas) == (1, 1)
+    assert "1 respostas expiradas" in cache.resumo()
+
+
+def test_contadores_nao_perdem_incrementos_entre_threads(tmp_path):
+    cache, sessao = criar(tmp_path), SessaoFalsa()
+    cache.get(URL, PARAMS, sessao=sessao)
+
+    def consultar():
+        for _ in range(200):
+            cache.get(URL, PARAMS, sessao=sessao)
+
+    threads = [threading.Thread(target=consultar) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert cache.acertos == 8 * 200
@@ -0,0 +1,92 @@
+# tests/test_cache_respostas.py
+
+import numpy as np
+import pytest
+
+from cache_respostas import CacheRespostas, vetorizar
+
+VERSAO = "dados-v1"
+
+
+def cache_com(*perguntas, limiar=0.9) -> CacheRespostas:
+    cache = CacheRespostas(capacidade=8, limiar=limiar)
+    for pergunta in perguntas:
+        cache.guardar(pergunta, f"resposta para: {pergunta}", 2.0, VERSAO)
+    return cache
+
+
+def test_sinonimo_de_agora_e_acerto():
+    cache = cache_com("Qual a SELIC agora?")
+
+    encontrada = cache.buscar("Qual a SELIC hoje?", VERSAO)
+
+    assert encontrada is not None
+    entrada, similaridade = encontrada
+    assert entrada.pergunta == "Qual a SELIC agora?" and similaridade >= 0.9
+    assert cache.latencia_economizada_s == 2.0
+
+
+def test_outro_indicador_e_falha():
+    cache = cache_com("Qual a SELIC agora?")
+
+    assert cache.buscar("Qual o IPCA agora?", VERSAO) is None
+    assert cache.metricas()["falhas"] == 1
+
+
+# Com o limiar baixo, só os termos exatos separam as perguntas abaixo:
+# a similaridade sozinha daria acerto em todas
+@pytest.mark.parametrize(
+    "guardada, pergunta",
+    [
+        ("Vale a pena investir em PETR4?", "Não vale a pena investir em PETR4?"),  # negação
+        ("Qual a SELIC?", "Explique a SELIC"),  # intenção
+        ("Vale a pena investir em PETR4?", "Vale a pena investir em PETR3?"),  # ticker
+        ("Qual a SELIC agora?", "Qual a SELIC em 2020?"),  # agora x ano
+    ],
+)
+def test_termos_exatos_barram_perguntas_parecidas(guardada, pergunta):
+    vetor_guardada, exatos_guardada = vetorizar(guardada)
+    vetor_pergunta, exatos_pergunta = vetorizar(pergunta)
+    assert float(vetor_guardada @ vetor_pergunta) >= 0.3
+    assert exatos_guardada != exatos_pergunta
+
+    assert cache_com(guardada, limiar=0.3).buscar(pergunta, VERSAO) is None
+
+
+def test_negacao_barrada_mesmo_acima_do_limiar_padrao():
+    guardada, pergunta = "Vale a pena investir em PETR4?", "Não vale a pena investir em PETR4?"
+    assert float(vetorizar(guardada)[0] @ vetorizar(pergunta)[0]) >= 0.9
+
+    assert cache_com(guardada).buscar(pergunta, VERSAO) is None
+
+
+def test_acerto_ignora_caixa_acentos_e_pontuacao():
+    cache = cache_com("Qual a SELIC agora?")
+
+    assert cache.buscar("qual a selic agora", VERSAO) is not None
+
+
+def test_nova_versao_dos_dados_esvazia_o_cache():
+    cache = cache_com("Qual a SELIC agora?")
+
+    assert cache.buscar("Qual a SELIC agora?", "dados-v2") is None
+    assert cache.metricas()["invalidacoes"] == 1 and cache.metricas()["entradas"] == 0
+
+
+def test_capacidade_descarta_a_menos_usada():
+    cache = CacheRespostas(capacidade=2, limiar=0.9)
+    cache.guardar("Qual a SELIC agora?", "r1", 1.0, VERSAO)
+    cache.guardar("Qual o IPCA agora?", "r2", 1.0, VERSAO)
+    cache.buscar("Qual a SELIC agora?", VERSAO)  # SELIC passa a ser a mais recente
+
+    cache.guardar("Qual o dólar agora?", "r3", 1.0, VERSAO)
+
+    assert cache.descartes == 1
+    assert cache.buscar("Qual o IPCA agora?", VERSAO) is None
+    assert cache.buscar("Qual a SELIC agora?", VERSAO) is not None
+
+
+def test_vetor_normalizado():
+    vetor, _ = vetorizar("Qual a SELIC agora?")
+
+    assert np.isclose(np.linalg.norm(vetor), 1.0)
@@ -0,0 +1,80 @@
+# tests/test_indice_noticias.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from indice_noticias import (
+    SIMILARIDADE_MINIMA,
+    IndiceNoticias,
+    canonizar_url,
+    minhash,
+    similaridade,
+)
+
+TITULO = "Copom mantém Selic em 10,50% ao ano e sinaliza cautela com inflação"
+
+
+@pytest.mark.parametrize(
+    "variante",
+    [
+        "http://www.valor.com.br/financas/copom-mantem-selic/",
+        "https://valor.com.br/financas/copom-mantem-selic?utm_source=twitter&utm_medium=social",
+        "https://VALOR.com.br/financas/copom-mantem-selic#comentarios",
+        "https://valor.com.br/financas/copom-mantem-selic/amp/",
+        "https://valor.com.br/financas/copom-mantem-selic?fbclid=abc&gclid=xyz",
+    ],
+)
+def test_variantes_da_mesma_materia_tem_a_mesma_url_canonica(variante):
+    assert canonizar_url(variante) == "https://valor.com.br/financas/copom-mantem-selic"
+
+
+def test_parametros_de_conteudo_sao_mantidos_e_ordenados():
+    assert canonizar_url("https://g1.com/busca?q=selic&pagina=2&utm_campaign=x") == (
+        "https://g1.com/busca?pagina=2&q=selic"
+    )
+    assert canonizar_url("https://g1.com/materia?id=1") != canonizar_url("https://g1.com/materia?id=2")
+
+
+def test_minhash_e_estavel_e_ignora_acentos_caixa_e_stopwords():
+    assert minhash(TITULO) == minhash(TITULO)
+    assert minhash(TITULO) == minhash("COPOM MANTEM SELIC EM 10,50% AO ANO E SINALIZA CAUTELA COM INFLACAO")
+
+
+def test_limiar_de_quase_duplicata():
+    # Mesma matéria republicada com uma palavra a mais (Jaccard real 0,9)
+    republicado = "Copom mantém a Selic em 10,50% ao ano e sinaliza cautela com inflação alta"
+    # Mesmo assunto, notícia diferente (Jaccard real ~0,36)
+    outra_decisao = "Copom corta Selic para 10,25% ao ano"
+
+    assert similaridade(minhash(TITULO), minhash(republicado)) >= SIMILARIDADE_MINIMA
+    assert similaridade(minhash(TITULO), minhash(outra_decisao)) < SIMILARIDADE_MINIMA
+
+
+def test_filtrar_novas_descarta_por_url_e_por_titulo(tmp_path):
+    indice = IndiceNoticias(tmp_path / "indice.json")
+    noticias = [
+        {"link": "https://valor.com.br/copom", "titulo": TITULO},
+        {"link": "http://www.valor.com.br/copom/?utm_source=rss", "titulo": "Outro título qualquer"},
+        {"link": "https://infomoney.com.br/copom-selic", "titulo": TITULO.upper()},
+        {"link": "https://infomoney.com.br/petrobras", "titulo": "Petrobras aprova dividendos"},
+    ]
+
+    novas, descartes = indice.filtrar_novas(noticias)
+
+    assert [n["link"] for n in novas] == [noticias[0]["link"], noticias[3]["link"]]
+    assert descartes == {"url": 1, "titulo": 1}
+
+
+def test_indice_persiste_entre_execucoes_e_expira_antigas(tmp_path):
+    caminho = tmp_path / "indice.json"
+    indice = IndiceNoticias(caminho, dias_retencao=30)
+    antigo = (datetime.now() - timedelta(days=45)).strftime("%Y-%m-%d")
+    indice.registrar("https://valor.com.br/copom", TITULO)
+    indice.registrar("https://valor.com.br/antiga", "Ibovespa fecha em queda", visto_em=antigo)
+    indice.salvar()
+
+    recarregado = IndiceNoticias(caminho, dias_retencao=30)
+
+    assert recarregado.motivo_duplicata("https://www.valor.com.br/copom/", "Título novo") == "url"
+    assert recarregado.motivo_duplicata("https://valor.com.br/antiga", "Ibovespa fecha em queda") is None
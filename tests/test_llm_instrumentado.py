@@ -0,0 +1,103 @@
+# tests/test_llm_instrumentado.py
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from cache_llm import CacheLLMDisco, RespostaLLMNaoGravada  # noqa: E402
+from llm_instrumentado import PARADAS_REACT, LLMInstrumentado  # noqa: E402
+
+MENSAGENS = [{"role": "user", "content": "Qual o cenário para a SELIC?"}]
+
+
+class ClienteFalso:
+    """Imita openai.OpenAI().chat.completions.create, contando as chamadas."""
+
+    def __init__(self, tokens_prompt: int = 100, tokens_resposta: int = 20):
+        self.chamadas: list[dict] = []
+        self.tokens = (tokens_prompt, tokens_resposta)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._criar))
+
+    def _criar(self, **parametros):
+        self.chamadas.append(parametros)
+        mensagem = SimpleNamespace(content=f"Final Answer: resposta {len(self.chamadas)}", tool_calls=None)
+        uso = SimpleNamespace(prompt_tokens=self.tokens[0], completion_tokens=self.tokens[1])
+        return SimpleNamespace(choices=[SimpleNamespace(message=mensagem)], usage=uso)
+
+
+def criar(cliente, cache=None) -> LLMInstrumentado:
+    return LLMInstrumentado(model="gpt-4.1-mini", temperature=0.3, cliente=cliente, cache=cache)
+
+
+def test_acerto_no_cache_nao_chama_a_api(tmp_path):
+    cliente = ClienteFalso()
+    llm = criar(cliente, CacheLLMDisco(tmp_path / "llm.sqlite", modo="ativo"))
+
+    primeira = llm.call(MENSAGENS)
+    segunda = llm.call(MENSAGENS)
+
+    assert primeira == segunda == "Final Answer: resposta 1"
+    assert len(cliente.chamadas) == 1
+    assert cliente.chamadas[0]["stop"] == PARADAS_REACT
+
+
+def test_replay_sem_gravacao_falha_sem_chamar_a_api(tmp_path):
+    cliente = ClienteFalso()
+    llm = criar(cliente, CacheLLMDisco(tmp_path / "llm.sqlite", modo="replay"))
+
+    with pytest.raises(RespostaLLMNaoGravada):
+        llm.call(MENSAGENS)
+    assert cliente.chamadas == []
+
+
+def test_replay_serve_o_que_foi_gravado(tmp_path):
+    caminho = tmp_path / "llm.sqlite"
+    criar(ClienteFalso(), CacheLLMDisco(caminho, modo="ativo")).call(MENSAGENS)
+
+    cliente = ClienteFalso()
+    assert criar(cliente, CacheLLMDisco(caminho, modo="replay")).call(MENSAGENS) == "Final Answer: resposta 1"
+    assert cliente.chamadas == []
+
+
+def test_uso_de_tokens_soma_as_respostas_da_api(tmp_path):
+    cache = CacheLLMDisco(tmp_path / "llm.sqlite", modo="ativo")
+    llm = criar(ClienteFalso(tokens_prompt=100, tokens_resposta=20), cache)
+
+    llm.call(MENSAGENS)
+    llm.call([{"role": "user", "content": "E o IPCA?"}])
+    llm.call(MENSAGENS)  # do cache: não soma
+
+    uso = llm.get_token_usage_summary()
+    assert (uso.prompt_tokens, uso.completion_tokens, uso.total_tokens) == (200, 40, 240)
+    assert uso.successful_requests == 2
+
+
+def test_function_calling_nativo_so_sem_cache(tmp_path):
+    assert criar(ClienteFalso()).supports_function_calling()
+    cache = CacheLLMDisco(tmp_path / "llm.sqlite", modo="ativo")
+    assert not criar(ClienteFalso(), cache).supports_function_calling()
+
+
+def test_telemetria_registra_tokens_da_resposta_e_acertos_sem_custo(tmp_path):
+    from telemetria import Telemetria
+
+    telemetria = Telemetria("teste", caminho=tmp_path / "telemetria.sqlite")
+    llm = LLMInstrumentado(
+        model="gpt-4.1-mini",
+        cliente=ClienteFalso(tokens_prompt=1000, tokens_resposta=100),
+        cache=CacheLLMDisco(tmp_path / "llm.sqlite", modo="ativo"),
+        telemetria=telemetria,
+        agente="Analista",
+    )
+
+    llm.call(MENSAGENS)
+    llm.call(MENSAGENS)
+
+    chamadas = telemetria.chamadas()
+    assert list(chamadas["nome"]) == ["gpt-4.1-mini", "gpt-4.1-mini (cache)"]
+    assert list(chamadas["agente"]) == ["Analista", "Analista"]
+    assert list(chamadas["tokens_prompt"]) == [1000, 0]
+    assert chamadas["custo_usd"].iloc[0] > 0
+    assert chamadas["custo_usd"].iloc[1] == 0
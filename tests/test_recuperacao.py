@@ -0,0 +1,88 @@
+# tests/test_recuperacao.py
+
+import pandas as pd
+
+from recuperacao import (
+    IndiceBM25,
+    Trecho,
+    construir_indice,
+    tokenizar,
+    trechos_noticias,
+    trechos_relatorio,
+)
+
+TRECHOS = [
+    Trecho("relatorio", "Política monetária", "O Copom manteve a Selic em 10,50% e sinalizou cautela."),
+    Trecho("relatorio", "Inflação", "O IPCA de maio subiu 0,46%, acima das expectativas do mercado."),
+    Trecho("noticias", "Valor", "Petrobras aprova dividendos extraordinários — Valor"),
+    Trecho("noticias", "InfoMoney", "Dólar fecha em alta com cautela fiscal — InfoMoney"),
+]
+
+
+def test_trecho_relevante_vem_primeiro():
+    indice = IndiceBM25(TRECHOS)
+
+    resultados = indice.buscar("Qual a Selic hoje?")
+
+    assert resultados[0][0].titulo == "Política monetária"
+    assert resultados == sorted(resultados, key=lambda r: r[1], reverse=True)
+
+
+def test_termo_raro_pesa_mais_que_termo_comum():
+    # "cautela" aparece em dois trechos, "petrobras" em um só
+    indice = IndiceBM25(TRECHOS)
+
+    resultados = indice.buscar("cautela petrobras")
+
+    assert resultados[0][0].titulo == "Valor"
+    assert {t.titulo for t, _ in resultados} == {"Valor", "Política monetária", "InfoMoney"}
+
+
+def test_k_limita_os_resultados():
+    indice = IndiceBM25(TRECHOS)
+
+    assert len(indice.buscar("cautela Selic IPCA dólar", k=2)) == 2
+    assert indice.consultas == 1
+
+
+def test_sem_termos_conhecidos_nao_ha_resultados():
+    indice = IndiceBM25(TRECHOS)
+
+    assert indice.buscar("bitcoin criptomoedas") == []
+    assert IndiceBM25([]).buscar("Selic") == []
+
+
+def test_palavras_interrogativas_e_de_tempo_sao_ignoradas():
+    assert tokenizar("Qual é a inflação atual, hoje?") == ["inflacao"]
+    assert IndiceBM25(TRECHOS).buscar("Qual o que hoje agora?") == []
+
+
+def test_trechos_do_relatorio_herdam_o_titulo_da_secao():
+    markdown = (
+        "# Cenário macro\n\nA Selic segue em 10,50%.\n\n"
+        "## Ações\n\nPETR4 lidera o ranking.\n\nVALE3 vem logo atrás."
+    )
+
+    trechos = trechos_relatorio(markdown)
+
+    assert [(t.titulo, t.texto) for t in trechos] == [
+        ("Cenário macro", "A Selic segue em 10,50%."),
+        ("Ações", "PETR4 lidera o ranking.\n\nVALE3 vem logo atrás."),
+    ]
+
+
+def test_indice_combina_relatorio_e_noticias():
+    noticias = pd.DataFrame(
+        {
+            "titulo": ["Petrobras aprova dividendos", None],
+            "fonte": ["Valor", "G1"],
+            "data_coleta": pd.to_datetime(["2024-06-03", "2024-06-03"]),
+            "palavras_chave": ["dividendos", None],
+        }
+    )
+    assert len(trechos_noticias(noticias)) == 1
+
+    indice = construir_indice("# Ações\n\nPETR4 lidera o ranking.", None, noticias)
+
+    assert [t.origem for t in indice.trechos] == ["relatorio", "noticias"]
+    assert indice.buscar("dividendos")[0][0].origem == "noticias"